@@ -4,6 +4,10 @@ set -e  # Exit immediately if a command exits with a non-zero status
 # Step 1: Download the installer script
 echo "Downloading installer script..."
 curl -L "https://raw.githubusercontent.com/abhijayrajvansh/workspace/refs/heads/main/auto-install-models.sh" -o install.sh
+# The installer execs its Python manifest engine from the same directory
+curl -L "https://raw.githubusercontent.com/abhijayrajvansh/workspace/refs/heads/main/model_manifest.py" -o model_manifest.py
+curl -L "https://raw.githubusercontent.com/abhijayrajvansh/workspace/refs/heads/main/civitai_resolver.py" -o civitai_resolver.py
+curl -L "https://raw.githubusercontent.com/abhijayrajvansh/workspace/refs/heads/main/aiconomist-start/scheduling.py" -o scheduling.py
 
 # Step 2: Make the script executable
 echo "Making script executable..."
@@ -0,0 +1,282 @@
+"""
+Throughput benchmark of the download paths against the local Hub stand-in.
+
+Starts hub_standin.py on a free port with synthetic sparse files, then runs
+every selected engine at every selected concurrency as a separate process
+and measures it:
+
+    engine    profile_manifest.py / DownloadEngine (what the Download_*.py scripts run)
+    manifest  model_manifest.py (what auto-install-models.sh runs)
+    hf        hf_hub_download in a thread pool, like the old scripts' MAX_CONCURRENT_DOWNLOADS
+    curl      one curl per file through xargs -P, like the old shell installer
+
+For each run the report holds wall time, MB/s, p50/p99 per-file latency
+(first request to last byte, measured by the server), CPU seconds and peak
+RSS of the process tree, and whether every file arrived complete. The JSON
+report has stable keys so reports of two versions can be diffed.
+
+With --faults the matrix is repeated per fault profile of the stand-in
+(429s, resets, truncated bodies, stalls); the rows then show the time to
+completion, the faults injected and how many bytes had to be sent again,
+so regressions in retry and resume efficiency show up as numbers.
+
+Usage: python3 benchmark.py [--files 2x1G,8x64M] [--engines engine,manifest,hf,curl]
+                            [--concurrency 2,6] [--bandwidth 200M] [--per-connection 50M]
+                            [--latency 0.05] [--faults none --faults mixed] [--repeat 1]
+                            [--output report.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import importlib.util
+import urllib.request
+
+from hub_standin import (DEFAULT_ROOT, FAULT_PROFILES, FaultInjector, parse_size, parse_file_spec,
+                         parse_fault_spec, create_synthetic_files, start_standin, add_shaping_arguments)
+
+# --- Configuration ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT_SCHEMA = 1
+BENCH_REPO = "bench/synthetic"
+ENGINES = ("engine", "manifest", "hf", "curl")
+RUN_TIMEOUT = 3600  # Seconds before a run is killed and reported as failed
+
+# hf_hub_download the way the original Download_*.py scripts used it.
+HF_DRIVER = """
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from huggingface_hub import hf_hub_download
+workers, local_dir, repo_id, files = int(sys.argv[1]), sys.argv[2], sys.argv[3], sys.argv[4:]
+with ThreadPoolExecutor(max_workers=workers) as pool:
+    list(pool.map(lambda name: hf_hub_download(repo_id=repo_id, filename=name, local_dir=local_dir), files))
+"""
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def engine_available(name):
+    """Returns None if the engine can run here, otherwise the reason it cannot."""
+    if name == "hf" and importlib.util.find_spec("huggingface_hub") is None:
+        return "huggingface_hub is not installed"
+    if name == "curl" and not (shutil.which("curl") and shutil.which("xargs")):
+        return "curl or xargs not found"
+    return None
+
+
+def build_command(name, files, endpoint, workdir, concurrency):
+    """
+    Prepares one engine run inside workdir.
+
+    Returns:
+        tuple: (argv, environment overrides, stdin text or None, output directory).
+    """
+    out_dir = os.path.join(workdir, "out")
+    os.makedirs(out_dir)
+    env = {"HF_ENDPOINT": endpoint, "DOWNLOAD_HISTORY": os.path.join(workdir, "bandwidth.json"),
+           "HF_HOME": os.path.join(workdir, "hf-home"), "HF_HUB_DISABLE_TELEMETRY": "1"}
+    n = str(concurrency)
+    if name == "engine":
+        profiles_dir = os.path.join(workdir, "profiles")
+        os.makedirs(profiles_dir)
+        profile = {"schema": 1, "name": "bench", "version": 1, "title": "Benchmark files",
+                   "tasks": [{"repo_id": BENCH_REPO, "filename": rel_path, "local_dir": "out"}
+                             for rel_path, _ in files]}
+        with open(os.path.join(profiles_dir, "bench.json"), "w") as f:
+            json.dump(profile, f)
+        env["MODEL_PROFILES_DIR"] = profiles_dir
+        argv = [sys.executable, os.path.join(SCRIPT_DIR, "profile_manifest.py"), "bench", "--yes",
+                "--min-concurrency", n, "--max-concurrency", n, "--no-blob-store",
+                "--lockfile", os.path.join(workdir, "lock.json")]
+        return argv, env, None, os.path.join(out_dir, "synthetic")
+    if name == "manifest":
+        config_path = os.path.join(workdir, "models-config.json")
+        with open(config_path, "w") as f:
+            json.dump([{"url": f"{endpoint}/{BENCH_REPO}/resolve/main/{rel_path}",
+                        "filename": os.path.basename(rel_path), "dest": "out"} for rel_path, _ in files], f)
+        host = endpoint.split("//", 1)[1].rsplit(":", 1)[0]
+        argv = [sys.executable, os.path.join(os.path.dirname(SCRIPT_DIR), "model_manifest.py"),
+                "-j", n, "--host-jobs", f"{host}={n}", config_path, workdir]
+        return argv, env, None, out_dir
+    if name == "hf":
+        argv = [sys.executable, "-c", HF_DRIVER, n, out_dir, BENCH_REPO] + [rel_path for rel_path, _ in files]
+        return argv, env, None, os.path.join(out_dir, "synthetic")
+    if name == "curl":
+        lines = "".join(f"{os.path.join(out_dir, os.path.basename(rel_path))} "
+                        f"{endpoint}/{BENCH_REPO}/resolve/main/{rel_path}\n" for rel_path, _ in files)
+        argv = ["xargs", "-P", n, "-n", "2", "curl", "-sfL", "-o"]
+        return argv, env, lines, out_dir
+    raise ValueError(f"Unknown engine '{name}'")
+
+
+def _server_json(endpoint, path):
+    with urllib.request.urlopen(endpoint + path, timeout=10) as response:
+        return json.load(response)
+
+
+def run_once(name, files, server, concurrency, workdir, fault_profile="none"):
+    """
+    Runs one engine once and measures it.
+
+    Returns:
+        dict: One result row of the report.
+    """
+    argv, env_overrides, stdin_text, out_dir = build_command(name, files, server.endpoint, workdir, concurrency)
+    _server_json(server.endpoint, "/_reset")
+    log_path = os.path.join(workdir, "run.log")
+    with open(log_path, "w") as log:
+        started = time.monotonic()
+        process = subprocess.Popen(argv, cwd=workdir, env=dict(os.environ, **env_overrides), stdout=log,
+                                   stderr=subprocess.STDOUT, stdin=subprocess.PIPE if stdin_text else subprocess.DEVNULL,
+                                   text=True)
+        if stdin_text:
+            process.stdin.write(stdin_text)
+            process.stdin.close()
+        deadline = started + RUN_TIMEOUT
+        while True:
+            # wait4 gives the rusage of this child (and the children it reaped) rather than all children so far.
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.monotonic() > deadline:
+                process.kill()
+            time.sleep(0.05)
+        seconds = time.monotonic() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    stats = _server_json(server.endpoint, "/_stats")
+    complete = 0
+    for rel_path, size in files:
+        path = os.path.join(out_dir, os.path.basename(rel_path))
+        if os.path.isfile(path) and os.path.getsize(path) == size:
+            complete += 1
+    payload = sum(size for _, size in files)
+    latencies = [entry["last_byte"] - entry["first_request"] for entry in stats["files"].values()
+                 if entry["first_request"] is not None and entry["last_byte"] is not None]
+    return {
+        "engine": name,
+        "concurrency": concurrency,
+        "fault_profile": fault_profile,
+        "faults_injected": stats["faults"],
+        "exit_code": process.returncode,
+        "seconds": round(seconds, 3),
+        "mb_per_s": round(payload / seconds / 1024 ** 2, 2) if complete == len(files) else None,
+        "bytes_served": stats["bytes"],
+        "bytes_retransferred": max(0, stats["bytes"] - payload) if complete == len(files) else None,
+        "file_latency_p50": round(percentile(latencies, 0.50), 3) if latencies else None,
+        "file_latency_p99": round(percentile(latencies, 0.99), 3) if latencies else None,
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_bytes": usage.ru_maxrss * 1024,
+        "files_complete": complete,
+        "files_total": len(files),
+    }
+
+
+def print_table(rows):
+    print(f"{'engine':<9} {'conc':>4} {'faults':<12} {'time s':>8} {'MB/s':>8} {'p50 s':>7} {'p99 s':>7} "
+          f"{'cpu s':>7} {'rss MB':>7} {'retx MB':>8}  files")
+    for row in rows:
+        mb_per_s = f"{row['mb_per_s']:.1f}" if row["mb_per_s"] is not None else "-"
+        p50 = f"{row['file_latency_p50']:.2f}" if row["file_latency_p50"] is not None else "-"
+        p99 = f"{row['file_latency_p99']:.2f}" if row["file_latency_p99"] is not None else "-"
+        retransferred = (f"{row['bytes_retransferred'] / 1024 ** 2:.1f}"
+                         if row["bytes_retransferred"] is not None else "-")
+        print(f"{row['engine']:<9} {row['concurrency']:>4} {row['fault_profile'][:12]:<12} {row['seconds']:>8.2f} "
+              f"{mb_per_s:>8} {p50:>7} {p99:>7} {row['cpu_seconds']:>7.2f} {row['peak_rss_bytes'] / 1024 ** 2:>7.1f} "
+              f"{retransferred:>8}  {row['files_complete']}/{row['files_total']}")
+
+
+def main():
+    """Runs the benchmark matrix and writes the JSON report."""
+    parser = argparse.ArgumentParser(description="Benchmark the download engines against a local Hub stand-in.")
+    parser.add_argument("--files", default="2x1G,8x64M", help="Synthetic files to serve (default: 2x1G,8x64M)")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"Engines to run (default: {','.join(ENGINES)})")
+    parser.add_argument("--concurrency", default="2,6", help="Comma separated concurrency levels (default: 2,6)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per engine and concurrency (default: 1)")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help=f"Where the sparse files live (default: {DEFAULT_ROOT})")
+    parser.add_argument("--output", default="benchmark-report.json", help="JSON report path")
+    parser.add_argument("--faults", action="append",
+                        help=f"Fault profile to run the matrix under ({', '.join(FAULT_PROFILES)}, or rates like "
+                             "reset=0.2,stall=0.05); repeat for several (default: none)")
+    add_shaping_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        files = parse_file_spec(args.files)
+        bandwidth, per_connection = parse_size(args.bandwidth), parse_size(args.per_connection)
+        levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+        fault_profiles = [(spec, parse_fault_spec(spec)) for spec in args.faults or ["none"]]
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    engines = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        print(f"❌ Unknown engine(s): {', '.join(unknown)} (choose from {', '.join(ENGINES)})")
+        return 2
+
+    create_synthetic_files(args.root, files)
+    server = start_standin(args.root, bandwidth=bandwidth, per_connection=per_connection, latency=args.latency)
+    print(f"🛰️  Hub stand-in on {server.endpoint}: {len(files)} file(s), "
+          f"{sum(size for _, size in files) / 1024 ** 3:.2f}GB")
+
+    rows = []
+    skipped = {}
+    try:
+        for name in engines:
+            reason = engine_available(name)
+            if reason:
+                skipped[name] = reason
+                print(f"⏭️  Skipping {name}: {reason}")
+                continue
+            for spec, rates in fault_profiles:
+                for level in levels:
+                    for _ in range(args.repeat):
+                        # A fresh schedule per run, so every engine faces the same sequence of faults.
+                        server.faults = FaultInjector(rates, args.fault_seed, args.stall_seconds)
+                        workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+                        try:
+                            print(f"⏱️  {name} at concurrency {level}, faults: {spec}...")
+                            row = run_once(name, files, server, level, workdir, spec)
+                            if row["files_complete"] != row["files_total"]:
+                                with open(os.path.join(workdir, "run.log")) as log:
+                                    print("".join(log.readlines()[-10:]), end="")
+                            rows.append(row)
+                        finally:
+                            shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        "schema": REPORT_SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "setup": {"files": [{"path": rel_path, "size": size} for rel_path, size in files],
+                  "bandwidth": bandwidth, "per_connection": per_connection, "latency": args.latency,
+                  "faults": {spec: rates for spec, rates in fault_profiles}, "fault_seed": args.fault_seed,
+                  "stall_seconds": args.stall_seconds},
+        "skipped": skipped,
+        "results": rows,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print()
+    print_table(rows)
+    print(f"\n📄 Report written to {args.output}")
+    return 0 if all(row["files_complete"] == row["files_total"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Content-addressed store for downloaded model files.
+
+Several profiles share artifacts (the Wan VAE and lightning LoRAs in the T2V
+and I2V scripts, the T5 GGUF encoders in both Flux scripts, ...). Each file is
+kept once under BLOB_STORE_DIR, keyed by the Hub's LFS sha256 (or its ETag for
+small non-LFS files), and placed into ComfyUI/models/<dir>/<name> as a
+hardlink. Switching profiles then costs neither bandwidth nor extra disk for
+files that are already in the store.
+"""
+
+import os
+import re
+import errno
+import fcntl
+import shutil
+import hashlib
+
+# --- Configuration ---
+BLOB_STORE_DIR = os.environ.get("MODEL_BLOB_STORE", os.path.join("ComfyUI", "models", ".blobs"))
+FICLONE = 0x40049409  # Linux ioctl that shares extents between files (btrfs, xfs)
+LOCK_SUFFIX = ".lock"
+
+_SAFE_KEY = re.compile(r"^[0-9A-Za-z_-]{8,128}$")
+
+
+def blob_key(remote):
+    """
+    Returns the content key of a resolved file, or None when the Hub sent no validator.
+
+    Args:
+        remote (RemoteFile): Resolved file metadata.
+
+    Returns:
+        str: The sha256 for LFS files, otherwise the ETag (hashed if it is not path-safe).
+    """
+    key = remote.sha256 or remote.etag
+    if not key:
+        return None
+    if not _SAFE_KEY.match(key):
+        key = "etag-" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return key
+
+
+def _reflink(src, dst):
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        except OSError:
+            dst_file.close()
+            os.remove(dst)
+            raise
+
+
+class BlobStore:
+    """
+    Directory of downloaded files named after their content key.
+
+    Args:
+        root (str): Store directory; must be on the same filesystem as the
+            model directories for hardlinks to work.
+    """
+
+    def __init__(self, root=BLOB_STORE_DIR):
+        self.root = root
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def has(self, key, size=None, repair=True):
+        """
+        True if the blob is present (and has the expected size, when given).
+
+        Transfers write to a partial file and rename at the end, so presence
+        means complete. A blob of the wrong size was damaged through one of its
+        hardlinks; it is unlinked so it gets downloaded again, unless repair is
+        False (planning and dry runs only look).
+        """
+        path = self.path_for(key)
+        if not os.path.isfile(path):
+            return False
+        if size is not None and os.path.getsize(path) != size:
+            if repair:
+                os.remove(path)
+            return False
+        return True
+
+    def try_lock(self, key):
+        """
+        Takes the cross-process fetch lock of a blob without blocking.
+
+        Installers running side by side on one store would otherwise both write
+        the blob's partial file. The lock file stays in place; unlinking it
+        would let a waiter lock an orphaned inode.
+
+        Returns:
+            file: Open lock file (closing it releases the lock), or None if another process holds it.
+        """
+        lock_path = self.path_for(key) + LOCK_SUFFIX
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        lock_file = open(lock_path, "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def place(self, key, dest_path):
+        """
+        Makes dest_path refer to the blob: hardlink, else reflink, else a plain copy.
+
+        An existing file at dest_path is replaced atomically.
+
+        Returns:
+            str: 'hardlink', 'reflink' or 'copy'.
+        """
+        blob_path = self.path_for(key)
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        if os.path.exists(dest_path) and os.path.samefile(blob_path, dest_path):
+            return "hardlink"
+        tmp_path = dest_path + ".link"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(blob_path, tmp_path)
+            method = "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP):
+                raise
+            try:
+                _reflink(blob_path, tmp_path)
+                method = "reflink"
+            except OSError:
+                shutil.copyfile(blob_path, tmp_path)
+                method = "copy"
+        os.replace(tmp_path, dest_path)
+        return method
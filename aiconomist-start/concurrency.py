@@ -0,0 +1,192 @@
+"""
+Throughput-driven concurrency control for the downloaders.
+
+Instead of a hand-tuned MAX_CONCURRENT_DOWNLOADS per script, the number of
+in-flight transfers is adjusted AIMD-style: while aggregate bytes/s keeps
+improving another transfer is admitted (additive increase), when throughput
+collapses the limit is halved (multiplicative decrease), and once extra
+transfers stop helping the limit holds at the plateau.
+"""
+
+import time
+import asyncio
+import argparse
+import threading
+from collections import deque
+
+# --- Configuration ---
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 16
+ADJUST_INTERVAL = 5.0  # Seconds between limit adjustments
+RATE_WINDOW = 10.0  # Seconds of history used to measure throughput
+GAIN_THRESHOLD = 0.05  # Minimum relative improvement that justifies another transfer
+BACKOFF_RATIO = 0.7  # Throughput below this share of the best rate halves the limit
+PROBE_AFTER = 6  # Plateau intervals before probing one step higher again
+
+
+class ThroughputMeter:
+    """Thread-safe sliding-window byte counter."""
+
+    def __init__(self, window=RATE_WINDOW):
+        self.window = window
+        self.samples = deque()
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def add(self, nbytes):
+        now = time.monotonic()
+        with self.lock:
+            self.samples.append((now, nbytes))
+            self.total += nbytes
+            self._trim(now)
+
+    def rate(self):
+        """Returns the average bytes/s over the window."""
+        now = time.monotonic()
+        with self.lock:
+            self._trim(now)
+            if not self.samples:
+                return 0.0
+            elapsed = max(now - self.samples[0][0], 1.0)
+            return sum(nbytes for _, nbytes in self.samples) / elapsed
+
+    def _trim(self, now):
+        while self.samples and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+
+class AdaptiveLimiter:
+    """
+    Admission gate whose limit follows measured throughput.
+
+    Runs on the download engine's event loop: transfers wait in acquire() and
+    a background task re-evaluates the limit every ADJUST_INTERVAL seconds.
+
+    Args:
+        floor (int): Lowest number of concurrent transfers.
+        ceiling (int): Highest number of concurrent transfers.
+        initial (int): Starting limit; defaults to min(4, ceiling).
+    """
+
+    def __init__(self, floor=DEFAULT_MIN_CONCURRENCY, ceiling=DEFAULT_MAX_CONCURRENCY, initial=None):
+        if floor < 1 or ceiling < floor:
+            raise ValueError(f"Invalid concurrency range {floor}-{ceiling}")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.limit = max(floor, min(ceiling, initial or 4))
+        self.active = 0
+        self.waiters = deque()
+        self.meter = ThroughputMeter()
+        self.best_rate = 0.0
+        self.plateau_intervals = 0
+        self.controller = None
+
+    def record(self, nbytes):
+        """Progress callback: feeds transferred bytes into the throughput meter."""
+        self.meter.add(nbytes)
+
+    async def acquire(self):
+        """Waits for a free slot; waiters are admitted in arrival (submission) order."""
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the cancellation arrived.
+                self.release()
+            else:
+                self.waiters.remove(waiter)
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    def _wake(self):
+        while self.waiters and self.active < self.limit:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    async def run(self, func, *args, **kwargs):
+        """Awaits func(*args, **kwargs) once a transfer slot is available."""
+        async with self:
+            return await func(*args, **kwargs)
+
+    def start(self):
+        """Starts the periodic adjustment task on the running event loop."""
+        if self.controller is None:
+            self.controller = asyncio.ensure_future(self._control_loop())
+
+    async def close(self):
+        if self.controller is not None:
+            self.controller.cancel()
+            await asyncio.gather(self.controller, return_exceptions=True)
+            self.controller = None
+
+    async def _control_loop(self):
+        while True:
+            await asyncio.sleep(ADJUST_INTERVAL)
+            self.adjust(self.meter.rate())
+
+    def adjust(self, rate):
+        """Applies one AIMD step for the measured rate and returns the new limit."""
+        if self.active < self.limit:
+            # Not enough queued work to saturate the current limit; nothing to learn.
+            return self.limit
+        if rate > self.best_rate * (1 + GAIN_THRESHOLD):
+            self.best_rate = rate
+            self.plateau_intervals = 0
+            self.limit = min(self.ceiling, self.limit + 1)
+        elif rate < self.best_rate * BACKOFF_RATIO:
+            self.best_rate = rate
+            self.plateau_intervals = 0
+            self.limit = max(self.floor, self.limit // 2)
+        else:
+            self.plateau_intervals += 1
+            if self.plateau_intervals >= PROBE_AFTER:
+                # The link may have freed up; re-measure from the current rate.
+                self.best_rate = rate
+                self.plateau_intervals = 0
+        self._wake()
+        return self.limit
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def add_concurrency_arguments(parser, ceiling=DEFAULT_MAX_CONCURRENCY):
+    """Adds --min-concurrency / --max-concurrency options to an argparse parser."""
+    parser.add_argument("--min-concurrency", type=positive_int, default=DEFAULT_MIN_CONCURRENCY,
+                        help=f"Lowest number of parallel downloads (default: {DEFAULT_MIN_CONCURRENCY})")
+    parser.add_argument("--max-concurrency", type=positive_int, default=ceiling,
+                        help=f"Highest number of parallel downloads (default: {ceiling})")
+    return parser
+
+
+def check_concurrency_arguments(parser, args):
+    """Exits with a usage error when --min-concurrency is above --max-concurrency."""
+    if args.min_concurrency > args.max_concurrency:
+        parser.error(f"--min-concurrency {args.min_concurrency} is above --max-concurrency {args.max_concurrency}")
+    return args
+
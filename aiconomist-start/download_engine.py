@@ -0,0 +1,607 @@
+"""
+Shared download engine used by every Download_*.py script.
+
+All transfers of a run share one asyncio event loop and one HttpPool, so
+connections to the Hub and its CDN are opened once and reused across files.
+Metadata for the whole task list is resolved concurrently up front, tasks are
+admitted largest-first through the AdaptiveLimiter, and big files are split
+into parallel range requests by hub_transfer. Downloads land in the
+content-addressed BlobStore and are hardlinked into the model directories,
+so a file shared by several profiles is only ever transferred once. Every
+placed file is recorded in the install's Lockfile with the sha256 computed
+during the transfer, and skip decisions are made from that lockfile.
+Progress is reported to a ProgressDisplay (progress_display.py) that
+redraws one aggregate view at a fixed rate instead of per-file banners, and
+optionally to RunMetrics (run_metrics.py) for scraping and event logs and to
+RunTrace (run_trace.py) as a per-task timeline.
+
+The scripts only describe what to download (their profile manifests, see
+profile_manifest.py); everything that touches the network lives here.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import zipfile
+import contextlib
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from http_pool import HttpPool, TransferError
+from hub_transfer import SEGMENT_CONNECTIONS, hub_file_url, fetch_remote_file, download_file
+from concurrency import AdaptiveLimiter, add_concurrency_arguments, positive_int, DEFAULT_MAX_CONCURRENCY
+from scheduling import (order_largest_first, print_plan, print_dry_run, measured_bandwidth, measured_per_transfer,
+                        record_bandwidth, format_size, mount_point, free_bytes, MIN_RECORDED_BYTES)
+from blob_store import BlobStore, BLOB_STORE_DIR, blob_key
+from lockfile import Lockfile, LOCKFILE_PATH, file_sha256, same_source
+from zip_stream import read_central_directory, is_streamable, stream_extract, member_path
+from progress_display import make_progress_display, add_progress_arguments
+from run_metrics import make_run_metrics, add_metrics_arguments
+from run_trace import RunTrace, add_trace_arguments
+
+# --- Configuration ---
+METADATA_CONCURRENCY = 16  # Parallel HEAD requests while sizing the plan
+EXTRACT_WORKERS = os.cpu_count() or 1  # Processes inflating members of archives that were downloaded whole
+PARALLEL_EXTRACT_MIN_BYTES = 256 * 1024 * 1024  # Smaller archives are extracted in-process
+DISK_HEADROOM = 1024 * 1024 * 1024  # Free space kept in reserve on every target filesystem
+BLOB_LOCK_POLL = 1.0  # Seconds between attempts to take a blob another process is fetching
+
+
+def task_destination(task):
+    """Final path of a task: local_dir/rename_to, or local_dir/filename (repo subfolders included)."""
+    return os.path.join(task["local_dir"], task.get("rename_to") or task["filename"])
+
+
+def task_url(task):
+    """Hub resolve URL of a task, at its revision (default: main)."""
+    return hub_file_url(task["repo_id"], task["filename"], task.get("repo_type"), task.get("revision") or "main")
+
+
+def _extract_members(zip_path, names, target_dir):
+    # Runs in a worker process with its own handle, seeking straight to its members.
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        for name in names:
+            zip_ref.extract(name, target_dir)
+
+
+def extract_zip(zip_path, target_dir, workers=EXTRACT_WORKERS):
+    """
+    Extracts a ZIP archive into target_dir and deletes the archive.
+
+    Large archives with several members are split into size-balanced batches
+    that are inflated by a process pool, so extraction scales across cores
+    instead of running member by member on one.
+
+    Args:
+        zip_path (str): Archive to extract.
+        target_dir (str): Directory to extract into.
+        workers (int): Maximum number of extraction processes.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        members = [info for info in zip_ref.infolist() if not info.is_dir()]
+        total = sum(info.file_size for info in members)
+        workers = min(workers, len(members))
+        if workers < 2 or total < PARALLEL_EXTRACT_MIN_BYTES:
+            zip_ref.extractall(target_dir)
+            members = []
+        else:
+            # Create every parent up front so workers never race to make the same directory.
+            for info in zip_ref.infolist():
+                path = member_path(target_dir, info.filename)
+                if path:
+                    os.makedirs(path if info.is_dir() else os.path.dirname(path), exist_ok=True)
+    if members:
+        batches = [(0, i, []) for i in range(workers)]
+        for info in sorted(members, key=lambda info: -info.file_size):
+            size, i, names = heapq.heappop(batches)
+            names.append(info.filename)
+            heapq.heappush(batches, (size + info.file_size, i, names))
+        # Called from an executor thread while the event loop runs: forking this multi-threaded
+        # process could deadlock the children, so they come from a clean fork server instead.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as executor:
+            futures = [executor.submit(_extract_members, zip_path, names, target_dir) for _, _, names in batches if names]
+            for future in futures:
+                future.result()
+    os.remove(zip_path)
+
+
+def count_statuses(results):
+    """Returns a Counter of result statuses ('downloaded', 'linked', 'verified', 'skipped' or 'failed')."""
+    return Counter(result["status"] for result in results)
+
+
+class DownloadEngine:
+    """
+    Runs download tasks on a private event loop with one shared connection pool.
+
+    Args:
+        floor (int): Lowest number of concurrent transfers.
+        ceiling (int): Highest number of concurrent transfers.
+        connections (int): Parallel range requests per large file.
+        blob_store (str): Directory of the shared blob store, or None to download in place.
+        lockfile (str): Path of the lockfile of verified downloads.
+        ignore_disk_space (bool): Let check_disk_space() pass even when space is short.
+        print_fn (callable): Output function for progress lines.
+        progress (ProgressDisplay): Live display that replaces the per-file download banners;
+            messages are then printed through it instead of print_fn.
+        metrics (RunMetrics): Receives bytes, phase timings, retries and task outcomes.
+        trace (RunTrace): Receives a span per task phase; written when the engine is closed.
+    """
+
+    def __init__(self, floor=1, ceiling=DEFAULT_MAX_CONCURRENCY, connections=SEGMENT_CONNECTIONS,
+                 blob_store=BLOB_STORE_DIR, lockfile=LOCKFILE_PATH, ignore_disk_space=False, print_fn=print,
+                 progress=None, metrics=None, trace=None):
+        self.loop = asyncio.new_event_loop()
+        self.pool = HttpPool()
+        self.limiter = AdaptiveLimiter(floor=floor, ceiling=ceiling)
+        self.connections = connections
+        self.store = BlobStore(blob_store) if blob_store else None
+        self.lock = Lockfile(lockfile)
+        self.ignore_disk_space = ignore_disk_space
+        self.progress = progress
+        self.metrics = metrics
+        self.trace = trace
+        self.print = progress.print if progress else print_fn
+        self.remotes = {}
+        self.blob_fetches = {}
+        self.transfer_seconds = {}
+
+    @classmethod
+    def from_args(cls, args, **kwargs):
+        """Builds an engine from options added by add_engine_arguments."""
+        return cls(floor=args.min_concurrency, ceiling=args.max_concurrency,
+                   connections=args.connections, blob_store=args.blob_store,
+                   lockfile=args.lockfile, ignore_disk_space=args.ignore_disk_space,
+                   progress=make_progress_display(args.progress),
+                   metrics=make_run_metrics(args.event_log, args.metrics_port),
+                   trace=RunTrace(args.trace) if args.trace else None, **kwargs)
+
+    def plan(self, tasks):
+        """
+        Resolves every task's metadata concurrently and prints the largest-first plan.
+
+        Args:
+            tasks (list): Task dicts.
+
+        Returns:
+            list: (task, size) pairs in submission order; size is None when unknown.
+        """
+        with self._phase("plan", "resolve"):
+            sizes = self.loop.run_until_complete(self._resolve_sizes(tasks))
+        ordered = order_largest_first(tasks, sizes)
+        bandwidth, _runs = measured_bandwidth()
+        if bandwidth:
+            print_plan(ordered, workers=self.limiter.ceiling, bandwidth=bandwidth,
+                       per_transfer=measured_per_transfer(), print_fn=self.print)
+        else:
+            print_plan(ordered, workers=self.limiter.ceiling, print_fn=self.print)
+        return ordered
+
+    def dry_run(self, ordered):
+        """
+        Works out what run() would do with each planned task, without
+        downloading, hashing or writing anything, and prints it.
+
+        Must be called after plan().
+
+        Args:
+            ordered (list): (task, size) pairs returned by plan().
+
+        Returns:
+            list: (task, size, action) triples; action is one of 'fetch',
+            'refresh', 'extract', 'verify', 'link' or 'skip'.
+        """
+        actions = []
+        planned_blobs = set()
+        for task, size in ordered:
+            actions.append((task, size, self._planned_action(task, size, planned_blobs)))
+        bandwidth, runs = measured_bandwidth()
+        print_dry_run(actions, workers=self.limiter.ceiling, bandwidth=bandwidth, history_runs=runs,
+                      per_transfer=measured_per_transfer(), print_fn=self.print)
+        return actions
+
+    def _planned_action(self, task, size, planned_blobs):
+        # Mirrors the decisions of _process() using only metadata and stat().
+        if task.get("extract_and_delete", False):
+            return "extract" if task["filename"].lower().endswith(".zip") else "fetch"
+        final_path = task_destination(task)
+        if self.lock.is_current(final_path, task):
+            return "skip"
+        remote = self._cached_remote(task)
+        if os.path.exists(final_path):
+            if remote is None:
+                return "skip"
+            if remote.size is not None and os.path.getsize(final_path) != remote.size:
+                return "refresh"
+            return "verify"
+        key = blob_key(remote) if self.store and remote else None
+        if key:
+            if key in planned_blobs or self.store.has(key, size, repair=False):
+                return "link"
+            planned_blobs.add(key)
+        return "fetch"
+
+    def check_disk_space(self, ordered):
+        """
+        Compares the bytes still to be written with the free space of each target filesystem.
+
+        Files that are already current, or whose blob is already in the store,
+        need no space. Must be called after plan().
+
+        Args:
+            ordered (list): (task, size) pairs returned by plan().
+
+        Returns:
+            bool: True if every filesystem has enough room (or the check is disabled).
+        """
+        needed = {}
+        counted_blobs = set()
+        for task, size in ordered:
+            if not size or not all(task.get(field) for field in ("repo_id", "filename", "local_dir")):
+                continue
+            remote = self._cached_remote(task)
+            extract = task.get("extract_and_delete", False)
+            target = task["local_dir"]
+            if not extract:
+                if self.lock.is_current(task_destination(task), task):
+                    continue
+                key = blob_key(remote) if self.store and remote else None
+                if key:
+                    # Only look: this also runs for --plan, which must not change anything on disk.
+                    if key in counted_blobs or self.store.has(key, size, repair=False):
+                        continue
+                    counted_blobs.add(key)
+                    target = self.store.root
+            mount = mount_point(target)
+            needed[mount] = needed.get(mount, 0) + size
+
+        enough = True
+        for mount, nbytes in sorted(needed.items()):
+            free = free_bytes(mount)
+            self.print(f"💽 Disk space on {mount}: {format_size(nbytes)} needed, {format_size(free)} free")
+            if nbytes + DISK_HEADROOM > free:
+                enough = False
+                self.print(f"❌ Not enough free space on {mount}: need {format_size(nbytes + DISK_HEADROOM)} "
+                           f"including {format_size(DISK_HEADROOM)} headroom, only {format_size(free)} available")
+        if not enough and self.ignore_disk_space:
+            self.print("⚠️  Continuing anyway (--ignore-disk-space)")
+            return True
+        return enough
+
+    def run(self, tasks):
+        """
+        Downloads tasks in the given order, as many at a time as the limiter allows.
+
+        Args:
+            tasks (iterable): Task dicts in submission order.
+
+        Returns:
+            list: One result dict per task with keys task, status, error, bytes, seconds and
+            transfer_seconds (the time spent receiving its bytes).
+        """
+        started = time.monotonic()
+        try:
+            results = self.loop.run_until_complete(self._run_all(list(tasks)))
+        finally:
+            if self.progress:
+                self.progress.end()
+        # Feeds the wall time predictions of later plans and dry runs on this machine.
+        rates = [result["bytes"] / result["transfer_seconds"] for result in results
+                 if result["bytes"] >= MIN_RECORDED_BYTES and result["transfer_seconds"] > 0]
+        record_bandwidth(sum(result["bytes"] for result in results), time.monotonic() - started, "download_engine",
+                         per_transfer=max(rates, default=None))
+        return results
+
+    def close(self):
+        """Stops the limiter, closes pooled connections and the event loop."""
+        if self.loop.is_closed():
+            return
+        self.loop.run_until_complete(self.limiter.close())
+        self.loop.run_until_complete(self.pool.close())
+        self.loop.close()
+        if self.metrics:
+            self.metrics.close()
+        if self.trace:
+            self.print(f"🧵 Trace written to {self.trace.write()}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _cached_remote(self, task):
+        future = self.remotes.get(task_url(task))
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    async def resolve(self, task):
+        """Returns the RemoteFile of a task, resolving each URL only once per run."""
+        url = task_url(task)
+        if url not in self.remotes:
+            self.remotes[url] = asyncio.ensure_future(fetch_remote_file(self.pool, url))
+        return await self.remotes[url]
+
+    async def _resolve_sizes(self, tasks):
+        gate = asyncio.Semaphore(METADATA_CONCURRENCY)
+
+        async def size_of(task):
+            async with gate:
+                try:
+                    return (await self.resolve(task)).size
+                except (TransferError, KeyError):
+                    # The download itself reports the error; unknown sizes are scheduled last.
+                    return None
+
+        return await asyncio.gather(*(size_of(task) for task in tasks))
+
+    async def _run_all(self, tasks):
+        self.limiter.start()
+        total = len(tasks)
+        if self.progress:
+            self.progress.begin([(f"[{i}/{total}]", os.path.basename(task.get("rename_to") or task.get("filename") or ""),
+                                  getattr(self._cached_remote(task), "size", None)) for i, task in enumerate(tasks, 1)])
+        if self.trace:
+            for i, task in enumerate(tasks, 1):
+                self.trace.name_task(f"[{i}/{total}]", os.path.basename(task.get("rename_to") or task.get("filename") or ""))
+        if self.metrics:
+            self.metrics.start(total)
+            if self.metrics.server:
+                self.print(f"📈 Metrics at http://{self.metrics.host}:{self.metrics.port}/metrics")
+        return await asyncio.gather(*(self._process(i, total, task) for i, task in enumerate(tasks, 1)))
+
+    async def _process(self, index, total, task):
+        tag = f"[{index}/{total}]"
+        try:
+            result = await self._process_task(tag, task)
+        finally:
+            if self.progress:
+                self.progress.finish(tag)
+        result["transfer_seconds"] = self.transfer_seconds.pop(tag, 0.0)
+        if self.metrics:
+            self.metrics.task_done(tag, result)
+        return result
+
+    @contextlib.contextmanager
+    def _phase(self, tag, name):
+        """Times one phase of a task (resolve, transfer, verify, extract or place) for the metrics and trace."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            if name == "transfer":
+                self.transfer_seconds[tag] = self.transfer_seconds.get(tag, 0.0) + seconds
+            if self.metrics and tag != "plan":
+                self.metrics.phase(tag, name, seconds)
+            if self.trace:
+                self.trace.span(tag, name, started, seconds)
+
+    async def _process_task(self, tag, task):
+        result = {"task": task, "status": "failed", "error": None, "bytes": 0, "seconds": 0.0}
+        started = time.monotonic()
+        repo_id = task.get("repo_id")
+        filename = task.get("filename")
+        local_dir = task.get("local_dir")
+
+        if not all([repo_id, local_dir, filename]):
+            result["error"] = "missing required fields"
+            self.print(f"❌ {tag} Error: Task is missing required fields. Skipping.")
+            return result
+
+        final_path = task_destination(task)
+        extract = task.get("extract_and_delete", False) and filename.lower().endswith(".zip")
+        if not task.get("extract_and_delete", False) and self.lock.is_current(final_path, task):
+            result["status"] = "skipped"
+            self.print(f"⏭️  {tag} File already exists, skipping: {os.path.basename(final_path)}")
+            return result
+
+        def on_progress(nbytes):
+            result["bytes"] += nbytes
+            self.limiter.record(nbytes)
+            if self.progress:
+                self.progress.advance(tag, nbytes)
+            if self.metrics:
+                self.metrics.add_bytes(nbytes)
+
+        def on_event(name, **fields):
+            if self.metrics:
+                self.metrics.transfer_event(tag, name, fields)
+            if self.trace and "started" in fields:
+                self.trace.span(tag, name.replace("_", "-"), fields["started"], fields["seconds"],
+                                **{k: v for k, v in fields.items() if k not in ("started", "seconds")})
+
+        try:
+            if not task.get("extract_and_delete", False) and os.path.exists(final_path):
+                status = await self._adopt_existing(tag, task, final_path)
+                if status:
+                    result["status"] = status
+                    return result
+            with self._phase(tag, "resolve"):
+                remote = await self.resolve(task)
+            if extract:
+                # Archives are deleted after extraction, so they bypass the blob store and lockfile.
+                await self._download_and_extract(tag, task, remote, final_path, on_progress, on_event)
+                result["status"] = "downloaded"
+                return result
+
+            key = blob_key(remote) if self.store else None
+            if key is None:
+                async with self.limiter:
+                    self._transfer_started(tag, task)
+                    with self._phase(tag, "transfer"):
+                        digest = await download_file(self.pool, remote, final_path, self.connections, on_progress,
+                                                     on_event)
+                result["status"] = "downloaded"
+            else:
+                digest, reused = await self._fetch_blob(tag, task, remote, key, on_progress, on_event)
+                with self._phase(tag, "place"):
+                    method = await self.loop.run_in_executor(None, self.store.place, key, final_path)
+                result["status"] = "linked" if reused else "downloaded"
+                if reused:
+                    self.print(f"🔗 {tag} Reused from blob store ({method}): {final_path}")
+            if result["status"] == "downloaded" and not self.progress:
+                self.print(f"✅ {tag} Successfully downloaded: {final_path}")
+            self.lock.record(final_path, task, remote, digest)
+        except TransferError as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+            if e.status == 404:
+                self.print(f"❌ {tag} Error: File '{filename}' not found in repo '{repo_id}'.")
+            else:
+                self.print(f"❌ {tag} Error: Transfer failed for '{filename}' from '{repo_id}'. Details: {e}")
+        except zipfile.BadZipFile:
+            result["status"] = "failed"
+            result["error"] = "not a valid ZIP file"
+            self.print(f"❌ {tag} Error: File '{filename}' is not a valid ZIP file.")
+        except OSError as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+            self.print(f"❌ {tag} Error: Local file system issue for '{filename}' in '{local_dir}'. Details: {e}")
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+            self.print(f"❌ {tag} Error: Unexpected error downloading '{filename}' from '{repo_id}': {type(e).__name__} - {e}")
+        finally:
+            result["seconds"] = time.monotonic() - started
+        return result
+
+    def _transfer_started(self, tag, task):
+        # With a live display the transfer shows up there instead of as a banner.
+        if self.progress:
+            self.progress.start(tag)
+        else:
+            self.print(f"📥 {tag} Downloading {task['filename']} from {task['repo_id']} -> {task['local_dir']}")
+
+    async def _download_and_extract(self, tag, task, remote, zip_path, on_progress, on_event=None):
+        """
+        Extracts a ZIP task into its local_dir.
+
+        When the server supports ranges the central directory is read first and
+        members are inflated while the body streams in, so the archive is never
+        stored. Otherwise the archive is downloaded, extracted and deleted.
+        """
+        local_dir = task["local_dir"]
+        async with self.limiter:
+            self._transfer_started(tag, task)
+            if remote.accepts_ranges and remote.size:
+                members = await read_central_directory(self.pool, remote)
+                if is_streamable(members):
+                    self.print(f"🗜️  {tag} Extracting {len(members)} ZIP entries while downloading")
+                    with self._phase(tag, "transfer"):
+                        count = await stream_extract(self.pool, remote, members, local_dir, on_progress, on_event)
+                    self.print(f"📦 {tag} Extracted {count} files to {local_dir}")
+                    return
+            with self._phase(tag, "transfer"):
+                await download_file(self.pool, remote, zip_path, self.connections, on_progress, on_event)
+        if not self.progress:
+            self.print(f"✅ {tag} Successfully downloaded: {zip_path}")
+        self.print(f"🗜️  {tag} Extracting ZIP file: {zip_path}")
+        with self._phase(tag, "extract"):
+            await self.loop.run_in_executor(None, extract_zip, zip_path, local_dir)
+        self.print(f"📦 {tag} Extracted contents to {local_dir} and deleted the ZIP file")
+
+    async def _adopt_existing(self, tag, task, final_path):
+        """
+        Checks a file that exists but is not (or no longer) in the lockfile,
+        or was recorded for another repo, file or revision than the task's.
+
+        The file is hashed once and recorded if it matches the Hub's size and
+        sha256; otherwise it is re-downloaded. A file recorded for another
+        source is also re-downloaded when the Hub gives no sha256 to compare
+        with. When the Hub cannot be reached the file is kept as before.
+
+        Returns:
+            str: 'verified' or 'skipped' if the existing file is kept, None to re-download it.
+        """
+        try:
+            with self._phase(tag, "resolve"):
+                remote = await self.resolve(task)
+        except TransferError as e:
+            self.print(f"⏭️  {tag} File exists but could not be verified ({e}), skipping: {os.path.basename(final_path)}")
+            return "skipped"
+        if remote.size is not None and os.path.getsize(final_path) != remote.size:
+            self.print(f"⚠️  {tag} Incomplete file ({os.path.getsize(final_path)} of {remote.size} bytes), re-downloading: {final_path}")
+            self.lock.forget(final_path)
+            return None
+        entry = self.lock.entry(final_path)
+        if not remote.sha256 and entry is not None and not same_source(entry, task):
+            self.print(f"⚠️  {tag} File was downloaded from {entry.get('repo_id')}/{entry.get('filename')}, re-downloading: {final_path}")
+            self.lock.forget(final_path)
+            return None
+        with self._phase(tag, "verify"):
+            digest = await self.loop.run_in_executor(None, file_sha256, final_path)
+        if remote.sha256 and digest != remote.sha256:
+            self.print(f"⚠️  {tag} Checksum mismatch, re-downloading: {final_path}")
+            self.lock.forget(final_path)
+            return None
+        self.lock.record(final_path, task, remote, digest)
+        self.print(f"✔️  {tag} Verified existing file: {os.path.basename(final_path)}")
+        return "verified"
+
+    async def _fetch_blob(self, tag, task, remote, key, on_progress, on_event=None):
+        """
+        Ensures the blob for key exists.
+
+        Returns:
+            tuple: (sha256 of the blob, True if no transfer was needed for this task).
+        """
+        if key in self.blob_fetches:
+            # Another task of this run is already fetching the same content.
+            digest, _ = await asyncio.shield(self.blob_fetches[key])
+            return digest, True
+        if self.store.has(key, remote.size):
+            # Blobs were verified when they were downloaded; LFS keys are their sha256.
+            return remote.sha256, True
+        self.blob_fetches[key] = asyncio.ensure_future(self._download_blob(tag, task, remote, key, on_progress,
+                                                                            on_event))
+        return await asyncio.shield(self.blob_fetches[key])
+
+    async def _download_blob(self, tag, task, remote, key, on_progress, on_event=None):
+        lock = await self._lock_blob(tag, key)
+        try:
+            if self.store.has(key, remote.size):
+                # Another installer on this store finished it while we waited for the lock.
+                return remote.sha256, True
+            async with self.limiter:
+                self._transfer_started(tag, task)
+                with self._phase(tag, "transfer"):
+                    digest = await download_file(self.pool, remote, self.store.path_for(key), self.connections,
+                                                 on_progress, on_event)
+            return digest, False
+        finally:
+            lock.close()
+
+    async def _lock_blob(self, tag, key):
+        """Waits (without holding a transfer slot) until no other process is fetching the blob."""
+        waiting = False
+        while True:
+            lock = self.store.try_lock(key)
+            if lock:
+                return lock
+            if not waiting:
+                self.print(f"⏳ {tag} Another installer is fetching this file into the blob store; waiting for it")
+                waiting = True
+            await asyncio.sleep(BLOB_LOCK_POLL)
+
+
+def add_engine_arguments(parser, ceiling=DEFAULT_MAX_CONCURRENCY):
+    """Adds the concurrency, connection, blob store, lockfile, disk space, progress, metrics and trace options to an argparse parser."""
+    add_concurrency_arguments(parser, ceiling=ceiling)
+    parser.add_argument("--connections", type=positive_int, default=SEGMENT_CONNECTIONS,
+                        help=f"Parallel range requests per large file (default: {SEGMENT_CONNECTIONS})")
+    parser.add_argument("--blob-store", default=BLOB_STORE_DIR,
+                        help=f"Shared content-addressed store that files are hardlinked from (default: {BLOB_STORE_DIR})")
+    parser.add_argument("--no-blob-store", dest="blob_store", action="store_const", const=None,
+                        help="Download straight into the model directories without the shared store")
+    parser.add_argument("--lockfile", default=LOCKFILE_PATH,
+                        help=f"Lockfile of verified downloads used for skip decisions (default: {LOCKFILE_PATH})")
+    parser.add_argument("--ignore-disk-space", action="store_true",
+                        help="Start downloading even if the free space check fails")
+    add_progress_arguments(parser)
+    add_metrics_arguments(parser)
+    add_trace_arguments(parser)
+    return parser
@@ -0,0 +1,272 @@
+"""
+Minimal asyncio HTTP/1.1 client with a keep-alive connection pool per host.
+
+Every hf_hub_download call used to pay for its own TCP connect, TLS handshake
+and redirect chain. The pool keeps idle connections to huggingface.co and its
+CDN hosts open, so the dozens of small files in a profile reuse warm
+connections and all network I/O runs on a single event loop thread.
+
+Only what the downloaders need is implemented: HEAD/GET, Content-Length and
+chunked bodies, and connection reuse when a body was fully consumed.
+"""
+
+import ssl
+import time
+import asyncio
+import urllib.parse
+from collections import deque
+
+# --- Configuration ---
+REQUEST_TIMEOUT = 60  # Seconds to wait for a connect, a status line or a body read
+MAX_IDLE_PER_HOST = 32  # Idle keep-alive connections kept per host
+READ_SIZE = 256 * 1024
+USER_AGENT = "comfyui-model-downloader/1.0"
+
+
+class TransferError(Exception):
+    """Raised when a file cannot be resolved or transferred."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class _Connection:
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.requests = 0
+
+    def close(self):
+        self.writer.close()
+
+
+class Response:
+    """Status, headers and a streaming body bound to a pooled connection."""
+
+    def __init__(self, pool, conn, status, reason, headers, method, version="HTTP/1.1"):
+        self.pool = pool
+        self.conn = conn
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        connection = headers.get("connection", "").lower()
+        # Decided before a bodyless response hands the connection back to the pool below.
+        if version == "HTTP/1.0":
+            self.keep_alive = "keep-alive" in connection
+        else:
+            self.keep_alive = connection != "close"
+        self.remaining = None
+        self.chunk_left = 0
+        self.finished = False
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            self.remaining = 0
+        elif not self.chunked:
+            length = headers.get("content-length")
+            if length is not None:
+                self.remaining = int(length)
+            else:
+                # Body runs until the server closes the connection.
+                self.keep_alive = False
+        if self.remaining == 0:
+            self._finish()
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+    async def read(self, size=READ_SIZE):
+        """Returns the next piece of the body (at most `size` bytes), or b'' at the end."""
+        if self.finished:
+            return b""
+        reader = self.conn.reader
+        if self.chunked:
+            data = await self._read_chunked(size)
+        elif self.remaining is None:
+            data = await self._timed(reader.read(size))
+            if not data:
+                self._finish()
+        else:
+            data = await self._timed(reader.read(min(size, self.remaining)))
+            if not data:
+                raise TransferError(f"Connection closed with {self.remaining} bytes of body outstanding")
+            self.remaining -= len(data)
+            if self.remaining == 0:
+                self._finish()
+        return data
+
+    async def read_all(self):
+        parts = []
+        while True:
+            data = await self.read()
+            if not data:
+                return b"".join(parts)
+            parts.append(data)
+
+    async def _read_chunked(self, size):
+        reader = self.conn.reader
+        if self.chunk_left == 0:
+            line = await self._timed(reader.readline())
+            self.chunk_left = int(line.split(b";")[0].strip() or b"0", 16)
+            if self.chunk_left == 0:
+                # Trailer section ends with an empty line.
+                while (await self._timed(reader.readline())) not in (b"\r\n", b"\n", b""):
+                    pass
+                self._finish()
+                return b""
+        data = await self._timed(reader.read(min(size, self.chunk_left)))
+        if not data:
+            raise TransferError("Connection closed inside a chunked body")
+        self.chunk_left -= len(data)
+        if self.chunk_left == 0:
+            await self._timed(reader.readline())
+        return data
+
+    async def _timed(self, awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, self.pool.timeout)
+        except asyncio.TimeoutError:
+            self.close()
+            raise TransferError(f"Timed out after {self.pool.timeout}s waiting for data")
+        except (ConnectionError, OSError) as e:
+            self.close()
+            raise TransferError(f"Connection error while reading body: {e}")
+
+    def _finish(self):
+        self.finished = True
+        if self.conn is not None:
+            if self.keep_alive:
+                self.pool._release(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
+
+    def close(self):
+        """Abandons the rest of the body; the connection cannot be reused."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.finished = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if not self.finished:
+            self.close()
+
+
+class HttpPool:
+    """
+    Keep-alive connection pool shared by all transfers of a run.
+
+    Args:
+        timeout (float): Seconds to wait for connects and reads.
+        max_idle_per_host (int): Idle connections kept open per host.
+    """
+
+    def __init__(self, timeout=REQUEST_TIMEOUT, max_idle_per_host=MAX_IDLE_PER_HOST):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.idle = {}
+        self.ssl_context = ssl.create_default_context()
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def request(self, method, url, headers=None, on_event=None):
+        """
+        Sends a request and returns once the status line and headers arrived.
+
+        The caller must read the body to the end (or close the response) so the
+        connection can go back to the pool.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute http(s) URL.
+            headers (dict): Extra request headers.
+            on_event (callable): Optional callback receiving timings (name, **fields): 'connect'
+                when a new connection had to be opened and 'first_byte' when the headers arrived,
+                each with started (time.monotonic()) and seconds.
+
+        Returns:
+            Response: The response with an unread body.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise TransferError(f"Unsupported URL scheme: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", f"User-Agent: {USER_AGENT}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        while True:
+            started = time.monotonic()
+            conn, reused = await self._acquire(key)
+            if on_event and not reused:
+                on_event("connect", host=parts.netloc, started=started, seconds=time.monotonic() - started)
+            sent = time.monotonic()
+            try:
+                conn.writer.write(payload)
+                await conn.writer.drain()
+                head = await asyncio.wait_for(conn.reader.readuntil(b"\r\n\r\n"), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+                conn.close()
+                if reused:
+                    # The server dropped an idle keep-alive connection; retry on a fresh one.
+                    continue
+                raise TransferError(f"Connection error talking to {parts.netloc}: {e}")
+            except asyncio.TimeoutError:
+                conn.close()
+                raise TransferError(f"Timed out after {self.timeout}s waiting for {parts.netloc}")
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        if on_event:
+            on_event("first_byte", host=parts.netloc, started=sent, seconds=time.monotonic() - sent)
+        conn.requests += 1
+        self.requests_sent += 1
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        version, status, reason = (status_line.split(" ", 2) + [""])[:3]
+        parsed = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                name = name.strip().lower()
+                parsed[name] = parsed[name] + ", " + value.strip() if name in parsed else value.strip()
+        return Response(self, conn, int(status), reason, parsed, method, version)
+
+    async def _acquire(self, key):
+        idle = self.idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof() and not conn.writer.is_closing():
+                return conn, True
+            conn.close()
+        scheme, host, port = key
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=self.ssl_context if scheme == "https" else None,
+                                        limit=2 ** 20),
+                self.timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise TransferError(f"Cannot connect to {host}:{port}: {e or type(e).__name__}")
+        self.connections_opened += 1
+        return _Connection(key, reader, writer), False
+
+    def _release(self, conn):
+        idle = self.idle.setdefault(conn.key, deque())
+        if len(idle) >= self.max_idle_per_host:
+            conn.close()
+        else:
+            idle.append(conn)
+
+    async def close(self):
+        for idle in self.idle.values():
+            while idle:
+                idle.pop().close()
+        self.idle.clear()
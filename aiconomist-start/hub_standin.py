@@ -0,0 +1,482 @@
+"""
+Local stand-in for the Hugging Face Hub, for benchmarks and tests.
+
+Serves the files below a directory with the Hub's /resolve semantics: HEAD or
+GET on /<owner>/<repo>/resolve/<revision>/<path> (also under datasets/ and
+spaces/) answers 302 to /cdn/<path> with X-Linked-Size, X-Linked-Etag and
+X-Repo-Commit, and the CDN path serves the bytes with Range, If-Range, ETag
+and If-None-Match support, like the real CDN.
+
+Bandwidth can be capped in total and per connection, and every response can
+be delayed to emulate a distant CDN. Synthetic multi-GB models are sparse
+files, so benchmarks need neither the disk space nor the time to write them.
+Per-file timings are kept for the benchmark and exposed as JSON on /_stats
+(GET /_reset clears them).
+
+Faults can be injected on a seeded random schedule to measure recovery:
+429 responses with Retry-After, connections reset mid-body, bodies cut short
+of their Content-Length, and bodies that stall for a while. --faults takes a
+preset from FAULT_PROFILES or explicit rates such as reset=0.2,stall=0.05.
+After max_per_file faults a file is served cleanly, so every run can finish.
+
+Usage: python3 hub_standin.py [--root DIR] [--files 2x1G,8x64M] [--port 8765]
+                              [--bandwidth 200M] [--per-connection 50M] [--latency 0.05]
+                              [--faults mixed] [--fault-seed 1] [--stall-seconds 10]
+Point the downloaders at it with HF_ENDPOINT=http://127.0.0.1:8765.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import socket
+import struct
+import argparse
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Configuration ---
+DEFAULT_PORT = 8765
+DEFAULT_ROOT = os.path.join(tempfile.gettempdir(), "hub-standin")
+SEND_CHUNK = 256 * 1024  # Bytes per sendfile() call; also the granularity of bandwidth shaping
+REPO_COMMIT = "0" * 40
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+FAULT_KINDS = ("throttle", "reset", "truncate", "stall")
+FAULT_PROFILES = {  # Probability of each fault per request
+    "none": {},
+    "throttle": {"throttle": 0.3},
+    "resets": {"reset": 0.2},
+    "truncation": {"truncate": 0.2},
+    "stalls": {"stall": 0.1},
+    "mixed": {"throttle": 0.1, "reset": 0.1, "truncate": 0.1, "stall": 0.05},
+}
+DEFAULT_STALL_SECONDS = 10.0
+DEFAULT_MAX_FAULTS_PER_FILE = 3
+RETRY_AFTER = 1  # Seconds announced with injected 429s
+
+_RESOLVE_PATH = re.compile(r"^/(?:(?:datasets|spaces)/)?[^/]+/[^/]+/resolve/[^/]+/(.+)$")
+
+
+def parse_size(text):
+    """Parses '512', '64M', '1.5G' (binary units) into bytes; '0' or '' means no limit (None)."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)i?B?\s*", (text or "0").upper())
+    if not match:
+        raise ValueError(f"Invalid size '{text}'")
+    value = int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+    return value or None
+
+
+def parse_file_spec(spec):
+    """
+    Expands '2x1G,8x64M' into (relative path, size) pairs.
+
+    Returns:
+        list: One pair per synthetic file, named synthetic/<size>-<n>.bin.
+    """
+    files = []
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        count, _, size_text = part.rpartition("x")
+        size = parse_size(size_text)
+        if not size:
+            raise ValueError(f"Invalid file size in '{part}'")
+        for i in range(int(count or 1)):
+            files.append((f"synthetic/{size_text.lower()}-{i:02d}.bin", size))
+    return files
+
+
+def create_synthetic_files(root, files):
+    """Creates sparse files of the given sizes below root (existing files of the right size are kept)."""
+    for rel_path, size in files:
+        path = os.path.join(root, rel_path)
+        if os.path.isfile(path) and os.path.getsize(path) == size:
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.truncate(size)
+
+
+def parse_fault_spec(spec):
+    """
+    Parses a FAULT_PROFILES name or 'kind=rate,...' into a {kind: probability} dict.
+
+    Raises:
+        ValueError: For unknown kinds or rates outside 0..1.
+    """
+    spec = (spec or "none").strip()
+    if spec in FAULT_PROFILES:
+        return dict(FAULT_PROFILES[spec])
+    rates = {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, rate = part.partition("=")
+        if kind not in FAULT_KINDS:
+            raise ValueError(f"Unknown fault '{kind}' (choose from {', '.join(FAULT_KINDS)} "
+                             f"or a profile: {', '.join(FAULT_PROFILES)})")
+        try:
+            rates[kind] = float(rate)
+        except ValueError:
+            raise ValueError(f"Invalid rate in '{part}'")
+        if not 0 <= rates[kind] <= 1:
+            raise ValueError(f"Rate of '{kind}' must be between 0 and 1")
+    return rates
+
+
+class FaultInjector:
+    """
+    Decides, per request, whether to inject a fault.
+
+    Decisions come from a seeded generator, so a fault profile replays the
+    same schedule for the same sequence of requests.
+
+    Args:
+        rates (dict): Fault kind -> probability per request.
+        seed (int): Seed of the schedule.
+        stall_seconds (float): How long a stalled body pauses.
+        max_per_file (int): Faults after which a file is always served cleanly.
+    """
+
+    def __init__(self, rates=None, seed=0, stall_seconds=DEFAULT_STALL_SECONDS,
+                 max_per_file=DEFAULT_MAX_FAULTS_PER_FILE):
+        self.rates = dict(rates or {})
+        self.random = random.Random(seed)
+        self.stall_seconds = stall_seconds
+        self.max_per_file = max_per_file
+        self.lock = threading.Lock()
+        self.per_file = {}
+        self.counts = dict.fromkeys(FAULT_KINDS, 0)
+
+    def _roll(self, rel_path, kinds):
+        with self.lock:
+            if self.per_file.get(rel_path, 0) >= self.max_per_file:
+                return None
+            for kind in kinds:
+                if self.rates.get(kind) and self.random.random() < self.rates[kind]:
+                    self.per_file[rel_path] = self.per_file.get(rel_path, 0) + 1
+                    self.counts[kind] += 1
+                    return kind
+        return None
+
+    def throttled(self, rel_path):
+        """True if this request should get a 429."""
+        return self._roll(rel_path, ("throttle",)) is not None
+
+    def body_fault(self, rel_path, length):
+        """
+        Picks a fault for a response body.
+
+        Returns:
+            tuple: (kind, bytes to send before it strikes), or (None, None).
+        """
+        kind = self._roll(rel_path, ("reset", "truncate", "stall"))
+        if kind is None:
+            return None, None
+        with self.lock:
+            return kind, int(length * self.random.uniform(0.1, 0.9))
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+
+class TokenBucket:
+    """
+    Thread-safe byte-rate limiter; take() blocks long enough to keep the rate.
+
+    Args:
+        rate (int): Bytes per second, or None for no limit.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, nbytes):
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            # A tenth of a second of burst keeps short requests from being delayed needlessly.
+            self.tokens = min(self.rate / 10, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= nbytes
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class TransferStats:
+    """Per-file request counts, bytes sent and first-request / last-byte times."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}
+
+    def _entry(self, rel_path):
+        return self.files.setdefault(rel_path, {"requests": 0, "bytes": 0, "first_request": None, "last_byte": None})
+
+    def request(self, rel_path):
+        with self.lock:
+            entry = self._entry(rel_path)
+            entry["requests"] += 1
+            if entry["first_request"] is None:
+                entry["first_request"] = time.monotonic()
+
+    def sent(self, rel_path, nbytes):
+        with self.lock:
+            entry = self._entry(rel_path)
+            entry["bytes"] += nbytes
+            entry["last_byte"] = time.monotonic()
+
+    def snapshot(self):
+        with self.lock:
+            return {"files": {path: dict(entry) for path, entry in self.files.items()},
+                    "bytes": sum(entry["bytes"] for entry in self.files.values())}
+
+    def reset(self):
+        with self.lock:
+            self.files.clear()
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Request handler; settings and stats live on the server object."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "hub-standin/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def setup(self):
+        super().setup()
+        # One bucket per connection: keep-alive requests share it, like a per-flow cap on a real CDN.
+        self.connection_bucket = TokenBucket(self.server.per_connection)
+
+    def do_HEAD(self):
+        self._dispatch(send_body=False)
+
+    def do_GET(self):
+        self._dispatch(send_body=True)
+
+    def _dispatch(self, send_body):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/_stats":
+            return self._send_json(dict(self.server.stats.snapshot(), faults=self.server.faults.snapshot()))
+        if path == "/_reset":
+            self.server.stats.reset()
+            return self._send_json({"ok": True})
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        match = _RESOLVE_PATH.match(path)
+        if match:
+            return self._resolve(urllib.parse.unquote(match.group(1)))
+        if path.startswith("/cdn/"):
+            return self._serve(urllib.parse.unquote(path[len("/cdn/"):]), send_body)
+        self._send_empty(404, {"X-Error-Code": "RepoNotFound"})
+
+    def _file(self, rel_path):
+        full_path = os.path.realpath(os.path.join(self.server.root, rel_path))
+        if not full_path.startswith(os.path.realpath(self.server.root) + os.sep) or not os.path.isfile(full_path):
+            return None, None
+        return full_path, os.stat(full_path)
+
+    @staticmethod
+    def _etag(stat):
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    def _resolve(self, rel_path):
+        full_path, stat = self._file(rel_path)
+        if full_path is None:
+            return self._send_empty(404, {"X-Error-Code": "EntryNotFound"})
+        self.server.stats.request(rel_path)
+        if self.server.faults.throttled(rel_path):
+            return self._send_empty(429, {"Retry-After": str(RETRY_AFTER), "X-Error-Code": "RateLimited"})
+        # Absolute, like the Hub's redirect to its CDN host: clients must not treat it as a same-site redirect.
+        host = self.headers.get("Host") or self.server.endpoint.split("//", 1)[1]
+        self._send_empty(302, {
+            "Location": f"http://{host}/cdn/" + urllib.parse.quote(rel_path),
+            "X-Linked-Size": str(stat.st_size),
+            "X-Linked-Etag": self._etag(stat),
+            "X-Repo-Commit": REPO_COMMIT,
+            "ETag": self._etag(stat),
+        })
+
+    def _serve(self, rel_path, send_body):
+        full_path, stat = self._file(rel_path)
+        if full_path is None:
+            return self._send_empty(404)
+        size, etag = stat.st_size, self._etag(stat)
+        if send_body and self.server.faults.throttled(rel_path):
+            return self._send_empty(429, {"Retry-After": str(RETRY_AFTER)})
+        if self.headers.get("If-None-Match") == etag:
+            return self._send_empty(304, {"ETag": etag})
+        start, end = 0, size - 1
+        byte_range = self.headers.get("Range")
+        if byte_range and self.headers.get("If-Range") not in (None, etag):
+            byte_range = None  # Changed since the client's copy: send the whole file
+        status = 200
+        if byte_range:
+            match = re.fullmatch(r"bytes=(\d*)-(\d*)", byte_range.strip())
+            if not match or not (match.group(1) or match.group(2)):
+                return self._send_empty(416, {"Content-Range": f"bytes */{size}"})
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start >= size or start > end:
+                return self._send_empty(416, {"Content-Range": f"bytes */{size}"})
+            status = 206
+        self.send_response(status)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(end - start + 1))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if send_body:
+            self.server.stats.request(rel_path)
+            self._send_file(full_path, rel_path, start, end - start + 1)
+
+    def _send_file(self, full_path, rel_path, offset, length):
+        self.wfile.flush()
+        fault, fault_after = self.server.faults.body_fault(rel_path, length)
+        with open(full_path, "rb") as f:
+            while length > 0:
+                if fault is not None and fault_after <= 0:
+                    if fault == "stall":
+                        time.sleep(self.server.faults.stall_seconds)
+                        fault = None
+                        continue
+                    if fault == "reset":
+                        # Zero linger turns the close into a TCP RST, like a CDN node dropping the flow.
+                        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    self.close_connection = True
+                    return
+                chunk = min(SEND_CHUNK, length, fault_after if fault is not None else length)
+                self.server.bucket.take(chunk)
+                self.connection_bucket.take(chunk)
+                try:
+                    sent = os.sendfile(self.connection.fileno(), f.fileno(), offset, chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+                    return
+                if sent == 0:
+                    self.close_connection = True
+                    return
+                offset += sent
+                length -= sent
+                if fault is not None:
+                    fault_after -= sent
+                self.server.stats.sent(rel_path, sent)
+
+    def _send_empty(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in server.
+
+    Args:
+        address (tuple): (host, port); port 0 picks a free one.
+        root (str): Directory whose files are served.
+        bandwidth (int): Total bytes/s across all connections, or None.
+        per_connection (int): Bytes/s per connection, or None.
+        latency (float): Seconds added before every response.
+        faults (FaultInjector): Fault schedule; replace it to change faults between runs.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, root, bandwidth=None, per_connection=None, latency=0.0, faults=None,
+                 verbose=False):
+        super().__init__(address, StandinHandler)
+        self.root = root
+        self.bucket = TokenBucket(bandwidth)
+        self.per_connection = per_connection
+        self.latency = latency
+        self.verbose = verbose
+        self.stats = TransferStats()
+        self.faults = faults or FaultInjector()
+
+    @property
+    def endpoint(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_standin(root, host="127.0.0.1", port=0, **kwargs):
+    """Starts a StandinServer on a background thread and returns it (call shutdown() to stop)."""
+    server = StandinServer((host, port), root, **kwargs)
+    threading.Thread(target=server.serve_forever, name="hub-standin", daemon=True).start()
+    return server
+
+
+def add_shaping_arguments(parser):
+    """Adds the shaping and fault schedule options shared with benchmark.py."""
+    parser.add_argument("--bandwidth", default="0", help="Total bandwidth cap, e.g. 200M (bytes/s; 0 = none)")
+    parser.add_argument("--per-connection", default="0", help="Bandwidth cap per connection, e.g. 50M (0 = none)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added before every response")
+    parser.add_argument("--fault-seed", type=int, default=1, help="Seed of the fault schedule (default: 1)")
+    parser.add_argument("--stall-seconds", type=float, default=DEFAULT_STALL_SECONDS,
+                        help=f"Pause of a stalled body (default: {DEFAULT_STALL_SECONDS:g})")
+    return parser
+
+
+def main():
+    """Serves a directory (plus optional synthetic files) until interrupted."""
+    parser = argparse.ArgumentParser(description="Local Hugging Face Hub stand-in for benchmarks and tests.")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help=f"Directory to serve (default: {DEFAULT_ROOT})")
+    parser.add_argument("--files", default="", help="Synthetic sparse files to create first, e.g. 2x1G,8x64M")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--faults", default="none",
+                        help=f"Fault profile ({', '.join(FAULT_PROFILES)}) or rates like reset=0.2,stall=0.05")
+    add_shaping_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        files = parse_file_spec(args.files)
+        bandwidth, per_connection = parse_size(args.bandwidth), parse_size(args.per_connection)
+        faults = FaultInjector(parse_fault_spec(args.faults), args.fault_seed, args.stall_seconds)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    create_synthetic_files(args.root, files)
+    server = StandinServer((args.host, args.port), args.root, bandwidth, per_connection, args.latency, faults,
+                           args.verbose)
+    print(f"🛰️  Hub stand-in serving {args.root} on {server.endpoint}")
+    for rel_path, size in files:
+        print(f"   {server.endpoint}/bench/synthetic/resolve/main/{rel_path} ({size} bytes)")
+    print(f"   Use it with HF_ENDPOINT={server.endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
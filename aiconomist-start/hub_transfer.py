@@ -0,0 +1,457 @@
+"""
+Resolution and (segmented) transfer of Hugging Face files over an HttpPool.
+
+A single stream is capped by the throughput of one TCP flow, which makes
+14-28GB checkpoints painfully slow. Files above SEGMENT_THRESHOLD are split
+into SEGMENT_SIZE byte ranges that parallel connections take in file order and
+write straight into a preallocated file with os.pwrite. Segment progress is
+checkpointed to a sidecar next to the partial file, so an interrupted run
+resumes every segment where it stopped instead of starting from zero.
+
+The sha256 of every file is computed while its bytes arrive and compared with
+the LFS oid the Hub advertises, so a corrupted or truncated transfer is never
+renamed into place. Because the connections work through the file front to
+back, the hashed prefix trails the newest writes by only a few segments.
+
+Callers that want to observe a transfer pass on_event, which receives an
+event name and its fields: 'retry' (error, attempt) before each retry,
+'disk_write' (bytes, seconds) for every write to the partial file, the
+'connect' and 'first_byte' timings of HttpPool.request and 'verify'
+(started, seconds) for the final hash.
+"""
+
+import os
+import re
+import json
+import time
+import errno
+import ctypes
+import asyncio
+import hashlib
+import collections
+import urllib.parse
+
+from http_pool import TransferError
+
+# --- Configuration ---
+HF_ENDPOINT = os.environ.get("HF_ENDPOINT", "https://huggingface.co").rstrip("/")
+SEGMENT_THRESHOLD = 512 * 1024 * 1024  # Files at least this large are fetched in segments
+SEGMENT_CONNECTIONS = int(os.environ.get("SEGMENT_CONNECTIONS", "8"))  # Parallel connections per file
+SEGMENT_SIZE = 16 * 1024 * 1024  # Byte range a connection fetches before taking the next one
+CHUNK_SIZE = 1024 * 1024  # Bytes buffered before each pwrite
+STATE_FLUSH_INTERVAL = 2.0  # Seconds between sidecar checkpoints
+HASH_CATCH_UP = 2 * CHUNK_SIZE  # Bytes of out-of-order data re-read from the page cache per write
+MAX_RETRIES = 5
+MAX_REDIRECTS = 5
+
+PARTIAL_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _fallocate = _libc.fallocate
+    _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+except (OSError, AttributeError):
+    _fallocate = None
+
+
+class RemoteFile:
+    """Metadata of a resolved download URL."""
+
+    def __init__(self, url, size, etag=None, sha256=None, commit=None, accepts_ranges=False):
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.sha256 = sha256
+        self.commit = commit
+        self.accepts_ranges = accepts_ranges
+
+
+def hub_file_url(repo_id, filename, repo_type=None, revision="main"):
+    """Builds the /resolve URL of a file in a Hugging Face repository."""
+    prefix = ""
+    if repo_type == "dataset":
+        prefix = "datasets/"
+    elif repo_type == "space":
+        prefix = "spaces/"
+    return "{}/{}{}/resolve/{}/{}".format(
+        HF_ENDPOINT,
+        prefix,
+        repo_id,
+        urllib.parse.quote(revision, safe=""),
+        urllib.parse.quote(filename, safe="/"),
+    )
+
+
+def get_hf_token():
+    """Returns the Hugging Face token from the environment or the hub login cache."""
+    token = os.environ.get("HF_TOKEN") or os.environ.get("EXPORT_HF_TOKEN")
+    if token:
+        return token.strip()
+    hf_home = os.environ.get("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface"))
+    token_path = os.path.join(hf_home, "token")
+    try:
+        with open(token_path, "r") as token_file:
+            return token_file.read().strip() or None
+    except OSError:
+        return None
+
+
+def auth_headers(url):
+    """Request headers for url; the HF token is only sent to the configured hub endpoint."""
+    headers = {"Accept-Encoding": "identity"}
+    token = get_hf_token()
+    if token and urllib.parse.urlsplit(url).netloc == urllib.parse.urlsplit(HF_ENDPOINT).netloc:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def raise_for_status(response, url):
+    if response.status in (401, 403):
+        raise TransferError(f"Access denied ({response.status}) for {url}. The repository may be gated or private.", response.status)
+    if response.status == 404:
+        raise TransferError(f"Not found (404): {url}", response.status)
+    if response.status >= 400:
+        raise TransferError(f"HTTP {response.status} {response.reason} for {url}", response.status)
+
+
+def is_retryable(error):
+    """Connection problems, timeouts, 429 and 5xx are worth retrying; other HTTP errors are final."""
+    status = getattr(error, "status", None)
+    return status is None or status == 429 or status >= 500
+
+
+async def fetch_remote_file(pool, url):
+    """
+    Resolves a download URL with HEAD requests, following redirects manually.
+
+    The first hop on the hub carries the LFS metadata (X-Linked-Size and
+    X-Linked-Etag hold the size and sha256 of the real file), later hops
+    point at the CDN that actually serves the bytes.
+
+    Args:
+        pool (HttpPool): Connection pool to use.
+        url (str): URL to resolve.
+
+    Returns:
+        RemoteFile: Final URL, size and validators of the file.
+    """
+    linked_size = linked_etag = commit = None
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await pool.request("HEAD", url, auth_headers(url))
+        linked_size = linked_size or response.getheader("X-Linked-Size")
+        linked_etag = linked_etag or response.getheader("X-Linked-Etag")
+        commit = commit or response.getheader("X-Repo-Commit")
+
+        if response.status in (301, 302, 303, 307, 308):
+            location = response.getheader("Location")
+            if not location:
+                raise TransferError(f"Redirect without Location header from {url}", response.status)
+            url = urllib.parse.urljoin(url, location)
+            continue
+
+        raise_for_status(response, url)
+        etag = (linked_etag or response.getheader("ETag") or "").replace("W/", "").strip('"') or None
+        size = response.getheader("Content-Length") or linked_size
+        return RemoteFile(
+            url=url,
+            size=int(size) if size is not None else None,
+            etag=etag,
+            sha256=_lfs_sha256(linked_etag),
+            commit=commit,
+            accepts_ranges=response.getheader("Accept-Ranges", "").lower() == "bytes",
+        )
+    raise TransferError(f"Too many redirects resolving {url}")
+
+
+def _lfs_sha256(linked_etag):
+    # X-Linked-Etag carries the LFS oid, which is the sha256 of the content.
+    value = (linked_etag or "").replace("W/", "").strip('"').lower()
+    return value if re.fullmatch(r"[0-9a-f]{64}", value) else None
+
+
+def _plan_segments(size):
+    step = SEGMENT_SIZE if size >= SEGMENT_THRESHOLD else max(1, size)
+    return [{"start": start, "end": min(start + step, size), "offset": start} for start in range(0, size, step)]
+
+
+def _load_state(state_path, remote):
+    try:
+        with open(state_path, "r") as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    if state.get("size") != remote.size or state.get("etag") != remote.etag:
+        return None
+    return state
+
+
+def preallocate(fd, size):
+    """
+    Reserves size bytes for fd with fallocate(2).
+
+    Allocating all extents up front avoids fragmentation and slow extent growth
+    on network volumes, and a full disk fails here instead of after an hour.
+    Filesystems without fallocate support get a sparse file via ftruncate.
+    """
+    if _fallocate is not None and _fallocate(fd, 0, 0, size) == 0:
+        return
+    err = ctypes.get_errno() if _fallocate is not None else 0
+    if err == errno.ENOSPC:
+        raise TransferError(f"Not enough disk space to preallocate {size} bytes")
+    os.ftruncate(fd, size)
+
+
+def _save_state(state_path, state):
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(tmp_path, state_path)
+
+
+class _StreamHasher:
+    """
+    sha256 of a file whose segments are written out of order.
+
+    Bytes written exactly at the hashed frontier are hashed straight from
+    memory. Data that other connections wrote further ahead is picked up from
+    the page cache in small steps as the frontier reaches it. Since segments
+    are handed out in file order, that is at most a few segments per
+    connection; only what a stalled connection held back (and the bytes of a
+    resumed run) is left for finish() to read after the transfer.
+    """
+
+    def __init__(self, fd, segments):
+        self.fd = fd
+        self.segments = sorted(segments, key=lambda segment: segment["start"])
+        self.index = 0
+        self.position = 0
+        self.digest = hashlib.sha256()
+
+    def wrote(self, position, data):
+        if position == self.position:
+            self.digest.update(data)
+            self.position += len(data)
+        self.catch_up(HASH_CATCH_UP)
+
+    def _written_until(self):
+        # End of the contiguous written prefix: the offset of the first unfinished segment.
+        while self.index < len(self.segments) and self.segments[self.index]["offset"] >= self.segments[self.index]["end"]:
+            self.index += 1
+        if self.index == len(self.segments):
+            return self.segments[-1]["end"] if self.segments else 0
+        return self.segments[self.index]["offset"]
+
+    def catch_up(self, budget=None):
+        while budget is None or budget > 0:
+            available = self._written_until() - self.position
+            if available <= 0:
+                return
+            size = min(available, CHUNK_SIZE, budget or CHUNK_SIZE)
+            data = os.pread(self.fd, size, self.position)
+            if not data:
+                return
+            self.digest.update(data)
+            self.position += len(data)
+            if budget is not None:
+                budget -= len(data)
+
+    def finish(self):
+        self.catch_up()
+        return self.digest.hexdigest()
+
+
+def _verify(remote, digest, part_path):
+    """Deletes the partial file and raises if the digest does not match the LFS oid."""
+    if remote.sha256 and digest != remote.sha256:
+        os.remove(part_path)
+        raise TransferError(f"Checksum mismatch for {remote.url}: expected sha256 {remote.sha256}, got {digest}")
+
+
+class _SegmentWriter:
+    """Shared bookkeeping for the segments of one file."""
+
+    def __init__(self, fd, state, state_path, on_progress=None, on_event=None):
+        self.fd = fd
+        self.state = state
+        self.state_path = state_path
+        self.on_progress = on_progress
+        self.on_event = on_event
+        self.hasher = _StreamHasher(fd, state["segments"])
+        self.last_flush = time.monotonic()
+
+    def write(self, segment, data):
+        position = segment["offset"]
+        started = time.monotonic()
+        os.pwrite(self.fd, data, position)
+        if self.on_event:
+            self.on_event("disk_write", bytes=len(data), seconds=time.monotonic() - started)
+        segment["offset"] += len(data)
+        self.hasher.wrote(position, data)
+        if time.monotonic() - self.last_flush >= STATE_FLUSH_INTERVAL:
+            self.flush()
+        if self.on_progress:
+            self.on_progress(len(data))
+
+    def flush(self):
+        _save_state(self.state_path, self.state)
+        self.last_flush = time.monotonic()
+
+
+async def _fetch_segment(pool, url, writer, segment):
+    """Streams one byte range into its slice of the partial file, retrying from the last offset."""
+    attempt = 0
+    while segment["offset"] < segment["end"]:
+        headers = auth_headers(url)
+        headers["Range"] = f"bytes={segment['offset']}-{segment['end'] - 1}"
+        buffer = bytearray()
+        try:
+            async with await pool.request("GET", url, headers, writer.on_event) as response:
+                raise_for_status(response, url)
+                if response.status != 206:
+                    raise TransferError(f"Server ignored Range request for {url} (status {response.status})")
+                while segment["offset"] + len(buffer) < segment["end"]:
+                    data = await response.read(min(CHUNK_SIZE, segment["end"] - segment["offset"] - len(buffer)))
+                    if not data:
+                        raise TransferError(f"Connection closed early at byte {segment['offset'] + len(buffer)}")
+                    buffer += data
+                    if len(buffer) >= CHUNK_SIZE:
+                        writer.write(segment, buffer)
+                        buffer = bytearray()
+                        attempt = 0
+                if buffer:
+                    writer.write(segment, buffer)
+        except TransferError as e:
+            if buffer:
+                writer.write(segment, buffer)
+            if not is_retryable(e):
+                raise
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise TransferError(f"Segment {segment['start']}-{segment['end']} failed after {MAX_RETRIES} retries: {e}")
+            if writer.on_event:
+                writer.on_event("retry", error=str(e), attempt=attempt)
+            await asyncio.sleep(min(30, 2 ** attempt))
+
+
+async def _fetch_segments(pool, url, writer, queue):
+    """Takes segments off the shared queue, lowest offset first, until none are left."""
+    while queue:
+        await _fetch_segment(pool, url, writer, queue.popleft())
+
+
+async def segmented_download(pool, remote, dest_path, connections=SEGMENT_CONNECTIONS, on_progress=None,
+                             on_state=None, on_event=None):
+    """
+    Downloads a file over one or more parallel range requests.
+
+    Files below SEGMENT_THRESHOLD use a single range, but still resume from the
+    sidecar after an interruption. Larger files are cut into SEGMENT_SIZE
+    ranges that up to connections workers take in file order. Resumed bytes
+    are hashed from disk once.
+
+    Args:
+        pool (HttpPool): Connection pool to use.
+        remote (RemoteFile): Resolved file; must report its size and accept ranges.
+        dest_path (str): Final path of the file.
+        connections (int): Maximum number of parallel connections.
+        on_progress (callable): Optional callback receiving byte counts as they arrive.
+        on_state (callable): Optional callback receiving the live segment state once the
+            partial file exists; segment offsets show how far each range is written.
+        on_event (callable): Optional callback receiving transfer events (name, **fields).
+
+    Returns:
+        str: Hex sha256 of the downloaded file.
+    """
+    part_path = dest_path + PARTIAL_SUFFIX
+    state_path = dest_path + STATE_SUFFIX
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+
+    state = _load_state(state_path, remote) if os.path.exists(part_path) else None
+
+    fd = os.open(part_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if state is None or os.fstat(fd).st_size != remote.size:
+            # Nothing to resume: start over on freshly allocated space.
+            state = {"url": remote.url, "size": remote.size, "etag": remote.etag,
+                     "segments": _plan_segments(remote.size)}
+            os.ftruncate(fd, 0)
+            try:
+                preallocate(fd, remote.size)
+            except TransferError:
+                os.remove(part_path)
+                raise
+        writer = _SegmentWriter(fd, state, state_path, on_progress, on_event)
+        writer.flush()
+        if on_state:
+            on_state(state)
+
+        queue = collections.deque(sorted((segment for segment in state["segments"] if segment["offset"] < segment["end"]),
+                                         key=lambda segment: segment["start"]))
+        resumed = remote.size - sum(s["end"] - s["offset"] for s in state["segments"])
+        if on_progress and resumed:
+            on_progress(resumed)
+        tasks = [asyncio.ensure_future(_fetch_segments(pool, remote.url, writer, queue))
+                 for _ in range(max(1, min(connections, len(queue))))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            writer.flush()
+        started = time.monotonic()
+        digest = await asyncio.get_running_loop().run_in_executor(None, writer.hasher.finish)
+        if on_event:
+            on_event("verify", started=started, seconds=time.monotonic() - started)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    os.remove(state_path)
+    _verify(remote, digest, part_path)
+    os.replace(part_path, dest_path)
+    return digest
+
+
+async def stream_download(pool, remote, dest_path, on_progress=None, on_event=None):
+    """Downloads a file over a single GET, for servers without range support or size."""
+    part_path = dest_path + PARTIAL_SUFFIX
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    digest = hashlib.sha256()
+    received = 0
+    async with await pool.request("GET", remote.url, auth_headers(remote.url), on_event) as response:
+        raise_for_status(response, remote.url)
+        with open(part_path, "wb") as part_file:
+            while True:
+                data = await response.read(CHUNK_SIZE)
+                if not data:
+                    break
+                started = time.monotonic()
+                part_file.write(data)
+                if on_event:
+                    on_event("disk_write", bytes=len(data), seconds=time.monotonic() - started)
+                digest.update(data)
+                received += len(data)
+                if on_progress:
+                    on_progress(len(data))
+    if remote.size is not None and received != remote.size:
+        os.remove(part_path)
+        raise TransferError(f"Truncated download of {remote.url}: got {received} of {remote.size} bytes")
+    _verify(remote, digest.hexdigest(), part_path)
+    os.replace(part_path, dest_path)
+    return digest.hexdigest()
+
+
+async def download_file(pool, remote, dest_path, connections=SEGMENT_CONNECTIONS, on_progress=None, on_event=None):
+    """
+    Downloads a resolved file, segmented and resumable when the server allows it.
+
+    Returns:
+        str: Hex sha256 of the downloaded file, verified against the LFS oid when known.
+    """
+    if remote.size is not None and remote.accepts_ranges and remote.size > 0:
+        return await segmented_download(pool, remote, dest_path, connections, on_progress, on_event=on_event)
+    return await stream_download(pool, remote, dest_path, on_progress, on_event)
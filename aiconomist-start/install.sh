@@ -10,7 +10,8 @@ set -euo pipefail
 cd "$(dirname "$0")"
 
 # ──────────────────────────────────────────────
-#  Locate a Python interpreter
+#  Locate a Python interpreter (the downloaders only need the
+#  standard library, so nothing is pip-installed)
 # ──────────────────────────────────────────────
 if command -v python3 >/dev/null 2>&1; then
     PYTHON=python3
@@ -21,28 +22,24 @@ else
     exit 1
 fi
 
-# ──────────────────────────────────────────────
-#  Ensure pip is available
-# ──────────────────────────────────────────────
-if ! command -v pip >/dev/null 2>&1; then
-    echo "pip not found – installing with ensurepip…"
-    "$PYTHON" -m ensurepip --upgrade
-fi
-
-# ──────────────────────────────────────────────
-#  Install / upgrade required Python packages
-# ──────────────────────────────────────────────
-echo "Installing required Python packages (hf_transfer, huggingface_hub)…"
-"$PYTHON" -m pip install --quiet --upgrade \
-    hf_transfer \
-    'huggingface_hub[cli,tqdm]' \
-    'huggingface_hub[hf_xet]'
-
 # ──────────────────────────────────────────────
 #  Helper: pause until user hits <Enter>
 # ──────────────────────────────────────────────
 pause() { read -rp "Press Enter to continue…"; }
 
+# Menu number → profile under profiles/, for installing several at once
+PROFILES=(
+    [1]=flux-dev-fp8
+    [2]=flux-dev-gguf
+    [3]=flux-kontext-gguf
+    [4]=wan21-infinitetalk-gguf
+    [5]=wan21-vace-gguf
+    [6]=wan21-phantom-gguf
+    [7]=sdxl-ipadapter-nsfw
+    [8]=wan22-t2v
+    [9]=wan22-i2v
+)
+
 # ──────────────────────────────────────────────
 #  Main menu loop
 # ──────────────────────────────────────────────
@@ -64,19 +61,22 @@ Choose a model to download:
 7) NSFW Lessons Models  (Adult Content)
 8) Wan 2.2 T2V Models   (Text-to-Video)
 9) Wan 2.2 I2V Models   (Image-to-Video)
-9) Exit
+10) Exit
+11) Several of the above in one run (shared files fetched once)
 
 ================================================
 EOF
     echo
-    read -rp "Enter your choice (1-10): " choice
+    read -rp "Enter your choice (1-11): " choice
     echo
 
     case "$choice" in
         1) 
             echo "🚀 Running Flux Dev FP8 downloader…"
             if [[ -f "Download_fluxDev_models_FP8.py" ]]; then
-                "$PYTHON" Download_fluxDev_models_FP8.py
+                if ! "$PYTHON" Download_fluxDev_models_FP8.py; then
+                    echo "❌ Download_fluxDev_models_FP8.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_fluxDev_models_FP8.py not found in current directory."
             fi
@@ -84,7 +84,9 @@ EOF
         2) 
             echo "🚀 Running Flux Dev GGUF downloader…"
             if [[ -f "Download_fluxDev_models_GGUF.py" ]]; then
-                "$PYTHON" Download_fluxDev_models_GGUF.py
+                if ! "$PYTHON" Download_fluxDev_models_GGUF.py; then
+                    echo "❌ Download_fluxDev_models_GGUF.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_fluxDev_models_GGUF.py not found in current directory."
             fi
@@ -92,7 +94,9 @@ EOF
         3) 
             echo "🚀 Running Flux Kontext GGUF downloader…"
             if [[ -f "Download_models_Flux_Kontext_GGUF.py" ]]; then
-                "$PYTHON" Download_models_Flux_Kontext_GGUF.py
+                if ! "$PYTHON" Download_models_Flux_Kontext_GGUF.py; then
+                    echo "❌ Download_models_Flux_Kontext_GGUF.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_models_Flux_Kontext_GGUF.py not found in current directory."
             fi
@@ -100,7 +104,9 @@ EOF
         4) 
             echo "🚀 Running Wan 2.1 GGUF downloader…"
             if [[ -f "Download_models_GGUF.py" ]]; then
-                "$PYTHON" Download_models_GGUF.py
+                if ! "$PYTHON" Download_models_GGUF.py; then
+                    echo "❌ Download_models_GGUF.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_models_GGUF.py not found in current directory."
             fi
@@ -108,7 +114,9 @@ EOF
         5) 
             echo "🚀 Running Wan 2.1 Vace GGUF downloader…"
             if [[ -f "Download_models_GGUF_VACE.py" ]]; then
-                "$PYTHON" Download_models_GGUF_VACE.py
+                if ! "$PYTHON" Download_models_GGUF_VACE.py; then
+                    echo "❌ Download_models_GGUF_VACE.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_models_GGUF_VACE.py not found in current directory."
             fi
@@ -116,7 +124,9 @@ EOF
         6) 
             echo "🚀 Running Wan 2.1 Phantom GGUF downloader…"
             if [[ -f "Download_models_GGUF_PHANTOM.py" ]]; then
-                "$PYTHON" Download_models_GGUF_PHANTOM.py
+                if ! "$PYTHON" Download_models_GGUF_PHANTOM.py; then
+                    echo "❌ Download_models_GGUF_PHANTOM.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_models_GGUF_PHANTOM.py not found in current directory."
             fi
@@ -124,7 +134,9 @@ EOF
         7) 
             echo "🚀 Running NSFW Lessons Models downloader…"
             if [[ -f "Download_models_NSFW.py" ]]; then
-                "$PYTHON" Download_models_NSFW.py
+                if ! "$PYTHON" Download_models_NSFW.py; then
+                    echo "❌ Download_models_NSFW.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_models_NSFW.py not found in current directory."
             fi
@@ -132,7 +144,9 @@ EOF
         8) 
             echo "🚀 Running Wan 2.2 T2V Models downloader…"
             if [[ -f "Download_wan2-2_T2V.py" ]]; then
-                "$PYTHON" Download_wan2-2_T2V.py
+                if ! "$PYTHON" Download_wan2-2_T2V.py; then
+                    echo "❌ Download_wan2-2_T2V.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_wan2-2_T2V.py not found in current directory."
             fi
@@ -140,7 +154,9 @@ EOF
         9) 
             echo "🚀 Running Wan 2.2 I2V Models downloader…"
             if [[ -f "Download_wan2-2_I2V.py" ]]; then
-                "$PYTHON" Download_wan2-2_I2V.py
+                if ! "$PYTHON" Download_wan2-2_I2V.py; then
+                    echo "❌ Download_wan2-2_I2V.py finished with errors; see the messages above."
+                fi
             else
                 echo "❌ Error: Download_wan2-2_I2V.py not found in current directory."
             fi
@@ -149,8 +165,29 @@ EOF
             echo "✅ Exiting..."
             echo "Thank you for using the AI Model Downloader!"
             exit 0 ;;
+        11) 
+            read -rp "Enter the model numbers to install together (e.g. 1 8 9): " -a picks
+            profiles=()
+            for pick in "${picks[@]}"; do
+                # Indexed array subscripts are arithmetic, so only plain numbers may reach the lookup
+                if [[ $pick =~ ^[1-9][0-9]*$ && -n "${PROFILES[$pick]:-}" ]]; then
+                    profiles+=("${PROFILES[$pick]}")
+                else
+                    echo "⚠️  Ignoring unknown choice '$pick'."
+                fi
+            done
+            if (( ${#profiles[@]} )); then
+                echo "🚀 Installing ${profiles[*]} as one run…"
+                # set -e would otherwise leave the menu when one of the profiles fails
+                if ! "$PYTHON" profile_manifest.py "${profiles[@]}"; then
+                    echo "❌ Some downloads failed; see the messages above. Choose again to resume them."
+                fi
+            else
+                echo "❌ No models selected."
+            fi
+            pause ;;
         *) 
-            echo "❌ Invalid choice '$choice'. Please enter a number between 1-9."
+            echo "❌ Invalid choice '$choice'. Please enter a number between 1-11."
             pause ;;
     esac
 done
\ No newline at end of file
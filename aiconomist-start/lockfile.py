@@ -0,0 +1,131 @@
+"""
+Per-install lockfile of verified downloads.
+
+Every file the engine places is recorded with the repo it came from, its size,
+mtime and the sha256 computed while it was downloaded. On the next run a file
+is only skipped when its lockfile entry still matches what is on disk and the
+task still asks for the same repo, file and revision, so a file truncated by
+a killed run, edited by hand or now meant to come from elsewhere is noticed
+instead of being treated as done because it exists.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+
+# --- Configuration ---
+LOCKFILE_PATH = os.environ.get("MODEL_LOCKFILE", os.path.join("ComfyUI", "models", "models.lock.json"))
+LOCKFILE_VERSION = 1
+HASH_READ_SIZE = 8 * 1024 * 1024
+
+
+def file_sha256(path):
+    """Hashes an existing file (used once for files that predate the lockfile)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def same_source(entry, task):
+    """
+    True if a lockfile entry was recorded for the repo, file and revision a task asks for.
+
+    A revision that is a full commit hash must also match the commit the file was downloaded at.
+    """
+    revision = task.get("revision") or None
+    if (entry.get("repo_id") != task.get("repo_id") or entry.get("filename") != task.get("filename")
+            or entry.get("repo_type", "model") != (task.get("repo_type") or "model")
+            or entry.get("revision") != revision):
+        return False
+    return not (revision and re.fullmatch(r"[0-9a-f]{40}", revision) and entry.get("commit") != revision)
+
+
+class Lockfile:
+    """
+    JSON map of destination path -> verified file metadata.
+
+    Args:
+        path (str): Location of the lockfile.
+    """
+
+    def __init__(self, path=LOCKFILE_PATH):
+        self.path = path
+        self.files = self._read()
+        self.removed = set()
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as lock_file:
+                data = json.load(lock_file)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != LOCKFILE_VERSION:
+            return {}
+        return data.get("files", {})
+
+    @staticmethod
+    def _key(dest_path):
+        return os.path.normpath(dest_path)
+
+    def entry(self, dest_path):
+        return self.files.get(self._key(dest_path))
+
+    def is_current(self, dest_path, task):
+        """True if dest_path exists, is unchanged since it was verified and was recorded for the same source as task."""
+        entry = self.entry(dest_path)
+        if entry is None or not same_source(entry, task):
+            return False
+        try:
+            stat = os.stat(dest_path)
+        except OSError:
+            return False
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+    def record(self, dest_path, task, remote, sha256):
+        """
+        Stores a verified file and writes the lockfile.
+
+        Args:
+            dest_path (str): Final path of the file.
+            task (dict): Download task it belongs to.
+            remote (RemoteFile): Resolved metadata (commit, LFS oid).
+            sha256 (str): Digest of the bytes on disk, if known.
+        """
+        stat = os.stat(dest_path)
+        self.removed.discard(self._key(dest_path))
+        self.files[self._key(dest_path)] = {
+            "repo_id": task["repo_id"],
+            "repo_type": task.get("repo_type") or "model",
+            "filename": task["filename"],
+            "commit": remote.commit,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+            "verified_at": int(time.time()),
+        }
+        for field in ("revision", "profile"):
+            if task.get(field):
+                self.files[self._key(dest_path)][field] = task[field]
+        self.save()
+
+    def forget(self, dest_path):
+        if self.files.pop(self._key(dest_path), None) is not None:
+            self.removed.add(self._key(dest_path))
+            self.save()
+
+    def save(self):
+        # Merge with the file on disk so concurrent installers do not drop each other's entries.
+        merged = self._read()
+        merged.update(self.files)
+        for key in self.removed:
+            merged.pop(key, None)
+        self.files = merged
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as lock_file:
+            json.dump({"version": LOCKFILE_VERSION, "files": merged}, lock_file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
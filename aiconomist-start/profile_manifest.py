@@ -0,0 +1,536 @@
+"""
+Declarative download profiles for the Download_*.py scripts.
+
+Every script used to carry its own task lists, VRAM menus and summary code,
+and the copies drifted apart. The lists now live in versioned JSON manifests
+under profiles/; this module validates a manifest, picks the variant to
+install (interactively, or from --variant), and hands the tasks to the shared
+DownloadEngine, so every profile gets the same parallel, resumable and
+verified path. The scripts only name their profile; several profiles can be
+installed together as one de-duplicated run:
+
+    python3 profile_manifest.py flux-dev-fp8 wan22-t2v wan22-i2v --variant fp8
+
+Manifest format (schema 1):
+    {
+      "schema": 1,
+      "name": "wan22-i2v",              # must match the file name
+      "version": 1,                     # bumped whenever the task lists change
+      "title": "Wan2.2 I2V models",
+      "description": ["..."],           # optional banner lines
+      "max_concurrency": 8,             # optional engine ceiling
+      "tasks": [<task>, ...],           # installed for every variant
+      "variants": {                     # optional
+        "prompt": "Choose which model type to download",
+        "groups": [{"id": "12gb", "label": "12GB"}],      # optional first menu
+        "options": [{"id": "gguf", "label": "...", "groups": ["12gb"],
+                     "description": ["..."], "tasks": [<task>, ...]}]
+      },
+      "confirm": "...",                 # optional warning that needs a y/N answer
+      "notes": ["..."]                  # optional lines printed after success
+    }
+
+A task has repo_id, filename and local_dir, plus optional repo_type
+(model, dataset or space), revision, rename_to and extract_and_delete.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from download_engine import DownloadEngine, add_engine_arguments, count_statuses, task_destination
+from concurrency import DEFAULT_MAX_CONCURRENCY, check_concurrency_arguments
+
+# --- Configuration ---
+PROFILES_DIR = os.environ.get("MODEL_PROFILES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_SCHEMA = 1
+BASE_DOWNLOAD_DIR = "ComfyUI/models"
+REPO_TYPES = ("model", "dataset", "space")
+TASK_FIELDS = ("repo_id", "repo_type", "revision", "filename", "local_dir", "rename_to", "extract_and_delete")
+
+
+class ProfileError(Exception):
+    """Raised when a profile manifest is missing or malformed."""
+
+
+class Variant:
+    """One selectable option of a profile (a quant level, a precision, ...)."""
+
+    def __init__(self, id, label, groups, description, tasks):
+        self.id = id
+        self.label = label
+        self.groups = groups
+        self.description = description
+        self.tasks = tasks
+
+
+class Profile:
+    """
+    A validated profile manifest.
+
+    Attributes:
+        name (str): Profile name, also the manifest's file name.
+        version (int): Manifest version, recorded with every task.
+        tasks (list): Tasks installed for every variant.
+        variants (list): Variant objects; empty if the profile has no choices.
+    """
+
+    def __init__(self, data, path):
+        self.path = path
+        self.name = data["name"]
+        self.version = data["version"]
+        self.title = data.get("title") or self.name
+        self.description = data.get("description") or []
+        self.max_concurrency = data.get("max_concurrency") or DEFAULT_MAX_CONCURRENCY
+        self.confirm = data.get("confirm")
+        self.notes = data.get("notes") or []
+        self.tasks = data["tasks"]
+        variants = data.get("variants") or {}
+        self.prompt = variants.get("prompt") or "Choose a variant"
+        self.groups = variants.get("groups") or []
+        self.variants = [Variant(option["id"], option.get("label") or option["id"], option.get("groups") or [],
+                                 option.get("description") or [], option.get("tasks") or [])
+                         for option in variants.get("options") or []]
+
+    @property
+    def tag(self):
+        return f"{self.name}@{self.version}"
+
+    def variant(self, variant_id):
+        """
+        Looks up a variant by id (case-insensitive).
+
+        Raises:
+            ProfileError: If the profile has no such variant.
+        """
+        for variant in self.variants:
+            if variant.id.lower() == variant_id.lower():
+                return variant
+        choices = ", ".join(variant.id for variant in self.variants) or "none"
+        raise ProfileError(f"Profile '{self.name}' has no variant '{variant_id}' (choices: {choices})")
+
+    def tasks_for(self, variant=None):
+        """
+        Expands the profile into engine task dicts.
+
+        Variant tasks come first so the headline models are listed before the
+        shared extras. Every task is tagged with the profile it came from.
+
+        Returns:
+            list: Fresh task dicts.
+        """
+        selected = (variant.tasks if variant else []) + self.tasks
+        return [dict(task, profile=self.tag) for task in selected]
+
+
+def _check_task(task, where):
+    if not isinstance(task, dict):
+        raise ProfileError(f"{where}: task must be an object")
+    unknown = set(task) - set(TASK_FIELDS)
+    if unknown:
+        raise ProfileError(f"{where}: unknown field(s) {', '.join(sorted(unknown))}")
+    for field in ("repo_id", "filename", "local_dir"):
+        if not isinstance(task.get(field), str) or not task[field].strip():
+            raise ProfileError(f"{where}: '{field}' is required")
+    if task.get("repo_type", "model") not in REPO_TYPES:
+        raise ProfileError(f"{where}: repo_type must be one of {', '.join(REPO_TYPES)}")
+    if not isinstance(task.get("extract_and_delete", False), bool):
+        raise ProfileError(f"{where}: extract_and_delete must be true or false")
+    if os.path.isabs(task["local_dir"]) or ".." in task["local_dir"].split("/"):
+        raise ProfileError(f"{where}: local_dir must be a relative path inside the install")
+
+
+def validate_profile(data, name):
+    """
+    Checks a parsed manifest against the schema.
+
+    Raises:
+        ProfileError: Describing the first problem found.
+    """
+    if not isinstance(data, dict):
+        raise ProfileError(f"{name}: manifest must be a JSON object")
+    if data.get("schema") != PROFILE_SCHEMA:
+        raise ProfileError(f"{name}: unsupported schema {data.get('schema')!r} (expected {PROFILE_SCHEMA})")
+    if data.get("name") != name:
+        raise ProfileError(f"{name}: manifest name {data.get('name')!r} does not match its file name")
+    if not isinstance(data.get("version"), int) or data["version"] < 1:
+        raise ProfileError(f"{name}: 'version' must be a positive integer")
+    if not isinstance(data.get("tasks"), list):
+        raise ProfileError(f"{name}: 'tasks' must be a list")
+    for i, task in enumerate(data["tasks"], 1):
+        _check_task(task, f"{name}: task {i}")
+    variants = data.get("variants")
+    if variants is None:
+        return
+    options = variants.get("options") if isinstance(variants, dict) else None
+    if not isinstance(options, list) or not options:
+        raise ProfileError(f"{name}: 'variants.options' must be a non-empty list")
+    group_ids = [group.get("id") for group in variants.get("groups") or []]
+    seen = set()
+    for option in options:
+        option_id = option.get("id") if isinstance(option, dict) else None
+        if not isinstance(option_id, str) or not option_id:
+            raise ProfileError(f"{name}: every variant needs an 'id'")
+        if option_id.lower() in seen:
+            raise ProfileError(f"{name}: duplicate variant '{option_id}'")
+        seen.add(option_id.lower())
+        for group in option.get("groups") or []:
+            if group not in group_ids:
+                raise ProfileError(f"{name}: variant '{option_id}' names unknown group '{group}'")
+        if group_ids and not option.get("groups"):
+            raise ProfileError(f"{name}: variant '{option_id}' belongs to no group")
+        for i, task in enumerate(option.get("tasks") or [], 1):
+            _check_task(task, f"{name}: variant '{option_id}' task {i}")
+
+
+def profile_path(name):
+    return os.path.join(PROFILES_DIR, f"{name}.json")
+
+
+def list_profiles():
+    """Names of the manifests shipped in PROFILES_DIR, sorted."""
+    try:
+        return sorted(entry[:-5] for entry in os.listdir(PROFILES_DIR) if entry.endswith(".json"))
+    except FileNotFoundError:
+        return []
+
+
+def load_profile(name):
+    """
+    Reads and validates profiles/<name>.json.
+
+    Raises:
+        ProfileError: If the manifest is missing, not JSON or invalid.
+    """
+    path = profile_path(name)
+    try:
+        with open(path, "r", encoding="utf-8") as manifest:
+            data = json.load(manifest)
+    except FileNotFoundError:
+        raise ProfileError(f"Unknown profile '{name}' (available: {', '.join(list_profiles()) or 'none'})")
+    except ValueError as e:
+        raise ProfileError(f"{path}: invalid JSON ({e})")
+    validate_profile(data, name)
+    return Profile(data, path)
+
+
+def _ask(prompt, count):
+    """Reads a menu number between 1 and count; returns it zero-based."""
+    while True:
+        try:
+            answer = input(f"{prompt} (1-{count}): ").strip()
+        except KeyboardInterrupt:
+            print("\n\n👋 Download cancelled by user.")
+            sys.exit(0)
+        except EOFError:
+            print("\n\n❌ Input error. Exiting.")
+            sys.exit(1)
+        if answer.isdigit() and 1 <= int(answer) <= count:
+            return int(answer) - 1
+        print(f"❌ Invalid choice. Please enter a number between 1 and {count}.")
+
+
+def choose_variant(profile):
+    """
+    Asks for a variant: the group (e.g. VRAM size) first when the profile has
+    groups, then the option. The last entry of the first menu exits.
+
+    Returns:
+        Variant: The selected variant, or None if the user chose to exit.
+    """
+    print(f"\n{profile.prompt}:")
+    if profile.groups:
+        for i, group in enumerate(profile.groups, 1):
+            print(f"{i}. {group['label']}")
+        print(f"{len(profile.groups) + 1}. Exit")
+        index = _ask("Enter choice", len(profile.groups) + 1)
+        if index == len(profile.groups):
+            return None
+        group = profile.groups[index]
+        options = [variant for variant in profile.variants if group["id"] in variant.groups]
+        print(f"\nAvailable models for {group['label']}:")
+        for i, variant in enumerate(options, 1):
+            print(f"{i}. {variant.label}")
+        return options[_ask("Enter model number", len(options))]
+
+    print()
+    for i, variant in enumerate(profile.variants, 1):
+        print(f"{i}. {variant.label}")
+        for line in variant.description:
+            print(f"   - {line}")
+        print()
+    print(f"{len(profile.variants) + 1}. Exit")
+    index = _ask("Enter your choice", len(profile.variants) + 1)
+    return None if index == len(profile.variants) else profile.variants[index]
+
+
+def task_key(task):
+    """
+    Identity of a task across profiles: the same file of the same repo
+    revision placed at the same destination.
+    """
+    return ((task.get("repo_type") or "model"), task["repo_id"], task.get("revision") or "main",
+            task["filename"], os.path.normpath(task_destination(task)))
+
+
+def union_tasks(selections):
+    """
+    Merges the tasks of several profiles into one de-duplicated list.
+
+    Args:
+        selections (list): (Profile, Variant or None) pairs.
+
+    Returns:
+        tuple: (tasks, number of duplicates dropped). A task shared by
+        several profiles is kept once and tagged with all of them.
+    """
+    tasks = []
+    by_key = {}
+    by_destination = {}
+    duplicates = 0
+    for profile, variant in selections:
+        for task in profile.tasks_for(variant):
+            key = task_key(task)
+            if key in by_key:
+                kept = by_key[key]
+                if profile.tag not in kept["profile"].split(","):
+                    kept["profile"] += f",{profile.tag}"
+                duplicates += 1
+                continue
+            destination = key[-1]
+            other = by_destination.get(destination)
+            if other is not None and not task.get("extract_and_delete"):
+                # Two different sources for one path: the first profile wins rather than racing.
+                print(f"⚠️  {task['profile']} wants {task['repo_id']}/{task['filename']} at {destination}, "
+                      f"already taken by {other['repo_id']}/{other['filename']} ({other['profile']}); skipping it")
+                continue
+            by_key[key] = task
+            by_destination[destination] = task
+            tasks.append(task)
+    return tasks, duplicates
+
+
+def build_parser(profiles):
+    names = ", ".join(profile.title for profile in profiles)
+    parser = argparse.ArgumentParser(description=f"Download {names}.")
+    variant_ids = sorted({variant.id for profile in profiles for variant in profile.variants})
+    if variant_ids:
+        parser.add_argument("--variant", metavar="[PROFILE=]ID", action="append", default=[],
+                            help="Variant to install without prompting; a bare ID applies to every selected "
+                                 f"profile that has it ({', '.join(variant_ids)})")
+    parser.add_argument("-y", "--yes", action="store_true", help="Do not ask for confirmation")
+    parser.add_argument("--plan", action="store_true",
+                        help="Only show what would be fetched, skipped, refreshed or extracted, with byte totals "
+                             "and a predicted wall time; nothing is downloaded")
+    # One pool for the whole union, as wide as the widest profile allows.
+    add_engine_arguments(parser, ceiling=max(profile.max_concurrency for profile in profiles))
+    return parser
+
+
+def _preselected(profile, values):
+    """Variant named for profile by --variant values, or None if none applies."""
+    for value in values:
+        name, _, variant_id = value.rpartition("=")
+        if name and name != profile.name:
+            continue
+        if not name and not any(variant.id.lower() == variant_id.lower() for variant in profile.variants):
+            continue
+        return profile.variant(variant_id)
+    return None
+
+
+def select_variants(profiles, values):
+    """
+    Picks a variant for each profile that has any, from --variant values or a menu.
+
+    Returns:
+        list: (Profile, Variant or None) pairs, or None if the user chose to exit.
+
+    Raises:
+        ProfileError: If a PROFILE=ID value names an unknown variant or profile.
+    """
+    names = {profile.name for profile in profiles}
+    for value in values:
+        name, _, variant_id = value.rpartition("=")
+        if name and name not in names:
+            raise ProfileError(f"--variant {value}: '{name}' is not one of the selected profiles")
+        if not name and not any(variant.id.lower() == variant_id.lower()
+                                for profile in profiles for variant in profile.variants):
+            raise ProfileError(f"--variant {value}: no selected profile has that variant")
+    selections = []
+    for profile in profiles:
+        variant = None
+        if profile.variants:
+            variant = _preselected(profile, values)
+            if variant is None:
+                if len(profiles) > 1:
+                    print(f"\n📋 {profile.title}")
+                variant = choose_variant(profile)
+                if variant is None:
+                    return None
+            print(f"\n🎯 Selected: {variant.label}" + (f" ({profile.name})" if len(profiles) > 1 else ""))
+        selections.append((profile, variant))
+    return selections
+
+
+def run_profile(name, argv=None):
+    """
+    Installs one profile; the whole main() of a Download_*.py script.
+
+    Args:
+        name (str): Profile name under profiles/.
+        argv (list): Command line arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit status (0 when every task succeeded).
+    """
+    return run_profiles([name], argv)
+
+
+def run_profiles(names, argv=None):
+    """
+    Installs the union of several profiles in a single scheduling pass.
+
+    Tasks shared between profiles (VAEs, LoRAs, encoders) are resolved and
+    placed once, and all files are ordered largest-first in one pool under
+    one concurrency budget, so the run takes about as long as its largest
+    files rather than the sum of the profiles.
+
+    Args:
+        names (list): Profile names under profiles/.
+        argv (list): Command line arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit status (0 when every task succeeded).
+    """
+    try:
+        profiles = [load_profile(name) for name in dict.fromkeys(names)]
+    except ProfileError as e:
+        print(f"❌ {e}")
+        return 2
+    parser = build_parser(profiles)
+    args = check_concurrency_arguments(parser, parser.parse_args(argv))
+
+    print("=" * 80)
+    if len(profiles) == 1:
+        print(f"🚀 {profiles[0].title.upper()} DOWNLOADER (profile {profiles[0].tag})")
+    else:
+        print(f"🚀 COMBINED DOWNLOADER ({', '.join(profile.tag for profile in profiles)})")
+    print("=" * 80)
+    for profile in profiles:
+        for line in profile.description:
+            print(line)
+
+    try:
+        selections = select_variants(profiles, getattr(args, "variant", []))
+    except ProfileError as e:
+        print(f"❌ {e}")
+        return 2
+    if selections is None:
+        print("\n👋 Exiting downloader. Have a great day!")
+        return 0
+
+    tasks, duplicates = union_tasks(selections)
+    print("=" * 80)
+    print(f"📁 Base download directory: {os.path.abspath(BASE_DOWNLOAD_DIR)}")
+    print(f"⚡ Concurrent downloads: adaptive ({args.min_concurrency}-{args.max_concurrency})")
+    print(f"📦 Total download tasks: {len(tasks)}")
+    if duplicates:
+        print(f"🔗 Shared between profiles: {duplicates} task(s) merged")
+    print("=" * 80)
+    print("🔍 Fetching file sizes from the Hub...")
+    engine = DownloadEngine.from_args(args)
+    ordered_tasks = engine.plan(tasks)
+    if args.plan:
+        print("=" * 80)
+        engine.dry_run(ordered_tasks)
+        engine.check_disk_space(ordered_tasks)
+        engine.close()
+        return 0
+    if not engine.check_disk_space(ordered_tasks):
+        engine.close()
+        return 1
+
+    warnings = [profile.confirm for profile in profiles if profile.confirm]
+    if warnings and not args.yes:
+        print("=" * 80)
+        for warning in dict.fromkeys(warnings):
+            print(f"⚠️  WARNING: {warning}")
+        print("=" * 80)
+        try:
+            answer = input("Do you want to continue with the download? (y/N): ").strip().lower()
+        except (KeyboardInterrupt, EOFError):
+            answer = ""
+        if answer not in ("y", "yes"):
+            engine.close()
+            print("\n👋 Download cancelled by user.")
+            return 0
+
+    start_time = time.time()
+    # All transfers share one event loop and connection pool; the limiter decides how many run at once
+    with engine:
+        results = engine.run(task for task, _size in ordered_tasks)
+    counts = count_statuses(results)
+    failed_downloads = counts["failed"]
+    successful_downloads = len(results) - failed_downloads
+    total_time = time.time() - start_time
+
+    print("\n" + "=" * 80)
+    print("📊 DOWNLOAD SUMMARY")
+    print("=" * 80)
+    for profile, variant in selections:
+        if variant:
+            print(f"🎯 Variant: {variant.label}" + (f" ({profile.name})" if len(profiles) > 1 else ""))
+            for task in variant.tasks:
+                print(f"   - {os.path.basename(task.get('rename_to') or task['filename'])}")
+    print(f"✅ Successful downloads: {successful_downloads}")
+    print(f"❌ Failed downloads: {failed_downloads}")
+    print(f"📦 Total tasks processed: {len(results)}")
+    print(f"⏱️  Total time: {total_time:.2f} seconds ({total_time / 60:.1f} minutes)")
+    if successful_downloads > 0:
+        print(f"🚀 Average time per successful download: {total_time / successful_downloads:.2f} seconds")
+    print("=" * 80)
+
+    if failed_downloads > 0:
+        print(f"\n⚠️  Warning: {failed_downloads} task(s) failed. Check error messages above.")
+        print("💡 TIP: You can re-run the script to retry failed downloads")
+        return 1
+    print("\n🎉 ALL DOWNLOADS COMPLETED SUCCESSFULLY!")
+    print(f"📁 Files downloaded to: {os.path.abspath(BASE_DOWNLOAD_DIR)}")
+    for profile in profiles:
+        if profile.notes:
+            print()
+            for line in profile.notes:
+                print(line)
+    return 0
+
+
+def main(argv=None):
+    """
+    python3 profile_manifest.py <profile> [<profile> ...] [options]
+
+    Several profiles are installed together as one de-duplicated run;
+    --list shows the shipped profiles.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    names = []
+    while argv and not argv[0].startswith("-"):
+        names.append(argv.pop(0))
+    if not names:
+        if argv and argv[0] not in ("-h", "--help", "--list"):
+            print("❌ Name at least one profile before the options.")
+        print("Usage: python3 profile_manifest.py <profile> [<profile> ...] [options]\n\nProfiles:")
+        for name in list_profiles():
+            try:
+                profile = load_profile(name)
+                print(f"  {name:<26} v{profile.version}  {profile.title}")
+            except ProfileError as e:
+                print(f"  {name:<26} ❌ {e}")
+        return 0 if not argv or argv[0] in ("-h", "--help", "--list") else 2
+    return run_profiles(names, argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
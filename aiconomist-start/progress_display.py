@@ -0,0 +1,201 @@
+"""
+Live aggregate progress display for download runs.
+
+With many transfers in flight, a banner per file start and finish scrolls
+everything useful off the screen, and every write to a slow web terminal
+costs time. Instead the engine reports task events here and one renderer
+thread redraws a small block at a fixed rate: a line per active transfer
+with its bytes/s, then the aggregate throughput, ETA and the counts of
+queued, active and done tasks. Messages that must stay visible (errors,
+skips, extraction) are printed above the block.
+
+When stdout is not a terminal (logs, nohup, CI) nothing is redrawn; a
+one-line summary is printed every SUMMARY_INTERVAL seconds instead.
+"""
+
+import sys
+import time
+import shutil
+import threading
+
+from concurrency import ThroughputMeter
+from scheduling import format_size, format_duration
+
+# --- Configuration ---
+REFRESH_INTERVAL = 0.5  # Seconds between redraws of the live block
+SUMMARY_INTERVAL = 15.0  # Seconds between one-line summaries when stdout is not a terminal
+FILE_RATE_WINDOW = 5.0  # Seconds of history behind the per-file bytes/s
+MAX_FILE_LINES = 8  # Active transfers listed individually; the rest are counted
+PROGRESS_MODES = ("auto", "live", "summary", "off")
+
+
+class _TaskProgress:
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.bytes = 0
+        self.state = "queued"
+        self.meter = ThroughputMeter(window=FILE_RATE_WINDOW)
+
+
+class ProgressDisplay:
+    """
+    Aggregate progress of one engine run.
+
+    Args:
+        live (bool): Redraw a block in place (terminals) instead of printing periodic summary lines.
+        stream (file): Output stream (default: sys.stdout).
+        refresh (float): Seconds between redraws in live mode.
+        summary_interval (float): Seconds between summary lines otherwise.
+    """
+
+    def __init__(self, live=True, stream=None, refresh=REFRESH_INTERVAL, summary_interval=SUMMARY_INTERVAL):
+        self.live = live
+        self.stream = stream or sys.stdout
+        self.interval = refresh if live else summary_interval
+        self.tasks = {}
+        self.meter = ThroughputMeter()
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = None
+        self.started = None
+        self.drawn = 0
+
+    def begin(self, entries):
+        """
+        Starts displaying a run.
+
+        Args:
+            entries (list): (key, name, size) per task in submission order; size may be None.
+        """
+        with self.lock:
+            self.tasks = {key: _TaskProgress(name, size) for key, name, size in entries}
+            self.meter = ThroughputMeter()
+            self.started = time.monotonic()
+        self.stop.clear()
+        self.thread = threading.Thread(target=self._render_loop, name="progress-display", daemon=True)
+        self.thread.start()
+
+    def start(self, key):
+        """Marks a task as actively transferring."""
+        with self.lock:
+            self.tasks[key].state = "active"
+
+    def advance(self, key, nbytes):
+        """Counts bytes received for a task."""
+        task = self.tasks[key]
+        task.bytes += nbytes
+        task.meter.add(nbytes)
+        self.meter.add(nbytes)
+
+    def finish(self, key):
+        """Marks a task as done, whatever its outcome."""
+        with self.lock:
+            self.tasks[key].state = "done"
+
+    def end(self):
+        """Stops the renderer and replaces the live block with a final summary line."""
+        if self.thread is None:
+            return
+        self.stop.set()
+        self.thread.join()
+        self.thread = None
+        with self.lock:
+            self._erase()
+            elapsed = time.monotonic() - self.started
+            total = sum(task.bytes for task in self.tasks.values())
+            self._write(f"📊 {len(self.tasks)} task(s) in {format_duration(elapsed)}, {format_size(total)} "
+                        f"received at {format_size(total / max(elapsed, 0.001))}/s")
+
+    def print(self, message=""):
+        """Prints a message above the live block (usable as the engine's print_fn)."""
+        with self.lock:
+            self._erase()
+            self._write(message)
+            if self.live and self.thread is not None:
+                self._draw()
+
+    def _render_loop(self):
+        while not self.stop.wait(self.interval):
+            with self.lock:
+                if self.live:
+                    self._erase()
+                    self._draw()
+                else:
+                    self._write(self._summary_line())
+
+    def _write(self, line):
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def _erase(self):
+        if self.drawn:
+            # Cursor to the start of the first block line, then clear to the end of the screen.
+            self.stream.write(f"\x1b[{self.drawn}F\x1b[J")
+            self.drawn = 0
+
+    def _draw(self):
+        width = max(shutil.get_terminal_size().columns - 2, 20)
+        active = [task for task in self.tasks.values() if task.state == "active"]
+        lines = []
+        for task in active[:MAX_FILE_LINES]:
+            size = format_size(task.size) if task.size is not None else "?"
+            lines.append(f"   📥 {format_size(task.bytes):>9} / {size:>9} {format_size(task.meter.rate()):>9}/s  "
+                         f"{task.name}")
+        if len(active) > MAX_FILE_LINES:
+            lines.append(f"   … and {len(active) - MAX_FILE_LINES} more active")
+        lines.append(self._summary_line())
+        # Lines are cut to the terminal width so a wrapped line never breaks the erase count.
+        self.stream.write("".join(line[:width] + "\n" for line in lines))
+        self.stream.flush()
+        self.drawn = len(lines)
+
+    def _summary_line(self):
+        counts = {"queued": 0, "active": 0, "done": 0}
+        received = remaining = 0
+        unknown = False
+        for task in self.tasks.values():
+            counts[task.state] += 1
+            received += task.bytes
+            if task.state != "done":
+                if task.size is None:
+                    unknown = True
+                else:
+                    remaining += max(task.size - task.bytes, 0)
+        rate = self.meter.rate()
+        if not remaining and not unknown:
+            eta = "-"
+        elif rate:
+            eta = ("≥" if unknown else "") + format_duration(remaining / rate)
+        else:
+            eta = "?"
+        return (f"📊 {counts['done']} done, {counts['active']} active, {counts['queued']} queued | "
+                f"{format_size(rate)}/s | {format_size(received)} of {format_size(received + remaining)}"
+                f"{'+' if unknown else ''} | ETA {eta} | {format_duration(time.monotonic() - self.started)} elapsed")
+
+
+def make_progress_display(mode, stream=None):
+    """
+    Builds the display for a --progress mode.
+
+    Args:
+        mode (str): 'auto' (live on a terminal, summary lines otherwise), 'live', 'summary' or 'off'.
+        stream (file): Output stream (default: sys.stdout).
+
+    Returns:
+        ProgressDisplay: The display, or None for 'off' (per-file lines as before).
+    """
+    stream = stream or sys.stdout
+    if mode == "off":
+        return None
+    if mode == "auto":
+        mode = "live" if stream.isatty() else "summary"
+    return ProgressDisplay(live=mode == "live", stream=stream)
+
+
+def add_progress_arguments(parser):
+    """Adds the --progress option to an argparse parser."""
+    parser.add_argument("--progress", choices=PROGRESS_MODES, default="auto",
+                        help="Progress output: live display on a terminal, periodic summary lines, or per-file "
+                             "lines ('off'); default: auto")
+    return parser
@@ -0,0 +1,256 @@
+"""
+Machine-readable metrics of download runs.
+
+The DOWNLOAD SUMMARY block is meant for people; for graphing pod bootstrap
+performance across machines and alerting on slow hosts the engine can also
+publish what happens during a run:
+
+    --metrics-port N   Prometheus text format on http://127.0.0.1:N/metrics
+    --event-log PATH   JSON lines appended to PATH
+
+Both carry the same data: bytes received, per-task phase durations (resolve,
+connect, first_byte, transfer, verify, extract, place), task outcomes,
+retries, a histogram of per-file throughput and the bytes and seconds spent
+writing to disk. The event log additionally gets one 'task' event per
+finished task and a 'sample' event every SAMPLE_INTERVAL seconds with the
+current network and disk write rates, so a run can be replayed without a
+scraper.
+"""
+
+import json
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from concurrency import ThroughputMeter
+
+# --- Configuration ---
+METRICS_HOST = "127.0.0.1"  # The endpoint is only reachable from the machine itself
+METRIC_PREFIX = "model_download"
+SAMPLE_INTERVAL = 5.0  # Seconds between 'sample' events in the event log
+THROUGHPUT_BUCKETS = [1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9]  # Bytes/s of a whole file
+TASK_STATUSES = ("downloaded", "linked", "verified", "skipped", "failed")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RunMetrics:
+    """
+    Counters of one engine run, exported over HTTP and/or as a JSONL event log.
+
+    Args:
+        event_log (str): Path the JSON lines are appended to, or None.
+        port (int): Local port of the Prometheus endpoint (0 picks a free one), or None.
+        host (str): Address the endpoint binds to.
+    """
+
+    def __init__(self, event_log=None, port=None, host=METRICS_HOST):
+        self.event_log_path = event_log
+        self.port = port
+        self.host = host
+        self.lock = threading.Lock()
+        self.log = None
+        self.server = None
+        self.sampler = None
+        self.stop = threading.Event()
+        self.meter = ThroughputMeter()
+        self.hostname = socket.gethostname()
+        self.tasks_total = 0
+        self.bytes = 0
+        self.retries = 0
+        self.disk_bytes = 0
+        self.disk_seconds = 0.0
+        self.statuses = dict.fromkeys(TASK_STATUSES, 0)
+        self.phases = {}
+        self.transfer_seconds = {}
+        self.buckets = [0] * len(THROUGHPUT_BUCKETS)
+        self.throughput_sum = 0.0
+        self.throughput_count = 0
+
+    def start(self, total):
+        """Opens the event log and the endpoint for a run of total tasks."""
+        with self.lock:
+            self.tasks_total += total
+        if self.event_log_path and self.log is None:
+            self.log = open(self.event_log_path, "a")
+        if self.port is not None and self.server is None:
+            self.server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+            self.server.daemon_threads = True
+            self.server.metrics = self
+            self.port = self.server.server_address[1]
+            threading.Thread(target=self.server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        if self.log is not None and self.sampler is None:
+            self.stop.clear()
+            self.sampler = threading.Thread(target=self._sample_loop, name="metrics-sampler", daemon=True)
+            self.sampler.start()
+        self.emit("run_start", tasks=total, host=self.hostname)
+
+    def emit(self, event, **fields):
+        """Appends one event to the event log, if there is one."""
+        if self.log is None:
+            return
+        line = json.dumps(dict(fields, ts=round(time.time(), 3), event=event), sort_keys=True)
+        with self.lock:
+            self.log.write(line + "\n")
+            self.log.flush()
+
+    def add_bytes(self, nbytes):
+        with self.lock:
+            self.bytes += nbytes
+        self.meter.add(nbytes)
+
+    def phase(self, task_key, name, seconds, **fields):
+        """Records how long one phase of a task took."""
+        with self.lock:
+            total, count = self.phases.get(name, (0.0, 0))
+            self.phases[name] = (total + seconds, count + 1)
+            if name == "transfer":
+                self.transfer_seconds[task_key] = self.transfer_seconds.get(task_key, 0.0) + seconds
+        self.emit("phase", task=task_key, phase=name, seconds=round(seconds, 6), **fields)
+
+    def transfer_event(self, task_key, name, fields):
+        """Takes the on_event callbacks of hub_transfer and zip_stream."""
+        if name == "disk_write":
+            with self.lock:
+                self.disk_bytes += fields["bytes"]
+                self.disk_seconds += fields["seconds"]
+        elif name == "retry":
+            with self.lock:
+                self.retries += 1
+            self.emit("retry", task=task_key, **fields)
+        elif name in ("connect", "first_byte", "verify"):
+            self.phase(task_key, name, fields["seconds"], **{k: v for k, v in fields.items()
+                                                            if k not in ("started", "seconds")})
+
+    def task_done(self, task_key, result):
+        """
+        Records the outcome of a task; its throughput is bytes over the time of its transfer phases.
+
+        Args:
+            task_key (str): Tag of the task in this run.
+            result (dict): Result dict of DownloadEngine.run().
+        """
+        with self.lock:
+            self.statuses[result["status"]] = self.statuses.get(result["status"], 0) + 1
+            transfer_seconds = self.transfer_seconds.pop(task_key, None)
+            if transfer_seconds and result["bytes"]:
+                rate = result["bytes"] / transfer_seconds
+                self.throughput_sum += rate
+                self.throughput_count += 1
+                for i, bound in enumerate(THROUGHPUT_BUCKETS):
+                    if rate <= bound:
+                        self.buckets[i] += 1
+        task = result["task"]
+        self.emit("task", task=task_key, repo_id=task.get("repo_id"), filename=task.get("filename"),
+                  status=result["status"], error=result["error"], bytes=result["bytes"],
+                  seconds=round(result["seconds"], 3))
+
+    def render(self):
+        """Returns the current counters in Prometheus text exposition format."""
+        p = METRIC_PREFIX
+        with self.lock:
+            lines = [
+                f"# HELP {p}_tasks Tasks submitted to the engine.",
+                f"# TYPE {p}_tasks gauge",
+                f"{p}_tasks {self.tasks_total}",
+                f"# HELP {p}_tasks_finished_total Finished tasks by outcome.",
+                f"# TYPE {p}_tasks_finished_total counter",
+            ]
+            lines += [f'{p}_tasks_finished_total{{status="{status}"}} {count}'
+                      for status, count in sorted(self.statuses.items())]
+            lines += [
+                f"# HELP {p}_received_bytes_total Bytes received from the network.",
+                f"# TYPE {p}_received_bytes_total counter",
+                f"{p}_received_bytes_total {self.bytes}",
+                f"# HELP {p}_received_bytes_per_second Network throughput over the last seconds.",
+                f"# TYPE {p}_received_bytes_per_second gauge",
+                f"{p}_received_bytes_per_second {self.meter.rate():.1f}",
+                f"# HELP {p}_retries_total Range requests retried after a transient error.",
+                f"# TYPE {p}_retries_total counter",
+                f"{p}_retries_total {self.retries}",
+                f"# HELP {p}_disk_write_bytes_total Bytes written to partial files.",
+                f"# TYPE {p}_disk_write_bytes_total counter",
+                f"{p}_disk_write_bytes_total {self.disk_bytes}",
+                f"# HELP {p}_disk_write_seconds_total Seconds spent in those writes.",
+                f"# TYPE {p}_disk_write_seconds_total counter",
+                f"{p}_disk_write_seconds_total {self.disk_seconds:.6f}",
+                f"# HELP {p}_phase_seconds Time spent per task phase.",
+                f"# TYPE {p}_phase_seconds summary",
+            ]
+            for name, (total, count) in sorted(self.phases.items()):
+                lines.append(f'{p}_phase_seconds_sum{{phase="{name}"}} {total:.6f}')
+                lines.append(f'{p}_phase_seconds_count{{phase="{name}"}} {count}')
+            lines += [
+                f"# HELP {p}_file_throughput_bytes_per_second Throughput of each transferred file.",
+                f"# TYPE {p}_file_throughput_bytes_per_second histogram",
+            ]
+            for bound, count in zip(THROUGHPUT_BUCKETS, self.buckets):
+                # Buckets are cumulative: task_done() counts a rate in every bucket it fits under.
+                lines.append(f'{p}_file_throughput_bytes_per_second_bucket{{le="{bound:g}"}} {count}')
+            lines += [
+                f'{p}_file_throughput_bytes_per_second_bucket{{le="+Inf"}} {self.throughput_count}',
+                f"{p}_file_throughput_bytes_per_second_sum {self.throughput_sum:.1f}",
+                f"{p}_file_throughput_bytes_per_second_count {self.throughput_count}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Writes the final event and stops the endpoint and sampler."""
+        if self.sampler is not None:
+            self.stop.set()
+            self.sampler.join()
+            self.sampler = None
+        with self.lock:
+            summary = {"bytes": self.bytes, "retries": self.retries, "disk_write_bytes": self.disk_bytes,
+                       "disk_write_seconds": round(self.disk_seconds, 3), "statuses": dict(self.statuses)}
+        self.emit("run_end", **summary)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def _sample_loop(self):
+        last_disk = (self.disk_bytes, self.disk_seconds)
+        last_time = time.monotonic()
+        while not self.stop.wait(SAMPLE_INTERVAL):
+            now = time.monotonic()
+            with self.lock:
+                disk = (self.disk_bytes, self.disk_seconds)
+            self.emit("sample", received_bytes_per_second=round(self.meter.rate(), 1),
+                      disk_write_bytes_per_second=round((disk[0] - last_disk[0]) / (now - last_time), 1),
+                      disk_busy=round((disk[1] - last_disk[1]) / (now - last_time), 4))
+            last_disk, last_time = disk, now
+
+
+def make_run_metrics(event_log=None, port=None):
+    """Returns a RunMetrics for the --event-log / --metrics-port options, or None if both are unset."""
+    if event_log is None and port is None:
+        return None
+    return RunMetrics(event_log=event_log, port=port)
+
+
+def add_metrics_arguments(parser):
+    """Adds the --metrics-port and --event-log options to an argparse parser."""
+    parser.add_argument("--metrics-port", type=int,
+                        help=f"Serve Prometheus metrics on http://{METRICS_HOST}:PORT/metrics during the run")
+    parser.add_argument("--event-log", metavar="PATH",
+                        help="Append per-task phase, retry and rate events to PATH as JSON lines")
+    return parser
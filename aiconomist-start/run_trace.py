@@ -0,0 +1,110 @@
+"""
+Per-task timeline of a download run in Chrome trace-event format.
+
+A run that takes 50 minutes says nothing about where the time went. With
+--trace PATH the engine records a span for every phase of every task and
+writes them as trace events that chrome://tracing, Perfetto or speedscope
+can show as a timeline:
+
+    resolve     metadata (HEAD) requests; the plan row holds the up-front resolution
+    connect     TCP/TLS setup of a new pooled connection
+    first-byte  request sent until the response headers arrived
+    transfer    receiving the body (all segments)
+    verify      hashing against the LFS sha256
+    extract     unpacking a downloaded ZIP
+    place       linking the file from the blob store to its destination
+
+Each task gets its own row for its sequential phases, with extra rows below
+it for the overlapping per-connection spans of segmented transfers.
+"""
+
+import os
+import json
+import time
+import threading
+
+# --- Configuration ---
+TASK_PHASES = ("resolve", "transfer", "verify", "extract", "place")  # Sequential; drawn on the task's own row
+LANES_PER_TASK = 100  # Thread ids per task: its phase row plus rows for connection spans
+
+
+class RunTrace:
+    """
+    Collects spans of one run and writes them as a Chrome trace.
+
+    Args:
+        path (str): File the trace is written to by write().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.origin = time.monotonic()
+        self.wall_origin = time.time()
+        self.lock = threading.Lock()
+        self.events = []
+        self.rows = {}
+        self.names = {}
+
+    def name_task(self, task_key, name):
+        """Labels the rows of a task in the timeline."""
+        with self.lock:
+            self.names[task_key] = name
+
+    def span(self, task_key, name, started, seconds, **args):
+        """
+        Records one finished span.
+
+        Args:
+            task_key (str): Task the span belongs to (its tag, or 'plan').
+            name (str): Phase name.
+            started (float): time.monotonic() when the span began.
+            seconds (float): Duration of the span.
+            **args: Extra fields shown with the span.
+        """
+        with self.lock:
+            row = self.rows.get(task_key)
+            if row is None:
+                row = self.rows[task_key] = {"index": len(self.rows) + 1, "lane_ends": [0.0]}
+            lane = 0
+            if name not in TASK_PHASES:
+                # Connection spans of parallel segments overlap; give each one the first row that is free again.
+                lane = 1
+                while lane < len(row["lane_ends"]) and row["lane_ends"][lane] > started:
+                    lane += 1
+                if lane == len(row["lane_ends"]):
+                    row["lane_ends"].append(0.0)
+                lane = min(lane, LANES_PER_TASK - 1)
+            row["lane_ends"][lane] = max(row["lane_ends"][lane], started + seconds)
+            self.events.append({"name": name, "cat": "download", "ph": "X", "pid": 1,
+                                "tid": row["index"] * LANES_PER_TASK + lane,
+                                "ts": round((started - self.origin) * 1e6, 1), "dur": round(seconds * 1e6, 1),
+                                "args": dict(args, task=task_key)})
+
+    def write(self):
+        """Writes the trace file; returns its path."""
+        with self.lock:
+            metadata = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "model downloads"}}]
+            for task_key, row in self.rows.items():
+                label = f"{task_key} {self.names[task_key]}" if task_key in self.names else task_key
+                for lane in range(min(len(row["lane_ends"]), LANES_PER_TASK)):
+                    tid = row["index"] * LANES_PER_TASK + lane
+                    metadata.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                                     "args": {"name": label if lane == 0 else f"{label} (connections)"}})
+                    metadata.append({"name": "thread_sort_index", "ph": "M", "pid": 1, "tid": tid,
+                                     "args": {"sort_index": tid}})
+            trace = {"traceEvents": metadata + sorted(self.events, key=lambda event: event["ts"]),
+                     "displayTimeUnit": "ms", "otherData": {"started_at": self.wall_origin}}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as trace_file:
+            json.dump(trace, trace_file)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+def add_trace_arguments(parser):
+    """Adds the --trace option to an argparse parser."""
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write per-task spans (resolve, connect, first-byte, transfer, verify, extract, place) "
+                             "in Chrome trace-event format")
+    return parser
@@ -0,0 +1,250 @@
+"""
+Size-aware ordering of download tasks.
+
+Tasks are submitted largest-first (LPT scheduling): the multi-GB UNETs start
+immediately and small LoRAs backfill whichever slot frees up first, so they
+never become a long tail at the end of the run. Sizes come from Hub metadata
+the download engine resolves concurrently before any transfer starts.
+
+Predictions use the aggregate throughput measured by previous runs on this
+machine (kept in a small history file) and fall back to ASSUMED_BANDWIDTH on
+the first run. A single transfer is capped by the fastest per-file rate those
+runs saw (ASSUMED_PER_TRANSFER until one is recorded), which is what makes
+the order and the number of slots matter: a big file started last runs alone
+at that rate while the rest of the link sits idle.
+"""
+
+import os
+import json
+import time
+import statistics
+from collections import deque
+
+# --- Configuration ---
+ASSUMED_BANDWIDTH = 100 * 1024 * 1024  # Aggregate bytes/s used to predict the makespan
+ASSUMED_PER_TRANSFER = 40 * 1024 * 1024  # Bytes/s one file reaches on its own (all its segments together)
+BANDWIDTH_HISTORY_PATH = os.environ.get(
+    "DOWNLOAD_HISTORY", os.path.join(os.path.expanduser("~"), ".cache", "comfyui-installer", "bandwidth.json"))
+BANDWIDTH_HISTORY_RUNS = 20  # Most recent runs kept and averaged
+MIN_RECORDED_BYTES = 64 * 1024 * 1024  # Smaller runs are dominated by latency and say little about the link
+
+
+def format_size(nbytes):
+    """Formats a byte count as a short human readable string."""
+    if nbytes is None:
+        return "unknown"
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.1f}{unit}" if unit != "B" else f"{nbytes}B"
+        nbytes /= 1024
+    return f"{nbytes:.1f}GB"
+
+
+def format_duration(seconds):
+    """Formats seconds as '1h 02m', '3m 20s' or '42s'."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def mount_point(path):
+    """Returns the mount point of the filesystem that path (or its nearest existing parent) lives on."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    device = os.stat(path).st_dev
+    while path != os.path.dirname(path) and os.stat(os.path.dirname(path)).st_dev == device:
+        path = os.path.dirname(path)
+    return path
+
+
+def free_bytes(path):
+    """Bytes available to unprivileged users on the filesystem of path."""
+    stat = os.statvfs(mount_point(path))
+    return stat.f_bavail * stat.f_frsize
+
+
+def _read_history(path):
+    try:
+        with open(path, "r") as history_file:
+            runs = json.load(history_file).get("runs", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+    return [run for run in runs if isinstance(run, dict) and run.get("seconds", 0) > 0]
+
+
+def measured_bandwidth(path=BANDWIDTH_HISTORY_PATH):
+    """
+    Median aggregate throughput of the recorded runs.
+
+    Returns:
+        tuple: (bytes/s, number of runs), or (None, 0) when nothing was recorded yet.
+    """
+    runs = _read_history(path)
+    if not runs:
+        return None, 0
+    return statistics.median(run["bytes"] / run["seconds"] for run in runs), len(runs)
+
+
+def measured_per_transfer(path=BANDWIDTH_HISTORY_PATH):
+    """Median of the fastest single-file rate of each recorded run, or None when none was recorded."""
+    rates = [run["per_transfer"] for run in _read_history(path) if run.get("per_transfer")]
+    return statistics.median(rates) if rates else None
+
+
+def record_bandwidth(nbytes, seconds, source, per_transfer=None, path=BANDWIDTH_HISTORY_PATH):
+    """
+    Appends one run's aggregate throughput to the history file.
+
+    Runs that moved less than MIN_RECORDED_BYTES are ignored. Failures to write
+    the history never affect the download itself.
+
+    Args:
+        nbytes (int): Bytes transferred over the network.
+        seconds (float): Wall time of the transfers.
+        source (str): Which installer measured it.
+        per_transfer (float): Fastest bytes/s a single file of the run reached, if known.
+    """
+    if nbytes < MIN_RECORDED_BYTES or seconds <= 0:
+        return
+    runs = _read_history(path)
+    run = {"at": int(time.time()), "bytes": nbytes, "seconds": round(seconds, 3), "source": source}
+    if per_transfer:
+        run["per_transfer"] = round(per_transfer, 1)
+    runs.append(run)
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as history_file:
+            json.dump({"runs": runs[-BANDWIDTH_HISTORY_RUNS:]}, history_file)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def order_largest_first(tasks, sizes):
+    """Returns (task, size) pairs sorted largest-first; unknown sizes go last in original order."""
+    return sorted(zip(tasks, sizes), key=lambda pair: -(pair[1] or 0))
+
+
+def predict_makespan(sizes, workers, bandwidth=ASSUMED_BANDWIDTH, per_transfer=None):
+    """
+    Simulates the given sizes started in order on `workers` slots.
+
+    The aggregate bandwidth is shared equally by the transfers that are still
+    running, so when slots go idle the remaining transfers speed up instead of
+    keeping a fixed 1/workers share. Each transfer is capped at per_transfer,
+    so a large file left running alone is limited by what a single transfer
+    can reach; without a cap the prediction is just total bytes / bandwidth.
+
+    Args:
+        sizes (list): Sizes in bytes, in submission order (None counts as 0).
+        workers (int): Number of concurrent transfer slots.
+        bandwidth (float): Aggregate bytes/s of the link.
+        per_transfer (float): Highest bytes/s of a single transfer, or None for no limit.
+
+    Returns:
+        float: Predicted wall time in seconds.
+    """
+    queue = deque(size or 0 for size in sizes)
+    active = []
+    elapsed = 0.0
+    while queue or active:
+        while queue and len(active) < max(1, workers):
+            active.append(queue.popleft())
+        rate = bandwidth / len(active)
+        if per_transfer:
+            rate = min(rate, per_transfer)
+        # Every running transfer moves at the same rate, so the smallest remainder finishes first.
+        smallest = min(active)
+        elapsed += smallest / rate
+        active = [remaining - smallest for remaining in active if remaining > smallest]
+    return elapsed
+
+
+def print_plan(ordered, workers, bandwidth=ASSUMED_BANDWIDTH, per_transfer=None, print_fn=print):
+    """
+    Prints the submission order and the predicted makespan.
+
+    Args:
+        ordered (list): (task, size) pairs in submission order.
+        workers (int): Number of concurrent transfer slots assumed for the prediction.
+        bandwidth (float): Aggregate bytes/s of the link.
+        per_transfer (float): Highest bytes/s of a single transfer (default: ASSUMED_PER_TRANSFER).
+        print_fn (callable): Output function.
+    """
+    sizes = [size for _, size in ordered]
+    total = sum(size or 0 for size in sizes)
+    print_fn("🗂️  Download plan (largest first):")
+    for i, (task, size) in enumerate(ordered, 1):
+        print_fn(f"   {i:>2}. {format_size(size):>9}  {task['filename']}")
+    print_fn(f"💾 Total size: {format_size(total)}")
+    unknown = sum(1 for size in sizes if size is None)
+    if unknown:
+        print_fn(f"❔ Size unknown for {unknown} task(s)")
+    if unknown == len(sizes):
+        return
+    per_transfer = per_transfer or ASSUMED_PER_TRANSFER
+    makespan = predict_makespan(sizes, workers, bandwidth, per_transfer)
+    print_fn(f"⏳ Predicted makespan: {format_duration(makespan)} (at {format_size(bandwidth)}/s across "
+             f"{min(workers, len(sizes))} slots, up to {format_size(per_transfer)}/s per file)")
+
+
+# Dry-run actions: what DownloadEngine.run() would do with a task, and whether it moves bytes.
+PLAN_ACTIONS = {
+    "fetch": ("📥", True),
+    "refresh": ("🔄", True),
+    "extract": ("🗜️ ", True),
+    "verify": ("🔍", False),
+    "link": ("🔗", False),
+    "skip": ("⏭️ ", False),
+}
+
+
+def print_dry_run(actions, workers, bandwidth=None, history_runs=0, per_transfer=None, print_fn=print):
+    """
+    Prints a dry-run plan: one line per task, byte totals per target directory
+    and the predicted wall time of the transfers.
+
+    Args:
+        actions (list): (task, size, action) triples in submission order.
+        workers (int): Number of concurrent transfer slots assumed for the prediction.
+        bandwidth (float): Measured aggregate bytes/s, or None to assume ASSUMED_BANDWIDTH.
+        history_runs (int): Number of recorded runs the bandwidth comes from.
+        per_transfer (float): Highest bytes/s of a single transfer (default: ASSUMED_PER_TRANSFER).
+        print_fn (callable): Output function.
+    """
+    print_fn("🧭 Dry run: nothing will be downloaded")
+    per_dir = {}
+    counts = {}
+    transfer_sizes = []
+    for i, (task, size, action) in enumerate(actions, 1):
+        icon, transfers = PLAN_ACTIONS[action]
+        print_fn(f"   {i:>2}. {icon} {action:<8} {format_size(size):>9}  {task['filename']} -> {task['local_dir']}")
+        counts[action] = counts.get(action, 0) + 1
+        totals = per_dir.setdefault(task["local_dir"], [0, 0])
+        totals[0] += size or 0
+        if transfers:
+            totals[1] += size or 0
+            transfer_sizes.append(size)
+    print_fn("📂 Per target directory (total / to transfer):")
+    for local_dir, (total, transfer) in sorted(per_dir.items()):
+        print_fn(f"   {format_size(total):>9} / {format_size(transfer):>9}  {local_dir}")
+    print_fn("🧮 " + ", ".join(f"{counts[action]} {action}" for action in PLAN_ACTIONS if action in counts))
+    to_transfer = sum(size or 0 for size in transfer_sizes)
+    print_fn(f"💾 To transfer: {format_size(to_transfer)}")
+    if any(size is None for size in transfer_sizes):
+        print_fn("❔ Some sizes are unknown; the totals are a lower bound")
+    if not transfer_sizes:
+        return
+    if bandwidth:
+        basis = f"median of {history_runs} recorded run(s)"
+    else:
+        bandwidth, basis = ASSUMED_BANDWIDTH, "assumed, no runs recorded yet"
+    per_transfer = per_transfer or ASSUMED_PER_TRANSFER
+    makespan = predict_makespan(sorted(transfer_sizes, key=lambda size: -(size or 0)), workers, bandwidth, per_transfer)
+    print_fn(f"⏳ Predicted wall time: {format_duration(makespan)} at {format_size(bandwidth)}/s, up to "
+             f"{format_size(per_transfer)}/s per file ({basis})")
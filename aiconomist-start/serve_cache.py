@@ -0,0 +1,371 @@
+"""
+serve-cache: pull-through Hub cache shared by several pods.
+
+Run it on one pod (or a small VM next to the pods):
+
+    python3 serve_cache.py --port 8090 --blob-store /workspace/hub-cache
+
+and point the other pods' downloaders at it:
+
+    HF_ENDPOINT=http://<cache-host>:8090 python3 Download_wan2-2_T2V.py
+
+The server answers the Hub's /<repo>/resolve/<revision>/<path> URLs
+(with the datasets/ and spaces/ prefixes) from its BlobStore. HEAD returns the
+same metadata headers the Hub sends (X-Linked-Size, X-Linked-Etag,
+X-Repo-Commit), GET supports single byte ranges, so segmented and resumed
+downloads work unchanged. A miss is fetched from the upstream Hub once, with
+concurrent requests for the same file joining that single fill and streaming
+bytes as soon as they are written. Each file crosses the internet once per
+cluster instead of once per pod.
+
+The metadata of every resolved URL is also kept next to the blobs, so files
+that are already cached are still served when the Hub or the network is down
+(a 5xx, 429 or connection error from upstream); only misses fail then.
+
+The cache fetches with its own HF token (HF_TOKEN on the cache host), so only
+expose it on the pods' private network.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import asyncio
+import argparse
+import urllib.parse
+
+import hub_transfer
+from http_pool import HttpPool, TransferError
+from hub_transfer import (RemoteFile, hub_file_url, fetch_remote_file, segmented_download, download_file, is_retryable,
+                          PARTIAL_SUFFIX)
+from blob_store import BlobStore, BLOB_STORE_DIR, blob_key
+from concurrency import positive_int
+
+# --- Configuration ---
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8090
+METADATA_TTL = 300  # Seconds a resolved upstream HEAD is reused
+SEND_CHUNK = 1024 * 1024
+HEADER_TIMEOUT = 120  # Seconds an idle client connection is kept open
+METADATA_DIR = ".meta"  # Below the store root: last resolved metadata per URL, for when upstream is unreachable
+
+
+class _Fill:
+    """A blob being fetched from upstream that readers can stream from while it is written."""
+
+    def __init__(self, part_path):
+        self.part_path = part_path
+        self.state = None
+        self.started = asyncio.Event()
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def on_state(self, state):
+        self.state = state
+        self.started.set()
+
+    def notify(self, _nbytes=None):
+        # Wake everyone waiting on the current event, then arm a fresh one.
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def failed(self):
+        """True once the fill ended without producing the blob (error or cancellation)."""
+        return self.task.done() and (self.task.cancelled() or self.task.exception() is not None)
+
+    def available(self, position):
+        """Contiguous bytes already written from position on."""
+        if self.state is None:
+            return 0
+        for segment in self.state["segments"]:
+            if segment["start"] <= position < segment["end"]:
+                return segment["offset"] - position
+        return 0
+
+
+def parse_range(header, size):
+    """
+    Parses a single 'bytes=' range.
+
+    Returns:
+        tuple: (start, end_exclusive), None for no/unsupported range, or False if unsatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(0, size - length), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        return False
+    return start, min(end, size)
+
+
+class CacheServer:
+    """
+    Hub-compatible HTTP front end for a BlobStore with pull-through fills.
+
+    Args:
+        store (BlobStore): Where cached files live.
+        connections (int): Parallel range requests per upstream fill.
+    """
+
+    def __init__(self, store, connections=hub_transfer.SEGMENT_CONNECTIONS):
+        self.store = store
+        self.connections = connections
+        self.pool = HttpPool()
+        self.metadata = {}
+        self.fills = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, url):
+        """Upstream metadata for url, cached for METADATA_TTL and de-duplicated while in flight."""
+        cached = self.metadata.get(url)
+        if cached and (not cached[1].done() or time.monotonic() - cached[0] < METADATA_TTL):
+            return await asyncio.shield(cached[1])
+        future = asyncio.ensure_future(self._resolve_upstream(url))
+        self.metadata[url] = (time.monotonic(), future)
+        try:
+            return await asyncio.shield(future)
+        except TransferError:
+            self.metadata.pop(url, None)
+            raise
+
+    async def _resolve_upstream(self, url):
+        try:
+            remote = await fetch_remote_file(self.pool, url)
+        except TransferError as e:
+            # An answer from upstream (401/403/404) stands; an outage falls back to what was stored.
+            remote = self._stored_metadata(url) if is_retryable(e) else None
+            if remote is None:
+                raise
+            print(f"⚠️  Upstream unavailable ({e}), serving cached {url}")
+            return remote
+        self._store_metadata(url, remote)
+        return remote
+
+    def _metadata_path(self, url):
+        return os.path.join(self.store.root, METADATA_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _store_metadata(self, url, remote):
+        key = blob_key(remote)
+        if key is None or remote.size is None:
+            return
+        path = self._metadata_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as meta_file:
+            json.dump({"url": remote.url, "key": key, "size": remote.size, "etag": remote.etag,
+                       "sha256": remote.sha256, "commit": remote.commit}, meta_file)
+        os.replace(tmp_path, path)
+
+    def _stored_metadata(self, url):
+        """RemoteFile last resolved for url, or None unless its blob is in the store."""
+        try:
+            with open(self._metadata_path(url), "r") as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        remote = RemoteFile(meta["url"], meta["size"], etag=meta.get("etag"), sha256=meta.get("sha256"),
+                            commit=meta.get("commit"), accepts_ranges=True)
+        if blob_key(remote) != meta.get("key") or not self.store.has(meta["key"], meta["size"], repair=False):
+            return None
+        return remote
+
+    def ensure_fill(self, remote, key):
+        """Starts (or joins) the single upstream fill of a blob."""
+        fill = self.fills.get(key)
+        if fill is None:
+            path = self.store.path_for(key)
+            fill = _Fill(path + PARTIAL_SUFFIX)
+            fill.task = asyncio.ensure_future(self._fill(fill, remote, key))
+            # _fill() already reports its error; retrieve it so a fill nobody was reading is not logged again.
+            fill.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self.fills[key] = fill
+        return fill
+
+    async def _fill(self, fill, remote, key):
+        path = self.store.path_for(key)
+        print(f"🌐 MISS {remote.url} -> {path}")
+        try:
+            if remote.accepts_ranges and remote.size:
+                await segmented_download(self.pool, remote, path, self.connections,
+                                         on_progress=fill.notify, on_state=fill.on_state)
+            else:
+                await download_file(self.pool, remote, path, self.connections)
+            print(f"✅ CACHED {path}")
+        except Exception as e:
+            print(f"❌ Fill failed for {remote.url}: {e}")
+            raise
+        finally:
+            fill.started.set()
+            fill.notify()
+            self.fills.pop(key, None)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, _version = (request_line.split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = await self.respond(writer, method, target, headers)
+                if not keep_alive or headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, OSError):
+            return
+        finally:
+            writer.close()
+
+    def _route(self, target):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(target).path)
+        parts = path.lstrip("/").split("/")
+        repo_type = None
+        if parts and parts[0] in ("datasets", "spaces"):
+            repo_type = parts.pop(0)[:-1]
+        if len(parts) < 5 or parts[2] != "resolve":
+            return None
+        return "/".join(parts[:2]), repo_type, parts[3], "/".join(parts[4:])
+
+    async def _send_head(self, writer, status, reason, headers):
+        lines = [f"HTTP/1.1 {status} {reason}"] + [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def respond(self, writer, method, target, headers):
+        """Answers one request; returns False if the connection must be closed afterwards."""
+        route = self._route(target)
+        if method not in ("GET", "HEAD") or route is None:
+            await self._send_head(writer, 404, "Not Found", {"Content-Length": "0"})
+            return True
+        repo_id, repo_type, revision, filename = route
+        url = hub_file_url(repo_id, filename, repo_type, revision)
+        try:
+            remote = await self.resolve(url)
+        except TransferError as e:
+            status = e.status if e.status in (401, 403, 404) else 502
+            await self._send_head(writer, status, "Upstream Error", {"Content-Length": "0"})
+            return True
+
+        key = blob_key(remote)
+        meta = {
+            "Accept-Ranges": "bytes",
+            "Content-Type": "application/octet-stream",
+            "ETag": f'"{remote.sha256 or remote.etag or key}"',
+        }
+        if remote.sha256:
+            meta["X-Linked-Etag"] = f'"{remote.sha256}"'
+        if remote.size is not None:
+            meta["X-Linked-Size"] = str(remote.size)
+        if remote.commit:
+            meta["X-Repo-Commit"] = remote.commit
+        if key is None or remote.size is None:
+            # Without a content key or size there is nothing to cache safely.
+            await self._send_head(writer, 502, "Uncacheable Upstream Response", {"Content-Length": "0"})
+            return True
+
+        byte_range = parse_range(headers.get("range"), remote.size)
+        if byte_range is False:
+            meta["Content-Range"] = f"bytes */{remote.size}"
+            meta["Content-Length"] = "0"
+            await self._send_head(writer, 416, "Range Not Satisfiable", meta)
+            return True
+        start, end = byte_range or (0, remote.size)
+        meta["Content-Length"] = str(end - start)
+        if byte_range:
+            meta["Content-Range"] = f"bytes {start}-{end - 1}/{remote.size}"
+        status, reason = (206, "Partial Content") if byte_range else (200, "OK")
+
+        if method == "HEAD":
+            await self._send_head(writer, status, reason, meta)
+            return True
+        if self.store.has(key, remote.size):
+            self.hits += 1
+            print(f"📦 HIT {repo_id}/{filename} [{start}-{end})")
+            await self._send_head(writer, status, reason, meta)
+            with open(self.store.path_for(key), "rb") as blob:
+                await asyncio.get_running_loop().sendfile(writer.transport, blob, start, end - start)
+            return True
+
+        self.misses += 1
+        fill = self.ensure_fill(remote, key)
+        await self._send_head(writer, status, reason, meta)
+        return await self._stream_fill(writer, fill, key, start, end)
+
+    async def _stream_fill(self, writer, fill, key, start, end):
+        """Streams [start, end) of a blob that is still being filled, as fast as it is written."""
+        await fill.started.wait()
+        try:
+            source = open(fill.part_path, "rb")
+        except FileNotFoundError:
+            # The fill already finished (or failed) and renamed/removed its partial file.
+            if not self.store.has(key):
+                return False
+            source = open(self.store.path_for(key), "rb")
+        with source:
+            position = start
+            while position < end:
+                changed = fill.changed
+                available = fill.available(position) if not fill.task.done() else end - position
+                if fill.failed():
+                    return False
+                if available <= 0:
+                    await changed.wait()
+                    continue
+                size = min(available, end - position, SEND_CHUNK)
+                data = os.pread(source.fileno(), size, position)
+                if not data:
+                    return False
+                writer.write(data)
+                await writer.drain()
+                position += len(data)
+        return True
+
+
+async def serve(host, port, store, connections):
+    server = CacheServer(store, connections)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"🚀 serve-cache listening on http://{host}:{port} (upstream {hub_transfer.HF_ENDPOINT}, store {store.root})")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    """Runs the pull-through cache until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve a Hub-compatible pull-through cache for other pods.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--blob-store", default=BLOB_STORE_DIR, help=f"Cache directory (default: {BLOB_STORE_DIR})")
+    parser.add_argument("--upstream", default=hub_transfer.HF_ENDPOINT,
+                        help=f"Hub to fill misses from (default: {hub_transfer.HF_ENDPOINT})")
+    parser.add_argument("--connections", type=positive_int, default=hub_transfer.SEGMENT_CONNECTIONS,
+                        help="Parallel range requests per upstream fill")
+    args = parser.parse_args()
+
+    # hub_file_url() and auth_headers() read the endpoint at call time.
+    hub_transfer.HF_ENDPOINT = args.upstream.rstrip("/")
+    try:
+        asyncio.run(serve(args.host, args.port, BlobStore(args.blob_store), args.connections))
+    except KeyboardInterrupt:
+        print("\n👋 serve-cache stopped.")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
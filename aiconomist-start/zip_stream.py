@@ -0,0 +1,293 @@
+"""
+Extraction of ZIP archives while they are being downloaded.
+
+The central directory at the end of the archive is fetched first with a range
+request. It lists every member with its offset, sizes, compression and CRC,
+so the body can then be streamed front to back and each member inflated and
+written out as its bytes arrive. The archive itself is never stored: peak disk
+usage is the extracted size instead of archive + extracted size, and
+extraction finishes moments after the last byte arrives.
+
+Only stored and deflated, unencrypted members can be streamed; anything else
+is reported by is_streamable() so the caller can fall back to a full download.
+"""
+
+import os
+import zlib
+import struct
+import time
+import asyncio
+import zipfile
+
+from http_pool import TransferError
+from hub_transfer import CHUNK_SIZE, MAX_RETRIES, auth_headers, raise_for_status, is_retryable
+
+# --- Configuration ---
+TAIL_SIZE = 64 * 1024 + 22  # Largest possible EOCD record including its comment
+SKIP_LIMIT = 4 * 1024 * 1024  # Gaps between members up to this size are read through, not re-requested
+
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD64_LOCATOR = struct.Struct("<4sLQL")
+_EOCD64 = struct.Struct("<4sQ2H2L4Q")
+_CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_ZIP64_LIMIT = 0xFFFFFFFF
+
+
+class ZipMember:
+    """One entry of the central directory."""
+
+    def __init__(self, name, offset, compress_type, compress_size, file_size, crc, flags):
+        self.name = name
+        self.offset = offset
+        self.compress_type = compress_type
+        self.compress_size = compress_size
+        self.file_size = file_size
+        self.crc = crc
+        self.flags = flags
+
+    @property
+    def is_dir(self):
+        return self.name.endswith("/")
+
+
+async def _fetch_range(pool, url, start, end):
+    headers = auth_headers(url)
+    headers["Range"] = f"bytes={start}-{end - 1}"
+    async with await pool.request("GET", url, headers) as response:
+        raise_for_status(response, url)
+        if response.status != 206:
+            raise TransferError(f"Server ignored Range request for {url} (status {response.status})")
+        return await response.read_all()
+
+
+def _apply_zip64_extra(extra, file_size, compress_size, offset):
+    while len(extra) >= 4:
+        tag, size = struct.unpack("<HH", extra[:4])
+        if tag == 0x0001:
+            values = list(struct.unpack(f"<{size // 8}Q", extra[4:4 + size - size % 8]))
+            if file_size == _ZIP64_LIMIT and values:
+                file_size = values.pop(0)
+            if compress_size == _ZIP64_LIMIT and values:
+                compress_size = values.pop(0)
+            if offset == _ZIP64_LIMIT and values:
+                offset = values.pop(0)
+        extra = extra[4 + size:]
+    return file_size, compress_size, offset
+
+
+async def read_central_directory(pool, remote):
+    """
+    Fetches and parses the central directory of a remote ZIP archive.
+
+    Args:
+        pool (HttpPool): Connection pool to use.
+        remote (RemoteFile): Resolved archive; must report its size and accept ranges.
+
+    Returns:
+        list: ZipMember entries in archive order.
+    """
+    tail_start = max(0, remote.size - TAIL_SIZE)
+    tail = await _fetch_range(pool, remote.url, tail_start, remote.size)
+    eocd_pos = tail.rfind(b"PK\x05\x06")
+    if eocd_pos < 0 or len(tail) - eocd_pos < _EOCD.size:
+        raise zipfile.BadZipFile("End of central directory record not found")
+    _, _, _, _, count, cd_size, cd_offset, _ = _EOCD.unpack(tail[eocd_pos:eocd_pos + _EOCD.size])
+
+    locator_pos = eocd_pos - _EOCD64_LOCATOR.size
+    if locator_pos >= 0 and tail[locator_pos:locator_pos + 4] == b"PK\x06\x07":
+        _, _, eocd64_offset, _ = _EOCD64_LOCATOR.unpack(tail[locator_pos:eocd_pos])
+        record = await _fetch_range(pool, remote.url, eocd64_offset, eocd64_offset + _EOCD64.size)
+        if record[:4] != b"PK\x06\x06":
+            raise zipfile.BadZipFile("Corrupt zip64 end of central directory record")
+        _, _, _, _, _, _, _, count, cd_size, cd_offset = _EOCD64.unpack(record)
+
+    if cd_offset >= tail_start:
+        directory = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+    else:
+        directory = await _fetch_range(pool, remote.url, cd_offset, cd_offset + cd_size)
+
+    members = []
+    pos = 0
+    while pos + _CENTRAL_DIR.size <= len(directory) and len(members) < count:
+        fields = _CENTRAL_DIR.unpack(directory[pos:pos + _CENTRAL_DIR.size])
+        if fields[0] != b"PK\x01\x02":
+            raise zipfile.BadZipFile("Bad magic number for central directory entry")
+        flags, compress_type, crc = fields[5], fields[6], fields[9]
+        compress_size, file_size = fields[10], fields[11]
+        name_len, extra_len, comment_len = fields[12], fields[13], fields[14]
+        offset = fields[18]
+        pos += _CENTRAL_DIR.size
+        raw_name = directory[pos:pos + name_len]
+        extra = directory[pos + name_len:pos + name_len + extra_len]
+        pos += name_len + extra_len + comment_len
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+        file_size, compress_size, offset = _apply_zip64_extra(extra, file_size, compress_size, offset)
+        members.append(ZipMember(name, offset, compress_type, compress_size, file_size, crc, flags))
+    if len(members) != count:
+        raise zipfile.BadZipFile(f"Central directory lists {len(members)} of {count} entries")
+    return members
+
+
+def is_streamable(members):
+    """True if every member is unencrypted and stored or deflated."""
+    return all(
+        not member.flags & 0x1 and member.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+        for member in members
+    )
+
+
+def member_path(target_dir, name):
+    """Maps an archive name into target_dir, dropping absolute and '..' components like ZipFile.extract."""
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".", "..")]
+    return os.path.join(target_dir, *parts) if parts else None
+
+
+class _BodyReader:
+    """Sequential reader over a ranged GET that knows its absolute position."""
+
+    def __init__(self, response, position):
+        self.response = response
+        self.position = position
+        self.buffer = b""
+
+    async def read(self, size):
+        if not self.buffer:
+            self.buffer = await self.response.read(CHUNK_SIZE)
+            if not self.buffer:
+                raise TransferError(f"Connection closed early at byte {self.position}")
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        self.position += len(data)
+        return data
+
+    async def read_exact(self, size):
+        parts = []
+        while size:
+            data = await self.read(size)
+            parts.append(data)
+            size -= len(data)
+        return b"".join(parts)
+
+    def close(self):
+        self.response.close()
+
+
+class _MemberProgress:
+    """Passes a member's byte counts on once, even when a retry reads the member again."""
+
+    def __init__(self, on_progress):
+        self.on_progress = on_progress
+        self.reported = 0
+        self.seen = 0
+
+    def restart(self):
+        self.seen = 0
+
+    def __call__(self, nbytes):
+        self.seen += nbytes
+        if self.on_progress and self.seen > self.reported:
+            self.on_progress(self.seen - self.reported)
+            self.reported = self.seen
+
+
+async def _extract_member(reader, member, target_dir, on_progress, on_event=None):
+    header = await reader.read_exact(_LOCAL_HEADER.size)
+    fields = _LOCAL_HEADER.unpack(header)
+    if fields[0] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad magic number for file header of {member.name}")
+    await reader.read_exact(fields[10] + fields[11])
+    if on_progress:
+        on_progress(_LOCAL_HEADER.size + fields[10] + fields[11])
+
+    path = member_path(target_dir, member.name)
+    if path is None or member.is_dir:
+        if path:
+            os.makedirs(path, exist_ok=True)
+        await reader.read_exact(member.compress_size)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    inflater = zlib.decompressobj(-15) if member.compress_type == zipfile.ZIP_DEFLATED else None
+    crc = 0
+    remaining = member.compress_size
+    with open(path, "wb") as out:
+        while remaining:
+            data = await reader.read(min(remaining, CHUNK_SIZE))
+            remaining -= len(data)
+            if on_progress:
+                on_progress(len(data))
+            if inflater is not None:
+                data = inflater.decompress(data)
+            crc = zlib.crc32(data, crc)
+            started = time.monotonic()
+            out.write(data)
+            if on_event:
+                on_event("disk_write", bytes=len(data), seconds=time.monotonic() - started)
+        if inflater is not None:
+            tail = inflater.flush()
+            crc = zlib.crc32(tail, crc)
+            out.write(tail)
+    if crc != member.crc:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file '{member.name}'")
+
+
+async def stream_extract(pool, remote, members, target_dir, on_progress=None, on_event=None):
+    """
+    Streams the archive body once and extracts members as their bytes arrive.
+
+    Interrupted transfers are resumed with a range request from the start of
+    the member that was being extracted.
+
+    Args:
+        pool (HttpPool): Connection pool to use.
+        remote (RemoteFile): Resolved archive.
+        members (list): ZipMember entries from read_central_directory().
+        target_dir (str): Directory to extract into.
+        on_progress (callable): Optional callback receiving byte counts as they arrive.
+        on_event (callable): Optional callback receiving 'retry', 'disk_write', 'connect' and
+            'first_byte' events (name, **fields).
+
+    Returns:
+        int: Number of extracted members.
+    """
+    ordered = sorted(members, key=lambda member: member.offset)
+    reader = None
+    try:
+        for member in ordered:
+            attempt = 0
+            progress = _MemberProgress(on_progress)
+            while True:
+                progress.restart()
+                try:
+                    if reader is not None and 0 <= member.offset - reader.position <= SKIP_LIMIT:
+                        # Skip data descriptors or padding between members.
+                        await reader.read_exact(member.offset - reader.position)
+                    elif reader is None or reader.position != member.offset:
+                        if reader is not None:
+                            reader.close()
+                        headers = auth_headers(remote.url)
+                        # Open-ended range: the connection is abandoned once the last member is done.
+                        headers["Range"] = f"bytes={member.offset}-{remote.size - 1}"
+                        response = await pool.request("GET", remote.url, headers, on_event)
+                        if response.status != 206:
+                            # Nothing of this body is read; drop the connection instead of leaking it.
+                            response.close()
+                            raise_for_status(response, remote.url)
+                            raise TransferError(f"Server ignored Range request for {remote.url}")
+                        reader = _BodyReader(response, member.offset)
+                    await _extract_member(reader, member, target_dir, progress, on_event)
+                    break
+                except TransferError as e:
+                    if reader is not None:
+                        reader.close()
+                        reader = None
+                    attempt += 1
+                    if not is_retryable(e) or attempt > MAX_RETRIES:
+                        raise
+                    if on_event:
+                        on_event("retry", error=str(e), attempt=attempt)
+                    await asyncio.sleep(min(30, 2 ** attempt))
+    finally:
+        if reader is not None:
+            reader.close()
+    return len([member for member in ordered if not member.is_dir])
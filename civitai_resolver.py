@@ -0,0 +1,202 @@
+"""
+Cached Civitai model-version lookups.
+
+Civitai download URLs (https://civitai.com/api/download/models/<versionId>,
+or model pages with ?modelVersionId=<id>) do not reveal the file they point
+to: the URL basename is a numeric ID and sizes are only known once a transfer
+starts. The model-version API describes every file of a version (name, size,
+hashes). It is queried once per version ID and the answer is cached on disk,
+so later plans, skip checks and integrity checks need no further requests.
+
+Usage: python3 civitai_resolver.py <civitai-url>
+    Prints "<filename>\t<size-bytes>\t<sha256>" for the file the URL downloads
+    ("-" for an unknown size or hash).
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# --- Configuration ---
+CIVITAI_API_BASE = os.environ.get("CIVITAI_API_BASE", "https://civitai.com/api/v1").rstrip("/")
+CIVITAI_CACHE_PATH = os.environ.get(
+    "CIVITAI_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "comfyui-installer", "civitai-versions.json"))
+CIVITAI_CACHE_TTL = int(os.environ.get("CIVITAI_CACHE_TTL", str(7 * 24 * 3600)))  # Seconds; versions rarely change
+REQUEST_TIMEOUT = 30
+USER_AGENT = "comfyui-model-installer/1.0"
+FILE_SELECTORS = ("type", "format", "size", "fp")  # Download URL parameters that pick one file of a version
+
+_DOWNLOAD_PATH = re.compile(r"/api/download/models/(\d+)")
+
+
+class CivitaiFile:
+    """One file of a Civitai model version."""
+
+    def __init__(self, version_id, name, size, sha256, download_url):
+        self.version_id = version_id
+        self.name = name
+        self.size = size
+        self.sha256 = sha256
+        self.download_url = download_url
+
+
+def is_civitai_url(url):
+    host = (urllib.parse.urlsplit(url).hostname or "").lower()
+    return host == "civitai.com" or host.endswith(".civitai.com")
+
+
+def parse_version_id(url):
+    """
+    Extracts the model-version ID from a Civitai download or model-page URL.
+
+    Returns:
+        str: The version ID, or None if the URL does not name one.
+    """
+    if not is_civitai_url(url):
+        return None
+    parts = urllib.parse.urlsplit(url)
+    match = _DOWNLOAD_PATH.search(parts.path)
+    if match:
+        return match.group(1)
+    version = urllib.parse.parse_qs(parts.query).get("modelVersionId")
+    return version[0] if version and version[0].isdigit() else None
+
+
+def _select_file(files, url):
+    # Download URLs may pick a file with ?type=...&format=...&size=...&fp=...; otherwise Civitai serves
+    # the primary file. Every selector in the URL has to match, and an ambiguous pick returns None so the
+    # caller falls back to asking the server instead of trusting the size and hash of the wrong file.
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+    wanted = {key: query[key][0] for key in FILE_SELECTORS if query.get(key)}
+    if wanted:
+        matches = [file for file in files
+                   if all((file.get(key) if key == "type" else (file.get("metadata") or {}).get(key)) == value
+                          for key, value in wanted.items())]
+        return matches[0] if len(matches) == 1 else None
+    for file in files:
+        if file.get("primary"):
+            return file
+    return files[0] if files else None
+
+
+class CivitaiResolver:
+    """
+    Resolves Civitai URLs to file metadata through a TTL-bounded disk cache.
+
+    Args:
+        cache_path (str): JSON file holding cached version responses.
+        ttl (int): Seconds a cached version stays valid.
+        api_base (str): API root; point it at a local server to test without Civitai.
+        token (str): Optional Civitai API token.
+    """
+
+    def __init__(self, cache_path=CIVITAI_CACHE_PATH, ttl=CIVITAI_CACHE_TTL, api_base=CIVITAI_API_BASE,
+                 token=None):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.api_base = api_base.rstrip("/")
+        self.token = token if token is not None else (
+            os.environ.get("CIVITAI_TOKEN") or os.environ.get("EXPORT_CIVITAI_TOKEN") or "")
+        self.lock = threading.Lock()
+        self.cache = self._read()
+        self.api_calls = 0
+
+    def _read(self):
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        # Merge with the file on disk so parallel installers keep each other's entries.
+        merged = self._read()
+        merged.update(self.cache)
+        self.cache = merged
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump(merged, cache_file)
+        os.replace(tmp_path, self.cache_path)
+
+    def _fetch_version(self, version_id):
+        request = urllib.request.Request(f"{self.api_base}/model-versions/{version_id}",
+                                         headers={"User-Agent": USER_AGENT, "Accept": "application/json"})
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        self.api_calls += 1
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            data = json.load(response)
+        files = []
+        for file in data.get("files") or []:
+            size_kb = file.get("sizeKB")
+            files.append({
+                "name": file.get("name"),
+                "size": int(round(size_kb * 1024)) if size_kb else None,
+                "sha256": ((file.get("hashes") or {}).get("SHA256") or "").lower() or None,
+                "type": file.get("type"),
+                "metadata": file.get("metadata") or {},
+                "primary": bool(file.get("primary")),
+                "downloadUrl": file.get("downloadUrl"),
+            })
+        return {"fetched_at": time.time(), "files": files}
+
+    def version(self, version_id):
+        """
+        Cached file list of a model version, fetching it when missing or expired.
+
+        Raises:
+            urllib.error.URLError: If the API cannot be reached or rejects the request.
+        """
+        with self.lock:
+            cached = self.cache.get(version_id)
+            if cached and time.time() - cached.get("fetched_at", 0) < self.ttl:
+                return cached
+        entry = self._fetch_version(version_id)
+        with self.lock:
+            self.cache[version_id] = entry
+            self._save()
+        return entry
+
+    def resolve(self, url):
+        """
+        Describes the file a Civitai URL downloads.
+
+        Returns:
+            CivitaiFile: The file, or None if the URL names no model version.
+        """
+        version_id = parse_version_id(url)
+        if version_id is None:
+            return None
+        file = _select_file(self.version(version_id)["files"], url)
+        if file is None:
+            return None
+        return CivitaiFile(version_id, file["name"], file["size"], file["sha256"], file["downloadUrl"] or url)
+
+
+def main():
+    """Prints name, size and sha256 of the file behind a Civitai URL."""
+    if len(sys.argv) != 2:
+        print("Usage: python3 civitai_resolver.py <civitai-url>", file=sys.stderr)
+        return 2
+    try:
+        file = CivitaiResolver().resolve(sys.argv[1])
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        print(f"❌ Civitai lookup failed: {getattr(e, 'reason', e)}", file=sys.stderr)
+        return 1
+    if file is None:
+        print("❌ No Civitai model version found in URL.", file=sys.stderr)
+        return 1
+    # "-" marks unknown fields so the line always splits into three words in shell scripts.
+    print(f"{file.name}\t{file.size or '-'}\t{file.sha256 or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,23 @@ set -euo pipefail
 
 # install-checkpoint.sh — Simple script to download models into ComfyUI
 # Usage: ./install-checkpoint.sh
+#        ./install-checkpoint.sh --batch <file|-> [--backup] [-j N] [--hf-jobs N] [--civitai-jobs N]
+#
+# Batch mode reads one "url [dest] [filename]" line per model (quotes allowed, '#'
+# starts a comment) and installs them concurrently without prompting:
+#   dest      – defaults to ComfyUI/models/checkpoints (relative to the current directory)
+#   filename  – defaults to the Civitai file name or the URL basename
+# Tokens come from HF_TOKEN / CIVITAI_TOKEN. Existing files are skipped unless --backup
+# is given, which moves them to <file>.bak.<timestamp> before downloading again.
+
+if [[ "${1:-}" == "--batch" || "${1:-}" == --batch=* ]]; then
+  SCRIPT_DIR=$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)
+  if ! command -v python3 >/dev/null 2>&1; then
+    echo "❌ python3 is required for batch mode."
+    exit 1
+  fi
+  exec python3 "${SCRIPT_DIR}/model_manifest.py" "$@"
+fi
 
 echo "🤖 ComfyUI Model Installer"
 echo "=========================="
@@ -129,6 +146,23 @@ URL_CLEAN="${URL_CLEAN%/}"
 URL_BASENAME="${URL_CLEAN##*/}"
 DEFAULT_FILENAME=$(sanitize_filename "${URL_BASENAME}")
 
+# Civitai URLs end in a numeric version ID; ask the (cached) model-version API for the real file
+SCRIPT_DIR=$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)
+CIVITAI_RESOLVER="${SCRIPT_DIR}/civitai_resolver.py"
+EXPECTED_SHA256=""
+if [[ "${ACCESS_PROVIDER}" == "Civitai" && -f "${CIVITAI_RESOLVER}" ]] && command -v python3 >/dev/null 2>&1; then
+  if CIVITAI_INFO=$(CIVITAI_TOKEN="${CIVITAI_TOKEN:-}" python3 "${CIVITAI_RESOLVER}" "${MODEL_URL}"); then
+    IFS=$'\t' read -r CIVITAI_NAME CIVITAI_SIZE EXPECTED_SHA256 <<< "${CIVITAI_INFO}"
+    DEFAULT_FILENAME=$(sanitize_filename "${CIVITAI_NAME}")
+    [[ "${EXPECTED_SHA256}" == "-" ]] && EXPECTED_SHA256=""
+    if [[ "${CIVITAI_SIZE}" != "-" ]]; then
+      echo "🧾 Civitai file: ${CIVITAI_NAME} ($(( CIVITAI_SIZE / 1024 / 1024 )) MB)"
+    else
+      echo "🧾 Civitai file: ${CIVITAI_NAME}"
+    fi
+  fi
+fi
+
 echo ""
 if [[ -n "${DEFAULT_FILENAME}" ]]; then
   read -rp "Enter output filename with extension [${DEFAULT_FILENAME}]: " USER_FILENAME
@@ -175,6 +209,15 @@ CURL_ARGS+=(-o "${DEST_PATH}" "${MODEL_URL}")
 
 # Execute download
 if curl "${CURL_ARGS[@]}"; then
+  if [[ -n "${EXPECTED_SHA256}" ]] && command -v sha256sum >/dev/null 2>&1; then
+    ACTUAL_SHA256=$(sha256sum "${DEST_PATH}" | cut -d' ' -f1)
+    if [[ "${ACTUAL_SHA256}" != "${EXPECTED_SHA256}" ]]; then
+      echo "❌ Checksum mismatch: expected ${EXPECTED_SHA256}, got ${ACTUAL_SHA256}"
+      rm -f "${DEST_PATH}"
+      exit 2
+    fi
+    echo "🔒 sha256 verified against Civitai metadata"
+  fi
   echo ""
   echo "✅ Successfully downloaded ${MODEL_TYPE}!"
   echo "📁 Saved to: ${DEST_PATH}"
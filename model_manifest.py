@@ -0,0 +1,1188 @@
+"""
+Manifest engine behind auto-install-models.sh.
+
+Parses a models-config JSON array once, validates every entry up front and
+turns it into a complete install plan before any byte is transferred. The
+shell script is only a shim that finds a Python interpreter and execs this
+module with the same arguments.
+
+Downloads run in parallel under a global job budget, with separate caps per
+provider: Civitai throttles far earlier than the Hugging Face CDN, so one slow
+Civitai LoRA must not hold back Hub transfers or be hammered by all workers.
+
+Before anything is transferred, every URL is resolved concurrently (redirects,
+size, ETag and the Hub's LFS sha256), so the plan can skip complete files,
+replace truncated ones, check free disk space and start the largest files
+first, all in about one round trip.
+
+Validators (ETag, Last-Modified, LFS sha256) of installed files are kept in a
+state file, so `overwrite: true` entries are only transferred again when the
+remote content changed; an unchanged file costs one HEAD or a 304.
+
+Civitai URLs are described by the model-version API through a disk cache
+(civitai_resolver.py) instead of HEAD requests, and files with a known sha256
+are verified as they are written.
+
+--plan stops after planning and prints what would be fetched, resumed,
+skipped or refreshed, bytes per destination directory and a wall time
+predicted from the throughput recorded by earlier runs on this machine.
+
+Usage: python3 model_manifest.py [options] <config.json> [base-directory]
+       python3 model_manifest.py --batch <file|-> [--backup] [options]
+
+Batch mode (used by install-model.sh --batch) reads "url [dest] [filename]"
+lines instead of a JSON config and installs them the same way.
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import hashlib
+import threading
+import concurrent.futures
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from civitai_resolver import CivitaiResolver, parse_version_id
+
+# scheduling.py is shared with the aiconomist-start downloaders. add-workflows.sh puts it next to
+# this script; in a checkout of the repository it is found in aiconomist-start/.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "aiconomist-start"))
+from scheduling import (ASSUMED_BANDWIDTH, ASSUMED_PER_TRANSFER, format_size, format_duration, measured_bandwidth,
+                        measured_per_transfer, record_bandwidth, predict_makespan)
+
+# --- Configuration ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INVALID_FILENAME_CHARS = '<>:"\\/|?*'
+TRUE_VALUES = ("true", "1", "yes", "y", "on")
+FALSE_VALUES = ("false", "0", "no", "n", "off")
+DEFAULT_JOBS = int(os.environ.get("MODEL_INSTALL_JOBS", "4"))  # Concurrent downloads overall
+HOST_LIMITS = {  # Concurrent downloads per provider; other hosts get DEFAULT_HOST_LIMIT each
+    "huggingface.co": int(os.environ.get("HF_MAX_JOBS", "4")),
+    "civitai.com": int(os.environ.get("CIVITAI_MAX_JOBS", "2")),
+}
+DEFAULT_HOST_LIMIT = 2
+PARTIAL_SUFFIX = ".partial"
+SIDECAR_SUFFIX = ".partial.json"
+SIDECAR_FLUSH_INTERVAL = 2.0  # Seconds between resume-state writes
+CHUNK_SIZE = 1024 * 1024
+REQUEST_TIMEOUT = 60
+USER_AGENT = "comfyui-model-installer/1.0"
+METADATA_CONCURRENCY = 16  # Parallel HEAD requests while planning
+MAX_REDIRECTS = 5
+MAX_RETRIES = 5  # Further attempts per entry after a transient error, each resuming the partial file
+MAX_RETRY_DELAY = 30  # Seconds; the backoff doubles from 2s up to this
+DISK_HEADROOM = 1024 ** 3  # Free space to leave on each filesystem
+STATE_FILENAME = ".model-manifest-state.json"  # Validators of installed files, kept in the base directory
+BATCH_DEFAULT_DEST = "ComfyUI/models/checkpoints"  # Same default as install-model.sh's first choice
+
+PROVIDER_HINTS = {
+    "civitai.com": [
+        "The model may require a Civitai account and API token (export CIVITAI_TOKEN=...)",
+        "Get your API token from: https://civitai.com/user/account",
+        "Some models are restricted and require special permissions",
+        "Try downloading manually from the web interface first",
+    ],
+    "huggingface.co": [
+        "Ensure your Hugging Face token has the correct repository access (export HF_TOKEN=...)",
+        "Hugging Face private repos require the read scope token",
+        "Confirm the URL points to the raw file (e.g., /resolve/main/...)",
+        "Try downloading with huggingface-cli if the issue persists",
+    ],
+}
+
+USAGE = """Usage: ./auto-install-models.sh [options] <config.json> [base-directory]
+  config.json     Path to a JSON array describing model downloads.
+  base-directory  Optional root for relative destinations (defaults to script directory).
+
+Options:
+  -h, --help                         Show this help message and exit.
+  --show-example-format-for-json     Print an example JSON config and exit.
+  -j, --jobs N                       Concurrent downloads overall (default: $MODEL_INSTALL_JOBS or 4).
+  --hf-jobs N                        Concurrent huggingface.co downloads (default: $HF_MAX_JOBS or 4).
+  --civitai-jobs N                   Concurrent civitai.com downloads (default: $CIVITAI_MAX_JOBS or 2).
+  --host-jobs HOST=N                 Concurrent downloads from any other host (default: 2 each).
+  --ignore-disk-space                Download even if the free-space check fails.
+  --plan                             Show what would be fetched, skipped or refreshed, bytes per
+                                     directory and a predicted wall time; download nothing."""
+
+EXAMPLE_CONFIG = """[
+  {
+    "url": "https://huggingface.co/owner/repo/resolve/main/model.safetensors",
+    "filename": "model.safetensors",
+    "dest": "ComfyUI/models/checkpoints"
+  }
+]"""
+
+
+class ManifestError(Exception):
+    """Raised for a config file or entry that cannot be installed."""
+
+
+class ShortBodyError(OSError):
+    """Raised when the server closes the connection before the announced Content-Length."""
+
+
+class DownloadInterrupted(Exception):
+    """Raised inside a transfer once the run is being stopped (Ctrl-C)."""
+
+
+class ManifestEntry:
+    """One validated models-config entry with its resolved destination."""
+
+    def __init__(self, number, url, dest_dir, filename, overwrite, backup=False):
+        self.number = number
+        self.url = url
+        self.dest_dir = dest_dir
+        self.filename = filename
+        self.dest_path = os.path.join(dest_dir, filename)
+        self.overwrite = overwrite
+        self.backup = backup
+
+    @property
+    def host(self):
+        return (urllib.parse.urlsplit(self.url).hostname or "").lower()
+
+    @property
+    def provider(self):
+        """Key the per-host limit applies to: the provider domain, or the bare host for others."""
+        for provider in HOST_LIMITS:
+            if self.host == provider or self.host.endswith("." + provider):
+                return provider
+        return self.host
+
+
+def sanitize_filename(filename):
+    """Drops characters that are invalid in filenames, leading dots/whitespace and trailing whitespace."""
+    filename = "".join(char for char in filename if char not in INVALID_FILENAME_CHARS)
+    return filename.lstrip(" \t\n\r\f\v.").rstrip()
+
+
+def _text_field(entry, key):
+    # Mirrors jq's `.key // empty`: null and false count as missing.
+    value = entry.get(key)
+    if value is None or value is False:
+        return ""
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _parse_overwrite(entry, number):
+    raw = _text_field(entry, "overwrite")
+    if not raw:
+        return False
+    if raw.lower() in TRUE_VALUES:
+        return True
+    if raw.lower() in FALSE_VALUES:
+        return False
+    raise ManifestError(f"Entry #{number}: Invalid overwrite value '{raw}'.")
+
+
+def resolve_base_dir(base_dir_input):
+    """Base directory for relative destinations: the script directory unless given (relative to it)."""
+    if not base_dir_input:
+        base_dir = SCRIPT_DIR
+    else:
+        base_dir = os.path.join(SCRIPT_DIR, base_dir_input)
+    return base_dir.rstrip("/") or "/"
+
+
+def load_manifest(config_path, base_dir):
+    """
+    Reads and validates a models-config file.
+
+    Args:
+        config_path (str): Path to the JSON array.
+        base_dir (str): Root for relative 'dest' values.
+
+    Returns:
+        list: ManifestEntry objects in config order.
+
+    Raises:
+        ManifestError: If the file or any entry is invalid.
+    """
+    try:
+        with open(config_path, "r") as config_file:
+            data = json.load(config_file)
+    except ValueError as e:
+        raise ManifestError(f"Config file is not valid JSON: {e}")
+    if not isinstance(data, list):
+        raise ManifestError("Config file must contain a JSON array.")
+
+    entries = []
+    for index, raw in enumerate(data):
+        number = index + 1
+        if not isinstance(raw, dict):
+            raise ManifestError(f"Entry #{number} must be a JSON object.")
+        for key in ("url", "dest", "filename"):
+            if not _text_field(raw, key):
+                raise ManifestError(f"Entry #{number} is missing the required '{key}' field.")
+        dest = _text_field(raw, "dest")
+        dest_dir = (dest if dest.startswith("/") else os.path.join(base_dir, dest)).rstrip("/") or "/"
+        filename = sanitize_filename(_text_field(raw, "filename"))
+        if not filename:
+            raise ManifestError(f"Entry #{number}: Invalid filename after sanitization.")
+        entries.append(ManifestEntry(number, _text_field(raw, "url"), dest_dir, filename,
+                                     _parse_overwrite(raw, number)))
+    return entries
+
+
+def _url_basename(url):
+    return urllib.parse.unquote(urllib.parse.urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1])
+
+
+def load_batch(lines, base_dir, resolver=None, backup=False):
+    """
+    Parses install-model.sh batch lines of the form "url [dest] [filename]".
+
+    Blank lines and lines starting with '#' are ignored; fields may be quoted.
+    A missing dest defaults to BATCH_DEFAULT_DEST. A missing filename is taken
+    from Civitai's model-version metadata for Civitai URLs and from the URL
+    basename otherwise.
+
+    Args:
+        lines (iterable): Input lines.
+        base_dir (str): Root for relative destinations.
+        resolver (CivitaiResolver): Cached Civitai lookups, if any.
+        backup (bool): Move existing files to a timestamped backup and download again.
+
+    Returns:
+        list: ManifestEntry objects in input order.
+
+    Raises:
+        ManifestError: If any line is invalid.
+    """
+    rows = []
+    for line_number, line in enumerate(lines, 1):
+        try:
+            fields = shlex.split(line, comments=True)
+        except ValueError as e:
+            raise ManifestError(f"Line {line_number}: {e}")
+        if not fields:
+            continue
+        if len(fields) > 3:
+            raise ManifestError(f"Line {line_number}: expected 'url [dest] [filename]', got {len(fields)} fields.")
+        url, dest, filename = (fields + [None, None])[:3]
+        if urllib.parse.urlsplit(url).scheme not in ("http", "https"):
+            raise ManifestError(f"Line {line_number}: '{url}' is not an http(s) URL.")
+        rows.append((line_number, url, dest or BATCH_DEFAULT_DEST, filename))
+
+    # Names of Civitai files come from the API; look them up concurrently.
+    names = {}
+    lookups = [url for _, url, _, filename in rows if not filename and resolver and parse_version_id(url)]
+    if lookups:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=METADATA_CONCURRENCY) as executor:
+            futures = {executor.submit(resolver.resolve, url): url for url in set(lookups)}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    file = future.result()
+                except (urllib.error.URLError, OSError, ValueError) as e:
+                    print(f"⚠️  Civitai lookup failed for {futures[future]}: {getattr(e, 'reason', e)}",
+                          file=sys.stderr)
+                    continue
+                if file is not None and file.name:
+                    names[futures[future]] = file.name
+
+    entries = []
+    for number, (line_number, url, dest, filename) in enumerate(rows, 1):
+        filename = sanitize_filename(filename or names.get(url) or _url_basename(url))
+        if not filename:
+            raise ManifestError(f"Line {line_number}: could not determine a filename for {url}; add one.")
+        dest_dir = os.path.join(base_dir, dest).rstrip("/") or "/"
+        entries.append(ManifestEntry(number, url, dest_dir, filename, overwrite=False, backup=backup))
+    return entries
+
+
+class ValidatorStore:
+    """
+    JSON map of destination path -> validators of the installed file.
+
+    An entry only counts while the file still has the size and mtime it was
+    stored with, so a file replaced by hand is never mistaken for current.
+
+    Args:
+        path (str): Location of the state file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.files = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as state_file:
+                return json.load(state_file).get("files", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def current(self, entry):
+        """Stored validators of the entry's file if it is unchanged on disk, else None."""
+        record = self.files.get(entry.dest_path)
+        if record is None or record.get("url") != entry.url:
+            return None
+        try:
+            stat = os.stat(entry.dest_path)
+        except OSError:
+            return None
+        if stat.st_size != record.get("size") or stat.st_mtime_ns != record.get("mtime_ns"):
+            return None
+        return record
+
+    def record(self, entry, etag, last_modified, sha256=None):
+        stat = os.stat(entry.dest_path)
+        with self.lock:
+            self.files[entry.dest_path] = {
+                "url": entry.url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            # Merge with the file on disk so concurrent installers keep each other's entries.
+            merged = self._read()
+            merged.update(self.files)
+            self.files = merged
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as state_file:
+                json.dump({"files": merged}, state_file, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def validators_match(record, remote):
+    """True if a stored record and fresh RemoteInfo describe the same content."""
+    for key in ("sha256", "etag", "last_modified"):
+        stored, fresh = record.get(key), getattr(remote, key)
+        if stored and fresh:
+            return stored == fresh
+    return False
+
+
+def plan_entries(entries, remotes=None, store=None):
+    """
+    Decides what happens to every entry based on what is already on disk.
+
+    A later entry targeting the same path as an earlier one is skipped, as it
+    would have been when entries were installed one after another. An existing
+    file whose size differs from the remote one is left over from an
+    interrupted copy and is replaced even without overwrite. An overwrite
+    entry whose stored validators match the remote ones is 'unchanged'.
+
+    Args:
+        entries (list): ManifestEntry objects.
+        remotes (dict): Entry number -> RemoteInfo from prefetch_remotes(), if available.
+        store (ValidatorStore): Validators recorded by earlier installs, if any.
+
+    Returns:
+        list: (entry, action) pairs with action 'skip', 'unchanged', 'overwrite' or 'download'.
+    """
+    plan = []
+    seen = set()
+    for entry in entries:
+        if entry.dest_path in seen:
+            plan.append((entry, "skip"))
+            continue
+        seen.add(entry.dest_path)
+        if os.path.isfile(entry.dest_path) and entry.backup:
+            plan.append((entry, "overwrite"))
+        elif os.path.isfile(entry.dest_path):
+            remote = (remotes or {}).get(entry.number)
+            stale = remote is not None and remote.size is not None and os.path.getsize(entry.dest_path) != remote.size
+            record = store.current(entry) if store and entry.overwrite and not stale else None
+            if record and remote and validators_match(record, remote):
+                plan.append((entry, "unchanged"))
+            else:
+                plan.append((entry, "overwrite" if entry.overwrite or stale else "skip"))
+        else:
+            plan.append((entry, "download"))
+    return plan
+
+
+def get_tokens():
+    """Hugging Face and Civitai tokens from the environment (EXPORT_* aliases included)."""
+    return {
+        "huggingface.co": os.environ.get("HF_TOKEN") or os.environ.get("EXPORT_HF_TOKEN") or "",
+        "civitai.com": os.environ.get("CIVITAI_TOKEN") or os.environ.get("EXPORT_CIVITAI_TOKEN") or "",
+    }
+
+
+def auth_headers(entry, tokens):
+    """Authorization header for the entry's provider, if a token for it is set."""
+    for provider, token in tokens.items():
+        if provider in entry.host and token:
+            return {"Authorization": f"Bearer {token}"}
+    return {}
+
+
+class RemoteInfo:
+    """What a HEAD request revealed about an entry's URL."""
+
+    def __init__(self, url, size=None, etag=None, last_modified=None, sha256=None, accepts_ranges=False):
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.sha256 = sha256
+        self.accepts_ranges = accepts_ranges
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_head_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _head(url, headers, method="HEAD"):
+    request = urllib.request.Request(url, method=method, headers=dict(headers, **{"User-Agent": USER_AGENT}))
+    if method == "GET":
+        request.add_header("Range", "bytes=0-0")
+    try:
+        response = _head_opener.open(request, timeout=REQUEST_TIMEOUT)
+    except urllib.error.HTTPError as e:
+        if e.code in (301, 302, 303, 307, 308):
+            e.close()
+            return e.code, e.headers
+        raise
+    with response:
+        return response.status, response.headers
+
+
+def fetch_remote_info(entry, tokens, resolver=None):
+    """
+    Follows an entry's redirects with HEAD requests and collects its metadata.
+
+    Hub /resolve URLs answer the first hop with X-Linked-Size and X-Linked-Etag
+    (the LFS sha256); the final hop carries Content-Length and ETag. Hosts
+    that refuse HEAD on signed URLs are asked for a single byte with GET.
+    Civitai model versions are looked up through the resolver's cache first.
+
+    Returns:
+        RemoteInfo: Metadata of the final URL.
+    """
+    if resolver is not None and parse_version_id(entry.url):
+        try:
+            file = resolver.resolve(entry.url)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            print(f"⚠️  Civitai lookup failed for {entry.url}: {getattr(e, 'reason', e)}", file=sys.stderr)
+            file = None
+        if file is not None and file.size is not None:
+            return RemoteInfo(entry.url, size=file.size, sha256=file.sha256, accepts_ranges=True)
+    url = entry.url
+    headers = auth_headers(entry, tokens)
+    linked_size = sha256 = None
+    for _ in range(MAX_REDIRECTS + 1):
+        try:
+            status, response_headers = _head(url, headers)
+        except urllib.error.HTTPError as e:
+            if e.code not in (403, 405):
+                raise
+            status, response_headers = _head(url, headers, method="GET")
+        linked_size = linked_size or response_headers.get("X-Linked-Size")
+        linked_etag = (response_headers.get("X-Linked-Etag") or "").strip('"')
+        if len(linked_etag) == 64 and all(char in "0123456789abcdef" for char in linked_etag):
+            sha256 = linked_etag
+        if status in (301, 302, 303, 307, 308):
+            next_url = urllib.parse.urljoin(url, response_headers.get("Location", ""))
+            if urllib.parse.urlsplit(next_url).netloc != urllib.parse.urlsplit(url).netloc:
+                headers = {}  # Tokens stay with the provider, as in download_entry().
+            url = next_url
+            continue
+        size = response_headers.get("Content-Length")
+        content_range = response_headers.get("Content-Range", "")
+        if status == 206 and "/" in content_range:
+            size = content_range.rsplit("/", 1)[1]
+        size = size if size and size.isdigit() else linked_size
+        return RemoteInfo(
+            url,
+            size=int(size) if size and size.isdigit() else None,
+            etag=response_headers.get("ETag"),
+            last_modified=response_headers.get("Last-Modified"),
+            sha256=sha256,
+            accepts_ranges=status == 206 or response_headers.get("Accept-Ranges") == "bytes",
+        )
+    raise urllib.error.URLError(f"too many redirects for {entry.url}")
+
+
+def prefetch_remotes(entries, tokens, resolver=None):
+    """
+    Resolves every entry's metadata concurrently.
+
+    Failures are reported and left to the download itself, which retries and
+    prints the definitive error.
+
+    Args:
+        entries (list): ManifestEntry objects.
+        tokens (dict): Provider tokens from get_tokens().
+        resolver (CivitaiResolver): Cached Civitai lookups, if any.
+
+    Returns:
+        dict: Entry number -> RemoteInfo, for entries that resolved.
+    """
+    remotes = {}
+    unique = {}
+    for entry in entries:
+        unique.setdefault(entry.url, entry)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=METADATA_CONCURRENCY) as executor:
+        futures = {executor.submit(fetch_remote_info, entry, tokens, resolver): url for url, entry in unique.items()}
+        by_url = {}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                by_url[futures[future]] = future.result()
+            except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+                print(f"⚠️  Could not resolve {futures[future]}: {getattr(e, 'reason', e)}", file=sys.stderr)
+    for entry in entries:
+        if entry.url in by_url:
+            remotes[entry.number] = by_url[entry.url]
+    return remotes
+
+
+def _mount_point(path):
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    while not os.path.ismount(path):
+        path = os.path.dirname(path)
+    return path
+
+
+def check_disk_space(plan, remotes):
+    """
+    Compares the bytes still to be written with the free space of each target filesystem.
+
+    Bytes already received into a resumable partial file (as its sidecar
+    records them) are not counted again.
+
+    Returns:
+        bool: True if every filesystem has room for its downloads plus DISK_HEADROOM.
+    """
+    needed = {}
+    for entry, action in plan:
+        remaining = _remaining_bytes(entry, remotes.get(entry.number))
+        if action in ("skip", "unchanged") or remaining is None:
+            continue
+        mount = _mount_point(entry.dest_dir)
+        needed[mount] = needed.get(mount, 0) + remaining
+
+    enough = True
+    for mount, nbytes in sorted(needed.items()):
+        stat = os.statvfs(mount)
+        free = stat.f_bavail * stat.f_frsize
+        print(f"💽 Disk space on {mount}: {format_size(nbytes)} needed, {format_size(free)} free")
+        if nbytes + DISK_HEADROOM > free:
+            enough = False
+            print(f"❌ Not enough free space on {mount}: need {format_size(nbytes + DISK_HEADROOM)} "
+                  f"including {format_size(DISK_HEADROOM)} headroom, only {format_size(free)} available",
+                  file=sys.stderr)
+    return enough
+
+
+def _remaining_bytes(entry, remote):
+    """Bytes still to transfer for an entry, or None if the remote size is unknown."""
+    if remote is None or remote.size is None:
+        return None
+    # The sidecar's count, not the partial's size: a preallocated or sparse file says nothing about progress.
+    state = _load_sidecar(entry)
+    if state is not None:
+        return max(0, remote.size - state["bytes"])
+    return remote.size
+
+
+def print_dry_run(plan, remotes, base_dir, jobs):
+    """
+    Prints what an install would do without downloading anything: one line
+    per entry, bytes per destination directory and a predicted wall time
+    from the bandwidth measured by earlier runs.
+    """
+    labels = {"download": "fetch", "overwrite": "refresh", "skip": "skip", "unchanged": "unchanged"}
+    per_dir = {}
+    transfer_sizes = []
+    unknown = 0
+    print("🧭 Dry run: nothing will be downloaded")
+    for entry, action in plan:
+        remote = remotes.get(entry.number)
+        size = remote.size if remote else None
+        label = labels[action]
+        totals = per_dir.setdefault(os.path.relpath(entry.dest_dir, base_dir), [0, 0])
+        totals[0] += size or 0
+        if action in ("download", "overwrite"):
+            remaining = _remaining_bytes(entry, remote)
+            if action == "download" and remaining is not None and remaining != size:
+                label = "resume"
+            if remaining is None:
+                unknown += 1
+            else:
+                totals[1] += remaining
+                transfer_sizes.append(remaining)
+        print(f"   [{entry.number}] {label:<9} {format_size(size) if size is not None else '?':>9}  {entry.dest_path}")
+    print("📂 Per destination directory (total / to transfer):")
+    for dest_dir, (total, transfer) in sorted(per_dir.items()):
+        print(f"   {format_size(total):>9} / {format_size(transfer):>9}  {dest_dir}")
+    print(f"💾 To transfer: {format_size(sum(transfer_sizes))}"
+          + (f" (+{unknown} of unknown size)" if unknown else ""))
+    if not transfer_sizes:
+        return
+    bandwidth, runs = measured_bandwidth()
+    basis = f"median of {runs} recorded run(s)"
+    if not bandwidth:
+        bandwidth, basis = ASSUMED_BANDWIDTH, "assumed, no runs recorded yet"
+    per_transfer = measured_per_transfer() or ASSUMED_PER_TRANSFER
+    makespan = predict_makespan(sorted(transfer_sizes, reverse=True), jobs, bandwidth, per_transfer)
+    print(f"⏳ Predicted wall time: {format_duration(makespan)} at {format_size(bandwidth)}/s, up to "
+          f"{format_size(per_transfer)}/s per file ({basis})")
+
+
+def _load_sidecar(entry):
+    """Resume state of a previous run's partial file, or None if it cannot be continued."""
+    try:
+        with open(entry.dest_path + SIDECAR_SUFFIX, "r") as sidecar:
+            state = json.load(sidecar)
+        size = os.path.getsize(entry.dest_path + PARTIAL_SUFFIX)
+    except (OSError, ValueError):
+        return None
+    if state.get("url") != entry.url or not (state.get("etag") or state.get("last_modified")):
+        return None
+    # Bytes past the last recorded count may not have reached the disk.
+    state["bytes"] = min(int(state.get("bytes", 0)), size)
+    return state
+
+
+def _save_sidecar(entry, state):
+    tmp_path = entry.dest_path + SIDECAR_SUFFIX + ".tmp"
+    with open(tmp_path, "w") as sidecar:
+        json.dump(state, sidecar)
+    os.replace(tmp_path, entry.dest_path + SIDECAR_SUFFIX)
+
+
+def _discard_partial(entry):
+    for suffix in (PARTIAL_SUFFIX, SIDECAR_SUFFIX):
+        if os.path.exists(entry.dest_path + suffix):
+            os.remove(entry.dest_path + suffix)
+
+
+def _open(entry, tokens, state, known=None):
+    request = urllib.request.Request(entry.url, headers={"User-Agent": USER_AGENT})
+    # Unredirected: the token goes to the provider, not to the CDN it redirects to.
+    for name, value in auth_headers(entry, tokens).items():
+        request.add_unredirected_header(name, value)
+    if state and state["bytes"]:
+        request.add_header("Range", f"bytes={state['bytes']}-")
+        # The server only honours the range if the file is unchanged; otherwise it sends it whole.
+        request.add_header("If-Range", state.get("etag") or state["last_modified"])
+    elif known:
+        # Conditional refresh: an unchanged file comes back as 304 without a body.
+        if known.get("etag"):
+            request.add_header("If-None-Match", known["etag"])
+        if known.get("last_modified"):
+            request.add_header("If-Modified-Since", known["last_modified"])
+    return urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT)
+
+
+def _resume_offset(response, state):
+    if response.status != 206 or not state:
+        return 0
+    content_range = response.headers.get("Content-Range", "")
+    try:
+        start = int(content_range.split(" ", 1)[1].split("-", 1)[0])
+    except (IndexError, ValueError):
+        return 0
+    return start if start == state["bytes"] else 0
+
+
+def _is_retryable(error):
+    """Connection problems, timeouts, short bodies, 429 and 5xx are worth retrying; other HTTP and disk errors are final."""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError,
+                              ShortBodyError))
+
+
+def _retry_delay(error, attempt):
+    retry_after = error.headers.get("Retry-After", "") if isinstance(error, urllib.error.HTTPError) else ""
+    if retry_after.isdigit():
+        return min(int(retry_after), MAX_RETRY_DELAY)
+    return min(MAX_RETRY_DELAY, 2 ** attempt)
+
+
+def download_entry(entry, tokens, progress=True, store=None, remote=None, stop=None):
+    """
+    Downloads one entry into a stable partial file and moves it into place.
+
+    The partial file (<dest>.partial) is kept when a transfer fails, together
+    with a sidecar (<dest>.partial.json) recording the URL, validator and bytes
+    received. The next attempt continues it with a Range/If-Range request and
+    only starts over when the server reports that the file changed. Transient
+    errors (see _is_retryable) are retried that way up to MAX_RETRIES times
+    with exponential backoff before the entry counts as failed.
+
+    With a ValidatorStore, an existing file with stored validators is
+    requested conditionally, and the new file's validators are recorded.
+
+    Args:
+        entry (ManifestEntry): Entry to fetch.
+        tokens (dict): Provider tokens from get_tokens().
+        progress (bool): Print a live progress line (only readable for one transfer at a time).
+        store (ValidatorStore): Where validators are read and recorded, if any.
+        remote (RemoteInfo): Prefetched metadata; a known sha256 is verified.
+        stop (threading.Event): Once set, the transfer saves its partial file and returns.
+
+    Returns:
+        str: 'ok', 'unchanged' (the server answered 304), 'failed' or 'interrupted'.
+    """
+    attempt = 0
+    while True:
+        try:
+            return _download_attempt(entry, tokens, progress, store, remote, stop)
+        except DownloadInterrupted:
+            return "interrupted"
+        except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+            attempt += 1
+            if _is_retryable(e) and attempt <= MAX_RETRIES:
+                delay = _retry_delay(e, attempt)
+                reason = f"HTTP {e.code} {e.reason}" if isinstance(e, urllib.error.HTTPError) else getattr(e, "reason", e)
+                print(f"[{entry.number}] ⚠️  {reason}, retrying in {delay}s ({attempt}/{MAX_RETRIES})",
+                      file=sys.stderr, flush=True)
+                if stop is not None and stop.wait(delay):
+                    return "interrupted"
+                if stop is None:
+                    time.sleep(delay)
+                continue
+            if isinstance(e, urllib.error.HTTPError):
+                print(f"[{entry.number}] ❌ HTTP {e.code} {e.reason} for {entry.url}", file=sys.stderr)
+            else:
+                print(f"[{entry.number}] ❌ {getattr(e, 'reason', e)} (partial kept for resume)", file=sys.stderr)
+            return "failed"
+
+
+def _download_attempt(entry, tokens, progress, store, remote, stop=None):
+    """One transfer attempt of download_entry(); transfer errors are raised to it."""
+    part_path = entry.dest_path + PARTIAL_SUFFIX
+    os.makedirs(entry.dest_dir, exist_ok=True)
+    if entry.backup and os.path.isfile(entry.dest_path):
+        backup_path = f"{entry.dest_path}.bak.{time.strftime('%Y%m%d%H%M%S')}"
+        os.replace(entry.dest_path, backup_path)
+        print(f"[{entry.number}] 📝 Backed up existing file to {backup_path}", flush=True)
+    state = _load_sidecar(entry)
+    if state is None:
+        _discard_partial(entry)
+    known = store.current(entry) if store else None
+    try:
+        response = _open(entry, tokens, state, known)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and known:
+            return "unchanged"
+        if e.code != 416 or state is None:
+            raise
+        # The partial no longer fits the remote file; fetch it whole.
+        _discard_partial(entry)
+        state = None
+        response = _open(entry, tokens, state)
+    with response:
+        offset = _resume_offset(response, state)
+        if state and offset:
+            print(f"[{entry.number}] 🔁 Resuming {entry.filename} at {offset / 1024 ** 2:.1f} MB", flush=True)
+        length = response.headers.get("Content-Length")
+        total = offset + int(length) if length and length.isdigit() else None
+        state = {
+            "url": entry.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": total,
+            "bytes": offset,
+        }
+        _save_sidecar(entry, state)
+        digest = hashlib.sha256() if remote and remote.sha256 else None
+        with open(part_path, "r+b" if offset else "wb") as part:
+            part.truncate(offset)
+            if digest and offset:
+                # Resumed bytes are hashed from disk, the rest as it arrives.
+                for block in iter(lambda: part.read(min(CHUNK_SIZE, offset - part.tell())), b""):
+                    digest.update(block)
+            part.seek(offset)
+            last_flush = time.monotonic()
+            shown = False
+            try:
+                while True:
+                    if stop is not None and stop.is_set():
+                        raise DownloadInterrupted()
+                    data = response.read(CHUNK_SIZE)
+                    if not data:
+                        break
+                    part.write(data)
+                    if digest:
+                        digest.update(data)
+                    state["bytes"] += len(data)
+                    if time.monotonic() - last_flush >= SIDECAR_FLUSH_INTERVAL:
+                        part.flush()
+                        _save_sidecar(entry, state)
+                        last_flush = time.monotonic()
+                        if progress and total:
+                            sys.stdout.write(f"\r   {state['bytes'] * 100 / total:5.1f}% of {total / 1024 ** 2:.1f} MB")
+                            sys.stdout.flush()
+                            shown = True
+            finally:
+                # Also on a dropped connection, so the retry resumes from every byte received.
+                part.flush()
+                _save_sidecar(entry, state)
+        if shown:
+            sys.stdout.write("\r" + " " * 40 + "\r")
+        if total is not None and state["bytes"] != total:
+            raise ShortBodyError(f"connection closed after {state['bytes']} of {total} bytes")
+    if digest and digest.hexdigest() != remote.sha256:
+        _discard_partial(entry)
+        print(f"[{entry.number}] ❌ sha256 mismatch for {entry.url}: expected {remote.sha256}, "
+              f"got {digest.hexdigest()}", file=sys.stderr)
+        return "failed"
+    os.replace(part_path, entry.dest_path)
+    os.remove(entry.dest_path + SIDECAR_SUFFIX)
+    if store:
+        store.record(entry, state["etag"], state["last_modified"], remote.sha256 if remote else None)
+    return "ok"
+
+
+class HostScheduler:
+    """
+    Hands out entries to worker threads while respecting per-provider limits.
+
+    A worker takes the first queued entry whose provider has a free slot, so a
+    saturated provider never blocks workers that could serve another host.
+
+    Args:
+        entries (list): ManifestEntry objects to download, in preferred order.
+        limits (dict): Provider -> maximum concurrent downloads.
+    """
+
+    def __init__(self, entries, limits):
+        self.pending = list(entries)
+        self.limits = limits
+        self.active = {}
+        self.condition = threading.Condition()
+
+    def _limit(self, provider):
+        return self.limits.get(provider, DEFAULT_HOST_LIMIT)
+
+    def take(self):
+        """Blocks until an entry may start; returns None when the queue is empty."""
+        with self.condition:
+            while self.pending:
+                for index, entry in enumerate(self.pending):
+                    if self.active.get(entry.provider, 0) < self._limit(entry.provider):
+                        self.active[entry.provider] = self.active.get(entry.provider, 0) + 1
+                        return self.pending.pop(index)
+                self.condition.wait()
+            return None
+
+    def done(self, entry):
+        with self.condition:
+            self.active[entry.provider] -= 1
+            self.condition.notify_all()
+
+    def cancel(self):
+        """Drops every entry that has not started; waiting workers get None."""
+        with self.condition:
+            self.pending = []
+            self.condition.notify_all()
+
+
+def download_all(entries, tokens, jobs, limits, report, store=None, remotes=None):
+    """
+    Downloads entries on up to `jobs` threads under per-provider limits.
+
+    Args:
+        entries (list): ManifestEntry objects to fetch.
+        tokens (dict): Provider tokens from get_tokens().
+        jobs (int): Global concurrency budget.
+        limits (dict): Provider -> maximum concurrent downloads.
+        report (callable): Called as report(entry, event) with 'start' and then the
+            download_entry() status; calls are serialized.
+        store (ValidatorStore): Validator state for conditional refreshes, if any.
+        remotes (dict): Entry number -> prefetched RemoteInfo.
+
+    Returns:
+        dict: Entry number -> download_entry() status.
+
+    Raises:
+        KeyboardInterrupt: After every running transfer has saved its partial file.
+    """
+    scheduler = HostScheduler(entries, limits)
+    results = {}
+    report_lock = threading.Lock()
+    stop = threading.Event()
+    progress = jobs <= 1 or len(entries) <= 1
+
+    def worker():
+        while True:
+            entry = scheduler.take()
+            if entry is None:
+                return
+            status = "failed"
+            try:
+                with report_lock:
+                    report(entry, "start")
+                status = download_entry(entry, tokens, progress, store, (remotes or {}).get(entry.number), stop)
+            except Exception as e:
+                # Never let one entry take its worker thread down with it.
+                print(f"[{entry.number}] ❌ Unexpected error: {type(e).__name__}: {e}", file=sys.stderr)
+            finally:
+                scheduler.done(entry)
+            with report_lock:
+                results[entry.number] = status
+                if status != "interrupted":
+                    report(entry, status)
+
+    threads = [threading.Thread(target=worker) for _ in range(max(1, min(jobs, len(entries))))]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        # Workers stop at their next chunk and write their sidecars; none may still be printing at exit.
+        stop.set()
+        scheduler.cancel()
+        for thread in threads:
+            thread.join()
+        raise
+    return results
+
+
+def install(config_path, base_dir, jobs=DEFAULT_JOBS, limits=None, ignore_disk_space=False, plan_only=False):
+    """
+    Installs every entry of a models-config file.
+
+    Args:
+        config_path (str): Path to the JSON array.
+        base_dir (str): Root for relative 'dest' values.
+        jobs (int): Concurrent downloads overall.
+        limits (dict): Provider -> concurrent downloads; defaults to HOST_LIMITS.
+        ignore_disk_space (bool): Warn instead of aborting when space looks insufficient.
+        plan_only (bool): Print the dry-run plan and download nothing.
+
+    Returns:
+        int: Process exit code (1 if any download failed or space is insufficient).
+    """
+    try:
+        entries = load_manifest(config_path, base_dir)
+    except ManifestError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if not entries:
+        print("ℹ️  Config file is empty. Nothing to install.")
+        return 0
+
+    print("🤖 ComfyUI Model Auto-Installer")
+    print("==============================")
+    print(f"📄 Config: {config_path}")
+    return install_entries(entries, base_dir, jobs, limits, ignore_disk_space, plan_only=plan_only)
+
+
+def install_batch(source, base_dir, jobs=DEFAULT_JOBS, limits=None, ignore_disk_space=False, backup=False,
+                  plan_only=False):
+    """
+    Installs "url [dest] [filename]" lines from a file or stdin ('-').
+
+    Returns:
+        int: Process exit code (1 if any line is invalid or any download failed).
+    """
+    tokens = get_tokens()
+    resolver = CivitaiResolver(token=tokens["civitai.com"])
+    try:
+        if source == "-":
+            entries = load_batch(sys.stdin, base_dir, resolver, backup)
+        else:
+            with open(source, "r") as batch_file:
+                entries = load_batch(batch_file, base_dir, resolver, backup)
+    except (ManifestError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if not entries:
+        print("ℹ️  No URLs given. Nothing to install.")
+        return 0
+
+    print("🤖 ComfyUI Model Installer (batch)")
+    print("==================================")
+    print(f"📄 Input: {'stdin' if source == '-' else source}")
+    return install_entries(entries, base_dir, jobs, limits, ignore_disk_space, resolver, plan_only)
+
+
+def install_entries(entries, base_dir, jobs=DEFAULT_JOBS, limits=None, ignore_disk_space=False, resolver=None,
+                    plan_only=False):
+    """
+    Prefetches, plans and downloads validated entries (or only prints the plan).
+
+    Returns:
+        int: Process exit code (1 if any download failed or space is insufficient).
+    """
+    total = len(entries)
+    print(f"📁 Base directory: {base_dir}")
+    print(f"🧾 Total entries: {total}")
+    print(f"⚙️  Parallel downloads: {jobs}")
+    print("")
+
+    tokens = get_tokens()
+    started = time.monotonic()
+    remotes = prefetch_remotes(entries, tokens, resolver or CivitaiResolver(token=tokens["civitai.com"]))
+    print(f"🔎 Resolved {len(remotes)}/{total} entries in {time.monotonic() - started:.1f}s")
+    store = ValidatorStore(os.path.join(base_dir, STATE_FILENAME))
+    plan = plan_entries(entries, remotes, store)
+    if plan_only:
+        print_dry_run(plan, remotes, base_dir, jobs)
+        check_disk_space(plan, remotes)
+        return 0
+    skipped_count = 0
+    for entry, action in plan:
+        if action == "skip":
+            print(f"[{entry.number}/{total}] ⏭️  Skipping existing file: {entry.dest_path}")
+            skipped_count += 1
+        elif action == "unchanged":
+            print(f"[{entry.number}/{total}] ✔️  Unchanged upstream, keeping: {entry.dest_path}")
+            skipped_count += 1
+        elif action == "overwrite" and not entry.overwrite and not entry.backup:
+            print(f"[{entry.number}/{total}] ⚠️  Size differs from remote, replacing: {entry.dest_path}")
+    overwriting = {entry.number for entry, action in plan if action == "overwrite"}
+
+    to_fetch = [entry for entry, action in plan if action in ("overwrite", "download")]
+    known = [remotes[entry.number].size for entry in to_fetch
+             if entry.number in remotes and remotes[entry.number].size is not None]
+    if to_fetch:
+        unknown = len(to_fetch) - len(known)
+        print(f"📦 {len(to_fetch)} to download, {format_size(sum(known))}"
+              + (f" (+{unknown} of unknown size)" if unknown else ""))
+    if not check_disk_space(plan, remotes):
+        if not ignore_disk_space:
+            return 1
+        print("⚠️  Continuing anyway (--ignore-disk-space)")
+    # Largest first, so the longest transfer does not start last; unknown sizes go at the end.
+    to_fetch.sort(key=lambda entry: -(remotes[entry.number].size or 0) if entry.number in remotes else 1)
+
+    def report(entry, event):
+        prefix = f"[{entry.number}/{total}]"
+        if event == "start" and entry.number in overwriting:
+            print(f"{prefix} 📝 Overwriting existing file: {entry.dest_path}")
+        elif event == "start":
+            print(f"{prefix} ⬇️  Downloading -> {entry.dest_path}")
+        elif event == "ok":
+            print(f"{prefix} ✅ Stored at {entry.dest_path}")
+        elif event == "unchanged":
+            print(f"{prefix} ✔️  Not modified upstream, keeping: {entry.dest_path}")
+        else:
+            print(f"{prefix} ❌ Download failed for {entry.url}", file=sys.stderr)
+        sys.stdout.flush()
+
+    if to_fetch:
+        print("")
+    remaining = {entry.number: _remaining_bytes(entry, remotes.get(entry.number)) or 0 for entry in to_fetch}
+    transfer_started = time.monotonic()
+    results = download_all(to_fetch, tokens, jobs, dict(HOST_LIMITS, **(limits or {})), report, store, remotes)
+    # Feeds the wall time prediction of later --plan runs on this machine.
+    record_bandwidth(sum(remaining[number] for number, status in results.items() if status == "ok"),
+                     time.monotonic() - transfer_started, "model_manifest")
+    success_count = sum(1 for status in results.values() if status == "ok")
+    skipped_count += sum(1 for status in results.values() if status == "unchanged")
+    # An entry without a result never finished; it counts as failed rather than silently as done.
+    fail_count = sum(1 for entry in to_fetch if results.get(entry.number, "failed") == "failed")
+    print("")
+
+    if fail_count:
+        failed_providers = {entry.provider for entry in to_fetch if results.get(entry.number, "failed") == "failed"}
+        for provider, hints in PROVIDER_HINTS.items():
+            if provider in failed_providers:
+                print(f"💡 Possible solutions for {provider} failures:")
+                for hint in hints:
+                    print(f"   • {hint}")
+        print(f"⚠️  Completed with failures: {fail_count} entries failed, {success_count} succeeded, "
+              f"{skipped_count} skipped.", file=sys.stderr)
+        return 1
+    print(f"🎉 All downloads complete. {success_count} succeeded, {skipped_count} skipped.")
+    return 0
+
+
+def main(argv=None):
+    """Command-line entry point; accepts the same arguments as auto-install-models.sh."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    show_help = show_example = False
+    positional = []
+    jobs = DEFAULT_JOBS
+    limits = {}
+    ignore_disk_space = backup = plan_only = False
+    batch = None
+    options = {"-j": "jobs", "--jobs": "jobs", "--hf-jobs": "huggingface.co", "--civitai-jobs": "civitai.com"}
+    while args:
+        arg = args.pop(0)
+        name, _, inline_value = arg.partition("=")
+        if name in options:
+            value = inline_value or (args.pop(0) if args else "")
+            if not value.isdigit() or int(value) < 1:
+                print(f"❌ {name} expects a positive number, got '{value}'.", file=sys.stderr)
+                return 1
+            if options[name] == "jobs":
+                jobs = int(value)
+            else:
+                limits[options[name]] = int(value)
+        elif name == "--host-jobs":
+            value = inline_value and arg.split("=", 1)[1] or (args.pop(0) if args else "")
+            host, _, count = value.rpartition("=")
+            if not host or not count.isdigit() or int(count) < 1:
+                print(f"❌ --host-jobs expects HOST=N, got '{value}'.", file=sys.stderr)
+                return 1
+            limits[host.lower()] = int(count)
+        elif arg == "--ignore-disk-space":
+            ignore_disk_space = True
+        elif name == "--batch":
+            batch = inline_value or (args.pop(0) if args else "")
+        elif arg == "--backup":
+            backup = True
+        elif arg == "--plan":
+            plan_only = True
+        elif arg in ("-h", "--help"):
+            show_help = True
+        elif arg == "--show-example-format-for-json":
+            show_example = True
+        elif arg == "--":
+            positional += args
+            break
+        elif arg.startswith("-"):
+            print(f"❌ Unknown option: {arg}", file=sys.stderr)
+            print(USAGE)
+            return 1
+        else:
+            positional.append(arg)
+
+    if show_help:
+        print(USAGE)
+        if show_example:
+            print("")
+            print("Example JSON config:")
+            print(EXAMPLE_CONFIG)
+        return 0
+    if show_example:
+        print(EXAMPLE_CONFIG)
+        return 0
+    if batch:
+        # Batch destinations are relative to the working directory, like install-model.sh's.
+        base_dir = os.path.abspath(positional[0]) if positional else os.getcwd()
+        return install_batch(batch, base_dir, jobs, limits, ignore_disk_space, backup, plan_only)
+    if not positional:
+        print("❌ Missing config file path.", file=sys.stderr)
+        print(USAGE)
+        return 1
+
+    config_path = positional[0]
+    if not os.path.isfile(config_path):
+        print(f"❌ Config file not found: {config_path}", file=sys.stderr)
+        return 1
+    base_dir = resolve_base_dir(positional[1] if len(positional) > 1 else "")
+    return install(config_path, base_dir, jobs, limits, ignore_disk_space, plan_only)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted: partial downloads are kept and resume on the next run.", file=sys.stderr)
+        sys.exit(130)
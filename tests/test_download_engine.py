@@ -0,0 +1,125 @@
+"""download_engine.py against a Hub stand-in: lockfile skips and installers sharing one blob store."""
+
+import os
+import hashlib
+import threading
+import unittest
+
+from support import StandinTestCase, REPO_ID
+
+import download_engine
+from blob_store import BlobStore, blob_key
+from download_engine import DownloadEngine, count_statuses, task_destination
+from lockfile import Lockfile
+
+FILE = "weights/model.bin"
+
+
+class LockfileTest(StandinTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = self.add_file(FILE, os.urandom(512 * 1024))
+        self.lockfile = os.path.join(self.work, "lock.json")
+        self.task = {"repo_id": REPO_ID, "filename": FILE, "local_dir": os.path.join(self.work, "models")}
+        self.dest = task_destination(self.task)
+
+    def install(self, task=None):
+        """Runs the task once, straight into the model directory; returns (status, bytes sent by the Hub)."""
+        sent_before = self.sent_bytes(FILE)
+        with DownloadEngine(blob_store=None, lockfile=self.lockfile, print_fn=lambda *args: None) as engine:
+            result, = engine.run([task or self.task])
+        return result["status"], self.sent_bytes(FILE) - sent_before
+
+    def test_recorded_file_is_skipped(self):
+        self.assertEqual(self.install(), ("downloaded", len(self.data)))
+        entry = Lockfile(self.lockfile).entry(self.dest)
+        self.assertEqual((entry["repo_id"], entry["filename"], entry["size"]), (REPO_ID, FILE, len(self.data)))
+        self.assertEqual(self.install(), ("skipped", 0))
+
+    def test_changed_file_is_downloaded_again(self):
+        self.install()
+        with open(self.dest, "r+b") as f:
+            f.truncate(1000)
+        self.assertEqual(self.install(), ("downloaded", len(self.data)))
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(self.install(), ("skipped", 0))
+
+    def test_other_revision_is_downloaded_again(self):
+        self.install()
+        # The stand-in gives no sha256 to compare with, so the recorded source decides.
+        self.assertEqual(self.install(dict(self.task, revision="v2")), ("downloaded", len(self.data)))
+        self.assertEqual(Lockfile(self.lockfile).entry(self.dest)["revision"], "v2")
+        self.assertEqual(self.install(dict(self.task, revision="v2")), ("skipped", 0))
+
+    def test_unrecorded_file_is_verified_once(self):
+        os.makedirs(os.path.dirname(self.dest))
+        with open(self.dest, "wb") as f:
+            f.write(self.data)
+        self.assertEqual(self.install(), ("verified", 0))
+        self.assertEqual(Lockfile(self.lockfile).entry(self.dest)["sha256"], hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(self.install(), ("skipped", 0))
+
+
+class SharedBlobStoreTest(StandinTestCase):
+    # Slow enough that two installers are transferring at the same time.
+    standin_options = {"per_connection": 8 * 1024 * 1024}
+
+    def setUp(self):
+        super().setUp()
+        self._patch(download_engine, "BLOB_LOCK_POLL", 0.05)
+        self.data = self.add_file(FILE, os.urandom(3 * 1024 * 1024 + 17))
+        self.store_dir = os.path.join(self.work, "blobs")
+
+    def task(self, local_dir):
+        return {"repo_id": REPO_ID, "filename": FILE, "local_dir": os.path.join(self.work, local_dir)}
+
+    def install(self, name):
+        """Runs one installer with its own engine, lockfile and target directory."""
+        with DownloadEngine(blob_store=self.store_dir, lockfile=os.path.join(self.work, f"{name}.lock.json"),
+                            print_fn=lambda *args: None) as engine:
+            return engine.run([self.task(name)])
+
+    def read_installed(self, name):
+        with open(task_destination(self.task(name)), "rb") as f:
+            return f.read()
+
+    def test_concurrent_installers_fetch_a_blob_once(self):
+        results = {}
+
+        def run(name):
+            results[name] = self.install(name)
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        statuses = count_statuses(results["a"] + results["b"])
+        self.assertEqual(statuses, {"downloaded": 1, "linked": 1})
+        self.assertEqual(self.read_installed("a"), self.data)
+        self.assertEqual(self.read_installed("b"), self.data)
+        self.assertEqual(self.sent_bytes(FILE), len(self.data))
+
+    def test_blob_finished_by_another_process_while_waiting(self):
+        with DownloadEngine(blob_store=None, print_fn=lambda *args: None) as engine:
+            key = blob_key(engine.loop.run_until_complete(engine.resolve(self.task("a"))))
+        store = BlobStore(self.store_dir)
+        lock = store.try_lock(key)
+        self.assertIsNotNone(lock)
+
+        def finish_other_install():
+            with open(store.path_for(key), "wb") as blob:
+                blob.write(self.data)
+            lock.close()
+
+        threading.Timer(0.3, finish_other_install).start()
+        results = self.install("a")
+        self.assertEqual(results[0]["status"], "linked")
+        self.assertEqual(self.read_installed("a"), self.data)
+        self.assertEqual(self.sent_bytes(FILE), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
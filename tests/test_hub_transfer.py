@@ -0,0 +1,129 @@
+"""hub_transfer.py against a Hub stand-in: segmented resume from the sidecar and sha256 verification."""
+
+import os
+import time
+import asyncio
+import hashlib
+import unittest
+
+from support import StandinTestCase
+
+import hub_transfer
+from http_pool import HttpPool, TransferError
+from hub_transfer import fetch_remote_file, download_file, PARTIAL_SUFFIX, STATE_SUFFIX
+
+FILE = "weights/model.bin"
+
+
+class HubTransferTest(StandinTestCase):
+    # Slow enough that a download can be interrupted halfway.
+    standin_options = {"per_connection": 8 * 1024 * 1024}
+
+    def setUp(self):
+        super().setUp()
+        # Segment a small file the way a multi-GB one would be.
+        self._patch(hub_transfer, "SEGMENT_THRESHOLD", 1024 * 1024)
+        self._patch(hub_transfer, "SEGMENT_SIZE", 256 * 1024)
+        self.data = self.add_file(FILE, os.urandom(4 * 1024 * 1024 + 321))
+        self.dest = os.path.join(self.work, "model.bin")
+
+    def download(self, remote=None, connections=4, on_progress=None, stop_after=None):
+        """
+        Resolves and downloads FILE; with stop_after the download is cancelled
+        once that many bytes arrived. Returns (digest or None, remote).
+        """
+
+        async def main():
+            pool = HttpPool()
+            try:
+                target = remote or await fetch_remote_file(pool, self.url(FILE))
+                received = 0
+
+                def progress(nbytes):
+                    nonlocal received
+                    received += nbytes
+                    if on_progress:
+                        on_progress(nbytes)
+                    if stop_after is not None and received >= stop_after:
+                        transfer.cancel()
+
+                transfer = asyncio.ensure_future(download_file(pool, target, self.dest, connections, progress))
+                try:
+                    return await transfer, target
+                except asyncio.CancelledError:
+                    return None, target
+            finally:
+                await pool.close()
+
+        return asyncio.run(main())
+
+    def settled_sent_bytes(self):
+        """sent_bytes(FILE) once the stand-in stopped writing the bodies of cancelled requests."""
+        sent = self.sent_bytes(FILE)
+        while True:
+            time.sleep(0.2)
+            if self.sent_bytes(FILE) == sent:
+                return sent
+            sent = self.sent_bytes(FILE)
+
+    def read_dest(self):
+        with open(self.dest, "rb") as f:
+            return f.read()
+
+    def test_segmented_download(self):
+        digest, remote = self.download()
+        self.assertTrue(remote.accepts_ranges)
+        self.assertEqual(self.read_dest(), self.data)
+        self.assertEqual(digest, hashlib.sha256(self.data).hexdigest())
+        self.assertFalse(os.path.exists(self.dest + STATE_SUFFIX))
+
+    def test_resume_from_sidecar(self):
+        digest, _ = self.download(stop_after=len(self.data) // 2)
+        self.assertIsNone(digest)
+        self.assertTrue(os.path.exists(self.dest + PARTIAL_SUFFIX))
+        self.assertTrue(os.path.exists(self.dest + STATE_SUFFIX))
+        sent_before = self.settled_sent_bytes()
+
+        reported = []
+        digest, _ = self.download(on_progress=reported.append)
+        # The first progress report is what the sidecar recorded as already written.
+        resumed = reported[0]
+        self.assertGreaterEqual(resumed, 1024 * 1024)
+        self.assertEqual(self.read_dest(), self.data)
+        self.assertEqual(digest, hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(sum(reported[1:]), len(self.data) - resumed)
+        self.assertEqual(self.sent_bytes(FILE) - sent_before, len(self.data) - resumed)
+        self.assertFalse(os.path.exists(self.dest + PARTIAL_SUFFIX))
+
+    def test_changed_file_is_not_resumed(self):
+        self.download(stop_after=len(self.data) // 2)
+        data = self.add_file(FILE, os.urandom(len(self.data)))
+        # The stand-in's ETag includes the mtime, so the sidecar no longer matches.
+        os.utime(os.path.join(self.upstream, FILE), (1, 1))
+        digest, _ = self.download()
+        self.assertEqual(self.read_dest(), data)
+        self.assertEqual(digest, hashlib.sha256(data).hexdigest())
+
+    def test_sha256_mismatch_is_rejected(self):
+        for accepts_ranges in (True, False):
+            with self.subTest(segmented=accepts_ranges):
+                _, remote = self.download()
+                os.remove(self.dest)
+                remote.sha256 = "0" * 64
+                remote.accepts_ranges = accepts_ranges
+                with self.assertRaisesRegex(TransferError, "Checksum mismatch"):
+                    self.download(remote)
+                self.assertFalse(os.path.exists(self.dest))
+                self.assertFalse(os.path.exists(self.dest + PARTIAL_SUFFIX))
+
+    def test_matching_sha256_is_accepted(self):
+        _, remote = self.download()
+        os.remove(self.dest)
+        remote.sha256 = hashlib.sha256(self.data).hexdigest()
+        digest, _ = self.download(remote)
+        self.assertEqual(digest, remote.sha256)
+        self.assertEqual(self.read_dest(), self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
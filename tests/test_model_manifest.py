@@ -0,0 +1,94 @@
+"""model_manifest.py against a Hub stand-in: resuming partial files and conditional refreshes."""
+
+import io
+import os
+import json
+import unittest
+import contextlib
+
+from support import StandinTestCase
+
+import model_manifest
+from hub_standin import FaultInjector
+from model_manifest import (ManifestEntry, ValidatorStore, download_entry, fetch_remote_info, plan_entries,
+                            PARTIAL_SUFFIX, SIDECAR_SUFFIX, STATE_FILENAME)
+
+FILE = "weights/model.bin"
+
+
+class ModelManifestTest(StandinTestCase):
+    def setUp(self):
+        super().setUp()
+        # Retries resume at once instead of backing off for seconds.
+        self._patch(model_manifest, "_retry_delay", lambda error, attempt: 0)
+        self.data = self.add_file(FILE, os.urandom(2 * 1024 * 1024 + 99))
+        self.base_dir = os.path.join(self.work, "ComfyUI")
+        self.entry = ManifestEntry(1, self.url(FILE), os.path.join(self.base_dir, "models", "unet"), "model.bin",
+                                   overwrite=True)
+        self.store = ValidatorStore(os.path.join(self.base_dir, STATE_FILENAME))
+        self.output = io.StringIO()
+
+    def download(self, store=None):
+        """Runs download_entry() with its messages captured in self.output; returns (status, bytes sent)."""
+        sent_before = self.sent_bytes(FILE)
+        with contextlib.redirect_stdout(self.output), contextlib.redirect_stderr(self.output):
+            status = download_entry(self.entry, {}, progress=False, store=store)
+        return status, self.sent_bytes(FILE) - sent_before
+
+    def write_partial(self, nbytes, etag):
+        os.makedirs(self.entry.dest_dir, exist_ok=True)
+        with open(self.entry.dest_path + PARTIAL_SUFFIX, "wb") as part:
+            part.write(self.data[:nbytes])
+        with open(self.entry.dest_path + SIDECAR_SUFFIX, "w") as sidecar:
+            json.dump({"url": self.entry.url, "etag": etag, "last_modified": None, "size": len(self.data),
+                       "bytes": nbytes}, sidecar)
+
+    def read_dest(self):
+        with open(self.entry.dest_path, "rb") as f:
+            return f.read()
+
+    def test_partial_file_is_resumed(self):
+        etag = fetch_remote_info(self.entry, {}).etag
+        self.write_partial(1024 * 1024, etag)
+        self.assertEqual(self.download(), ("ok", len(self.data) - 1024 * 1024))
+        self.assertIn("Resuming model.bin at 1.0 MB", self.output.getvalue())
+        self.assertEqual(self.read_dest(), self.data)
+        self.assertFalse(os.path.exists(self.entry.dest_path + PARTIAL_SUFFIX))
+        self.assertFalse(os.path.exists(self.entry.dest_path + SIDECAR_SUFFIX))
+
+    def test_partial_of_a_changed_file_starts_over(self):
+        self.write_partial(1024 * 1024, '"outdated"')
+        self.assertEqual(self.download(), ("ok", len(self.data)))
+        self.assertEqual(self.read_dest(), self.data)
+
+    def test_dropped_connection_resumes_within_the_run(self):
+        self.standin.faults = FaultInjector({"truncate": 1.0}, max_per_file=1)
+        status, sent = self.download()
+        self.assertEqual(status, "ok")
+        # The retry continued from the partial file instead of fetching the whole file again.
+        self.assertEqual(sent, len(self.data))
+        self.assertIn("retrying", self.output.getvalue())
+        self.assertIn("Resuming model.bin", self.output.getvalue())
+        self.assertEqual(self.read_dest(), self.data)
+
+    def test_unchanged_overwrite_is_a_304(self):
+        self.assertEqual(self.download(self.store), ("ok", len(self.data)))
+        remotes = {self.entry.number: fetch_remote_info(self.entry, {})}
+        self.assertEqual(plan_entries([self.entry], remotes, ValidatorStore(self.store.path)),
+                         [(self.entry, "unchanged")])
+        # Planned without metadata, the conditional GET still avoids the transfer.
+        self.assertEqual(self.download(ValidatorStore(self.store.path)), ("unchanged", 0))
+
+    def test_changed_overwrite_is_fetched_again(self):
+        self.download(self.store)
+        data = self.add_file(FILE, os.urandom(len(self.data)))
+        os.utime(os.path.join(self.upstream, FILE), (1, 1))
+        remotes = {self.entry.number: fetch_remote_info(self.entry, {})}
+        self.assertEqual(plan_entries([self.entry], remotes, ValidatorStore(self.store.path)),
+                         [(self.entry, "overwrite")])
+        self.assertEqual(self.download(ValidatorStore(self.store.path)), ("ok", len(data)))
+        self.assertEqual(self.read_dest(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""serve_cache.py against a Hub stand-in: hits, misses, single-flight fills, ranges and upstream outages."""
+
+import io
+import os
+import asyncio
+import unittest
+import contextlib
+
+from support import StandinTestCase, REPO_ID
+
+from http_pool import HttpPool
+from blob_store import BlobStore
+from serve_cache import CacheServer
+
+FILE = "weights/model.bin"
+
+
+async def get(client, url, headers=None):
+    async with await client.request("GET", url, headers) as response:
+        return response.status, await response.read_all()
+
+
+class ServeCacheTest(StandinTestCase):
+    # Slow enough that concurrent requests arrive while the fill is still running.
+    standin_options = {"per_connection": 4 * 1024 * 1024}
+
+    def setUp(self):
+        super().setUp()
+        self.data = self.add_file(FILE, os.urandom(2 * 1024 * 1024 + 123))
+        self.store = BlobStore(os.path.join(self.work, "cache"))
+
+    def run_cache(self, scenario):
+        """Runs scenario(cache, client, base_url) against a CacheServer on a free port."""
+
+        async def main():
+            cache = CacheServer(self.store, connections=4)
+            handlers = set()
+
+            async def handle(reader, writer):
+                handlers.add(asyncio.current_task())
+                await cache.handle(reader, writer)
+
+            listener = await asyncio.start_server(handle, "127.0.0.1", 0)
+            client = HttpPool()
+            try:
+                return await scenario(cache, client, "http://127.0.0.1:%d" % listener.sockets[0].getsockname()[1])
+            finally:
+                await client.close()
+                listener.close()
+                await listener.wait_closed()
+                # Handlers return once their client hung up; fills are left to finish.
+                await asyncio.gather(*handlers, *(fill.task for fill in list(cache.fills.values())),
+                                     return_exceptions=True)
+                await cache.pool.close()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(main())
+
+    @staticmethod
+    def cache_url(base_url, rel_path=FILE):
+        return f"{base_url}/{REPO_ID}/resolve/main/{rel_path}"
+
+    def test_miss_then_hit(self):
+        async def scenario(cache, client, base_url):
+            first = await get(client, self.cache_url(base_url))
+            second = await get(client, self.cache_url(base_url))
+            return cache, first, second
+
+        cache, first, second = self.run_cache(scenario)
+        self.assertEqual(first, (200, self.data))
+        self.assertEqual(second, (200, self.data))
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+        self.assertEqual(self.sent_bytes(FILE), len(self.data))
+
+    def test_head_carries_hub_metadata(self):
+        async def scenario(cache, client, base_url):
+            response = await client.request("HEAD", self.cache_url(base_url))
+            return response.status, response.getheader("X-Linked-Size"), response.getheader("Accept-Ranges")
+
+        self.assertEqual(self.run_cache(scenario), (200, str(len(self.data)), "bytes"))
+
+    def test_concurrent_misses_share_one_fill(self):
+        async def scenario(cache, client, base_url):
+            clients = [HttpPool() for _ in range(4)]
+            try:
+                return await asyncio.gather(*(get(c, self.cache_url(base_url)) for c in clients))
+            finally:
+                for c in clients:
+                    await c.close()
+
+        results = self.run_cache(scenario)
+        self.assertEqual(results, [(200, self.data)] * 4)
+        # Every reader streamed from the same fill: the file crossed the "internet" once.
+        self.assertEqual(self.sent_bytes(FILE), len(self.data))
+
+    def test_range_requests_during_fill_and_on_hit(self):
+        async def scenario(cache, client, base_url):
+            other = HttpPool()
+            try:
+                full, during = await asyncio.gather(
+                    get(client, self.cache_url(base_url)),
+                    get(other, self.cache_url(base_url), {"Range": "bytes=1048576-1049599"}))
+            finally:
+                await other.close()
+            suffix = await get(client, self.cache_url(base_url), {"Range": "bytes=-100"})
+            outside = await get(client, self.cache_url(base_url), {"Range": f"bytes={len(self.data)}-"})
+            return full, during, suffix, outside
+
+        full, during, suffix, outside = self.run_cache(scenario)
+        self.assertEqual(full, (200, self.data))
+        self.assertEqual(during, (206, self.data[1048576:1049600]))
+        self.assertEqual(suffix, (206, self.data[-100:]))
+        self.assertEqual(outside[0], 416)
+
+    def test_cached_files_survive_an_upstream_outage(self):
+        async def fill(cache, client, base_url):
+            return await get(client, self.cache_url(base_url))
+
+        self.assertEqual(self.run_cache(fill), (200, self.data))
+        self.add_file("weights/other.bin", b"never fetched")
+        self.standin.shutdown()
+        self.standin.server_close()
+
+        async def outage(cache, client, base_url):
+            # A fresh server has no metadata in memory; it must come from the store.
+            cached = await get(client, self.cache_url(base_url), {"Range": "bytes=10-19"})
+            missing = await get(client, self.cache_url(base_url, "weights/other.bin"))
+            return cached, missing[0]
+
+        cached, missing_status = self.run_cache(outage)
+        self.assertEqual(cached, (206, self.data[10:20]))
+        self.assertEqual(missing_status, 502)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""zip_stream.py against a Hub stand-in: extraction while downloading, path sanitising and CRC checks."""
+
+import io
+import os
+import asyncio
+import zipfile
+import unittest
+
+from support import StandinTestCase, REPO_ID
+
+from http_pool import HttpPool
+from hub_transfer import fetch_remote_file
+from zip_stream import read_central_directory, is_streamable, stream_extract, member_path
+from download_engine import DownloadEngine
+
+ARCHIVE = "bundle/models.zip"
+
+
+def build_zip(members):
+    """Returns (archive bytes, ZipInfo list) for (name, data, compress_type) triples."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data, compress_type in members:
+            archive.writestr(zipfile.ZipInfo(name), data, compress_type=compress_type)
+        infos = archive.infolist()
+    return buffer.getvalue(), infos
+
+
+class ZipStreamTest(StandinTestCase):
+    def setUp(self):
+        super().setUp()
+        self.weights = os.urandom(300 * 1024)
+        self.config = b"{\"layers\": 32}\n" * 5000
+        self.target = os.path.join(self.work, "models", "loras")
+
+    def serve(self, members):
+        archive, infos = build_zip(members)
+        self.add_file(ARCHIVE, archive)
+        return archive, infos
+
+    def extract(self):
+        """Reads the central directory and stream-extracts ARCHIVE into self.target."""
+
+        async def main():
+            pool = HttpPool()
+            try:
+                remote = await fetch_remote_file(pool, self.url(ARCHIVE))
+                members = await read_central_directory(pool, remote)
+                self.assertTrue(is_streamable(members))
+                return await stream_extract(pool, remote, members, self.target)
+            finally:
+                await pool.close()
+
+        return asyncio.run(main())
+
+    def read_target(self, rel_path):
+        with open(os.path.join(self.target, rel_path), "rb") as f:
+            return f.read()
+
+    def test_members_are_extracted_while_streaming(self):
+        archive, _ = self.serve([
+            ("weights.safetensors", self.weights, zipfile.ZIP_STORED),
+            ("config/model.json", self.config, zipfile.ZIP_DEFLATED),
+            ("empty/", b"", zipfile.ZIP_STORED),
+        ])
+        self.assertEqual(self.extract(), 2)
+        self.assertEqual(self.read_target("weights.safetensors"), self.weights)
+        self.assertEqual(self.read_target("config/model.json"), self.config)
+        self.assertTrue(os.path.isdir(os.path.join(self.target, "empty")))
+        # One pass over the body plus the central directory at the end.
+        self.assertLess(self.sent_bytes(ARCHIVE), 2 * len(archive))
+
+    def test_member_names_cannot_leave_the_target(self):
+        self.serve([
+            ("../escape.txt", b"up", zipfile.ZIP_STORED),
+            ("/etc/absolute.txt", b"abs", zipfile.ZIP_DEFLATED),
+            ("a/../../b/c.txt", b"nested", zipfile.ZIP_STORED),
+        ])
+        self.extract()
+        self.assertEqual(self.read_target("escape.txt"), b"up")
+        self.assertEqual(self.read_target("etc/absolute.txt"), b"abs")
+        self.assertEqual(self.read_target("a/b/c.txt"), b"nested")
+        self.assertFalse(os.path.exists(os.path.join(self.work, "models", "escape.txt")))
+        self.assertIsNone(member_path(self.target, "../.."))
+
+    def test_corrupt_member_fails_the_crc_check(self):
+        archive, infos = self.serve([
+            ("config/model.json", self.config, zipfile.ZIP_DEFLATED),
+            ("weights.safetensors", self.weights, zipfile.ZIP_STORED),
+        ])
+        stored = infos[1]
+        data_start = stored.header_offset + 30 + len(stored.filename.encode()) + len(stored.extra)
+        corrupt = bytearray(archive)
+        corrupt[data_start + 1000] ^= 0xFF
+        self.add_file(ARCHIVE, bytes(corrupt))
+        with self.assertRaisesRegex(zipfile.BadZipFile, "Bad CRC-32 for file 'weights.safetensors'"):
+            self.extract()
+
+    def test_engine_extracts_without_keeping_the_archive(self):
+        self.serve([("weights.safetensors", self.weights, zipfile.ZIP_DEFLATED)])
+        task = {"repo_id": REPO_ID, "filename": ARCHIVE, "local_dir": self.target, "extract_and_delete": True}
+        with DownloadEngine(blob_store=None, lockfile=os.path.join(self.work, "lock.json"),
+                            print_fn=lambda *args: None) as engine:
+            result, = engine.run([task])
+        self.assertEqual(result["status"], "downloaded")
+        self.assertEqual(self.read_target("weights.safetensors"), self.weights)
+        self.assertEqual(os.listdir(self.target), ["weights.safetensors"])
+
+
+if __name__ == "__main__":
+    unittest.main()